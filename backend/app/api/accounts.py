@@ -1,14 +1,16 @@
 """Account API endpoints."""
 import io
 import math
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, status
-from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
-from app.models import get_db
+from app.models import get_async_db
 from app.schemas import (
     AccountCreate,
     AccountUpdate,
@@ -18,16 +20,42 @@ from app.schemas import (
     AccountImportResult,
     TagBrief,
     BatchDeleteRequest,
+    BatchTarget,
     BatchTagsRequest,
     BatchUpdateRequest,
+    TotpCodesRequest,
+    TotpCodesResponse,
+    SecretsRequest,
+    SecretsResponse,
+)
+from app.services.account_service import (
+    DETAIL_OPTIONS,
+    EXPORT_OPTIONS,
+    AccountService,
+    AsyncAccountService,
+    chunked,
+    encode_cursor,
 )
-from app.services.account_service import AccountService
 from app.services.crypto_service import crypto_service
 from app.utils.security import get_current_user
 
 
 router = APIRouter(prefix="/accounts", tags=["Accounts"])
 
+# Excel import: sheet column -> account field
+IMPORT_COLUMNS = {
+    "账号": "email",
+    "密码": "password",
+    "备注": "note",
+    "sub2api": "sub2api",
+    "来源": "source",
+    "登录浏览器": "browser",
+    "是否是gpt会员": "gpt_membership",
+    "所属家庭": "family_group",
+    "辅助邮箱": "recovery_email",
+    "2fa": "totp_secret",
+}
+
 
 def account_to_response(account) -> AccountResponse:
     """Convert Account model to response schema."""
@@ -41,8 +69,8 @@ def account_to_response(account) -> AccountResponse:
         gpt_membership=account.gpt_membership,
         family_group=account.family_group,
         recovery_email=account.recovery_email,
-        has_password=account.password_encrypted is not None,
-        has_totp=account.totp_secret_encrypted is not None,
+        has_password=account.has_password,
+        has_totp=account.has_totp,
         tags=[TagBrief(id=t.id, name=t.name, color=t.color) for t in account.tags],
         custom_fields=account.custom_fields or {},
         created_at=account.created_at,
@@ -58,156 +86,224 @@ async def list_accounts(
     source: Optional[str] = Query(None),
     tag_ids: Optional[str] = Query(None, description="Comma-separated tag IDs"),
     gpt_membership: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    with_total: bool = Query(True, description="Set to false to skip counting and only report has_more"),
     _: str = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """Get paginated list of accounts."""
-    service = AccountService(db)
+    """Get paginated list of accounts.
+
+    Pages can be addressed by ``page`` (offset) or by ``cursor`` (keyset). The
+    cursor variant costs the same for every page and does not shift when new
+    accounts are inserted. Infinite-scroll clients should pass
+    ``with_total=false`` and follow ``has_more``.
+    """
+    service = AsyncAccountService(db)
 
     # Parse tag_ids
     tag_id_list = None
     if tag_ids:
         tag_id_list = [t.strip() for t in tag_ids.split(",") if t.strip()]
 
-    accounts, total = service.get_accounts(
-        page=page,
-        page_size=page_size,
-        search=search,
-        source=source,
-        tag_ids=tag_id_list,
-        gpt_membership=gpt_membership,
-    )
+    try:
+        items, total, has_more = await service.list_account_rows(
+            page=page,
+            page_size=page_size,
+            search=search,
+            source=source,
+            tag_ids=tag_id_list,
+            gpt_membership=gpt_membership,
+            cursor=cursor,
+            with_total=with_total,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    return AccountListResponse(
-        items=[account_to_response(a) for a in accounts],
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=math.ceil(total / page_size) if total > 0 else 1,
-    )
+    next_cursor = None
+    # Search results are ordered by relevance, which has no keyset position
+    if has_more and not search:
+        next_cursor = encode_cursor(items[-1]["created_at"], items[-1]["id"])
+
+    # Rows are already shaped like AccountResponse; skip per-item model validation
+    for item in items:
+        item["created_at"] = item["created_at"].isoformat()
+        item["updated_at"] = item["updated_at"].isoformat()
+
+    return JSONResponse({
+        "items": items,
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "total_pages": (math.ceil(total / page_size) if total > 0 else 1) if total is not None else None,
+        "has_more": has_more,
+        "next_cursor": next_cursor,
+    })
 
 
 @router.get("/sources", response_model=List[str])
 async def get_sources(
     _: str = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get all unique account sources."""
-    service = AccountService(db)
-    return service.get_sources()
+    service = AsyncAccountService(db)
+    return await service.get_sources()
 
 
 @router.get("/stats")
 async def get_stats(
     _: str = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get account statistics."""
-    service = AccountService(db)
-    return service.get_stats()
+    service = AsyncAccountService(db)
+    return await service.get_stats()
 
 
 # =====================
 # Batch Operations (must be before /{account_id} routes)
 # =====================
+#
+# Each batch endpoint takes either ``account_ids`` or ``filters`` (the list
+# filters: search, source, tag_ids, gpt_membership, at least one of them), which
+# are applied in the database without sending the matching IDs back and forth.
+# Every live account is only targeted with an explicit ``"all": true``. With
+# ``dry_run=true`` nothing is changed and only ``{"matched": n}`` is returned.
+
+def batch_filters(request: BatchTarget) -> Optional[dict]:
+    """The request's list filters as service keyword arguments ({} for ``all``)."""
+    if request.all:
+        return {}
+    return request.filters.model_dump() if request.filters else None
+
+
+def batch_failed(request: BatchTarget, succeeded: int) -> int:
+    """Requested IDs the operation did not apply to; duplicates count once, filters never fail."""
+    return len(set(request.account_ids)) - succeeded if request.account_ids else 0
+
 
 @router.post("/batch/delete")
 async def batch_delete_accounts(
     request: BatchDeleteRequest,
     hard: bool = Query(False, description="Permanently delete"),
+    dry_run: bool = Query(False, description="Only count the matching accounts"),
     _: str = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """Delete multiple accounts at once."""
-    service = AccountService(db)
-    deleted = 0
-    failed = 0
-
-    for account_id in request.account_ids:
-        if service.delete_account(account_id, hard_delete=hard):
-            deleted += 1
-        else:
-            failed += 1
+    """Delete multiple accounts at once, in one transaction.
+
+    IDs that do not exist or are already deleted count as failed; an ID given
+    more than once counts once, as in the other batch endpoints.
+    """
+    service = AsyncAccountService(db)
+    if dry_run:
+        return {"matched": await service.count_accounts(request.account_ids, batch_filters(request))}
+
+    deleted = await service.delete_accounts(request.account_ids, hard_delete=hard, filters=batch_filters(request))
 
-    return {"deleted": deleted, "failed": failed}
+    return {"deleted": deleted, "failed": batch_failed(request, deleted)}
 
 
 @router.post("/batch/tags")
 async def batch_update_tags(
     request: BatchTagsRequest,
     action: str = Query("add", pattern=r"^(add|remove|set)$"),
+    dry_run: bool = Query(False, description="Only count the matching accounts"),
     _: str = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """Update tags for multiple accounts.
+    """Update tags for multiple accounts, in one transaction.
 
     Actions:
     - add: Add tags to accounts (keep existing)
     - remove: Remove tags from accounts
     - set: Replace all tags with given tags
     """
-    service = AccountService(db)
-    updated = 0
-    failed = 0
+    service = AsyncAccountService(db)
+    if dry_run:
+        return {"matched": await service.count_accounts(request.account_ids, batch_filters(request))}
 
-    for account_id in request.account_ids:
-        try:
-            account = service.get_account_by_id(account_id)
-            if not account:
-                failed += 1
-                continue
+    updated = await service.update_tags(
+        request.account_ids, request.tag_ids, action=action, filters=batch_filters(request)
+    )
 
-            current_tag_ids = [t.id for t in account.tags]
+    return {"updated": updated, "failed": batch_failed(request, updated)}
 
-            if action == "add":
-                new_tag_ids = list(set(current_tag_ids + request.tag_ids))
-            elif action == "remove":
-                new_tag_ids = [t for t in current_tag_ids if t not in request.tag_ids]
-            else:  # set
-                new_tag_ids = request.tag_ids
 
-            service.update_account(account_id, AccountUpdate(tag_ids=new_tag_ids))
-            updated += 1
-        except Exception:
-            failed += 1
+@router.post("/secrets", response_model=SecretsResponse)
+async def reveal_secrets(
+    request: SecretsRequest,
+    _: str = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Decrypted passwords / TOTP secrets for many accounts in one call.
 
-    return {"updated": updated, "failed": failed}
+    Only the requested ciphertext columns are loaded, with one IN query, and
+    decrypted in one batch. Empty fields are null; unknown IDs are listed in
+    ``not_found``.
+    """
+    service = AsyncAccountService(db)
+    fields = tuple(dict.fromkeys(request.fields))
+
+    try:
+        ciphertexts, not_found = await service.get_ciphertexts(request.account_ids, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    secrets = await run_in_threadpool(AccountService.decrypt_secrets, ciphertexts, fields)
+
+    return {"secrets": secrets, "not_found": not_found}
+
+
+@router.post("/totp/codes", response_model=TotpCodesResponse)
+async def get_totp_codes(
+    request: TotpCodesRequest,
+    _: str = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Current TOTP codes and seconds remaining for many accounts in one call.
+
+    Pass ``account_ids``, or leave them out to get codes for the accounts
+    matching ``filters`` (the list filters) that have a TOTP secret. Secrets
+    are decrypted in a worker thread.
+    """
+    service = AsyncAccountService(db)
+    filters = request.filters.model_dump() if request.filters else None
+
+    try:
+        rows, not_found = await service.get_totp_ciphertexts(request.account_ids, filters)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    codes = await run_in_threadpool(AccountService.compute_totp_codes, rows)
+
+    return {"codes": codes, "not_found": not_found}
 
 
 @router.post("/batch/update")
 async def batch_update_accounts(
     request: BatchUpdateRequest,
+    dry_run: bool = Query(False, description="Only count the matching accounts"),
     _: str = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """Update multiple accounts with the same data."""
-    service = AccountService(db)
-    updated = 0
-    failed = 0
-
-    # Extract update data from request (excluding account_ids)
-    update_data = AccountUpdate(
-        email=request.email,
-        note=request.note,
-        sub2api=request.sub2api,
-        source=request.source,
-        browser=request.browser,
-        gpt_membership=request.gpt_membership,
-        family_group=request.family_group,
-        recovery_email=request.recovery_email,
-        tag_ids=request.tag_ids,
-    )
+    """Update multiple accounts with the same data, in one transaction.
 
-    for account_id in request.account_ids:
-        try:
-            if service.update_account(account_id, update_data):
-                updated += 1
-            else:
-                failed += 1
-        except Exception:
-            failed += 1
+    Only the fields present in the request are changed; ``tag_ids`` replaces
+    the tags. IDs that do not exist or are deleted are listed in ``not_found``.
+    """
+    service = AsyncAccountService(db)
+    if dry_run:
+        return {"matched": await service.count_accounts(request.account_ids, batch_filters(request))}
+
+    try:
+        updated, not_found = await service.update_accounts(
+            request.account_ids,
+            request.model_dump(exclude_unset=True, exclude={"account_ids", "filters"}),
+            filters=batch_filters(request),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    return {"updated": updated, "failed": failed}
+    return {"updated": updated, "failed": batch_failed(request, updated), "not_found": not_found}
 
 
 # =====================
@@ -218,11 +314,11 @@ async def batch_update_accounts(
 async def get_account(
     account_id: str,
     _: str = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get account by ID."""
-    service = AccountService(db)
-    account = service.get_account_by_id(account_id)
+    service = AsyncAccountService(db)
+    account = await service.get_account_by_id(account_id, options=DETAIL_OPTIONS)
 
     if not account:
         raise HTTPException(
@@ -237,14 +333,14 @@ async def get_account(
 async def get_account_password(
     account_id: str,
     _: str = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get decrypted password for an account."""
-    service = AccountService(db)
-    password = service.get_decrypted_password(account_id)
+    service = AsyncAccountService(db)
+    password = await service.get_decrypted_password(account_id)
 
     if password is None:
-        account = service.get_account_by_id(account_id)
+        account = await service.get_account_by_id(account_id)
         if not account:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Account not found")
         return {"password": None}
@@ -256,14 +352,14 @@ async def get_account_password(
 async def get_account_totp(
     account_id: str,
     _: str = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get decrypted TOTP secret for an account."""
-    service = AccountService(db)
-    totp = service.get_decrypted_totp(account_id)
+    service = AsyncAccountService(db)
+    totp = await service.get_decrypted_totp(account_id)
 
     if totp is None:
-        account = service.get_account_by_id(account_id)
+        account = await service.get_account_by_id(account_id)
         if not account:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Account not found")
         return {"totp_secret": None}
@@ -275,13 +371,13 @@ async def get_account_totp(
 async def create_account(
     data: AccountCreate,
     _: str = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Create a new account."""
-    service = AccountService(db)
+    service = AsyncAccountService(db)
 
     try:
-        account = service.create_account(data)
+        account = await service.create_account(data)
         return account_to_response(account)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -292,11 +388,11 @@ async def update_account(
     account_id: str,
     data: AccountUpdate,
     _: str = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Update an existing account."""
-    service = AccountService(db)
-    account = service.update_account(account_id, data)
+    service = AsyncAccountService(db)
+    account = await service.update_account(account_id, data)
 
     if not account:
         raise HTTPException(
@@ -312,11 +408,11 @@ async def delete_account(
     account_id: str,
     hard: bool = Query(False, description="Permanently delete"),
     _: str = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Delete an account."""
-    service = AccountService(db)
-    success = service.delete_account(account_id, hard_delete=hard)
+    service = AsyncAccountService(db)
+    success = await service.delete_account(account_id, hard_delete=hard)
 
     if not success:
         raise HTTPException(
@@ -332,9 +428,14 @@ async def import_accounts(
     file: UploadFile = File(...),
     conflict_strategy: str = Query("skip", pattern=r"^(skip|overwrite|merge)$"),
     _: str = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """Import accounts from Excel file."""
+    """Import accounts from Excel file.
+
+    Rows are validated up front, existing emails are looked up for the whole
+    file at once and the rows are written with bulk upserts in chunks of
+    ``IMPORT_CHUNK_SIZE``. Errors are reported per sheet row.
+    """
     import pandas as pd
 
     if not file.filename.endswith(('.xlsx', '.xls')):
@@ -345,112 +446,91 @@ async def import_accounts(
 
     try:
         content = await file.read()
-        df = pd.read_excel(io.BytesIO(content))
+        df = await run_in_threadpool(pd.read_excel, io.BytesIO(content))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Failed to read Excel file: {str(e)}",
         )
 
-    service = AccountService(db)
-
-    # Column mapping
-    column_map = {
-        "账号": "email",
-        "密码": "password",
-        "备注": "note",
-        "sub2api": "sub2api",
-        "来源": "source",
-        "登录浏览器": "browser",
-        "是否是gpt会员": "gpt_membership",
-        "所属家庭": "family_group",
-        "辅助邮箱": "recovery_email",
-        "2fa": "totp_secret",
-    }
+    service = AsyncAccountService(db)
 
-    imported = 0
-    skipped = 0
-    errors = []
+    rows, errors = await run_in_threadpool(parse_import_rows, df)
+    existing = await service.get_import_conflicts([data["email"] for _, data in rows])
+    planned, skipped, plan_errors = AccountService.plan_import(rows, conflict_strategy, existing)
+    errors.extend(plan_errors)
+    await run_in_threadpool(AccountService.encrypt_import_rows, planned)
 
-    for idx, row in df.iterrows():
-        try:
-            # Map columns
-            data = {}
-            for cn_name, en_name in column_map.items():
-                if cn_name in df.columns:
-                    value = row[cn_name]
-                    if pd.notna(value):
-                        if en_name == "sub2api":
-                            data[en_name] = str(value).strip() == "有"
-                        else:
-                            data[en_name] = str(value).strip()
-
-            if "email" not in data:
-                errors.append(f"Row {idx + 2}: Missing email")
-                continue
-
-            # Check if exists
-            existing = service.get_account_by_email(data["email"])
-
-            if existing:
-                if conflict_strategy == "skip":
-                    skipped += 1
-                    continue
-                elif conflict_strategy == "overwrite":
-                    # Update existing
-                    update_data = AccountUpdate(**data)
-                    service.update_account(existing.id, update_data)
-                    imported += 1
-                elif conflict_strategy == "merge":
-                    # Only update empty fields
-                    update_dict = {}
-                    for key, value in data.items():
-                        if key == "email":
-                            continue
-                        current = getattr(existing, key if key not in ("password", "totp_secret") else f"{key}_encrypted")
-                        if current is None or current == "":
-                            update_dict[key] = value
-                    if update_dict:
-                        service.update_account(existing.id, AccountUpdate(**update_dict))
-                    imported += 1
-            else:
-                # Create new
-                create_data = AccountCreate(**data)
-                service.create_account(create_data)
-                imported += 1
-
-        except Exception as e:
-            errors.append(f"Row {idx + 2}: {str(e)}")
+    # A handful of transactions, each one writer job
+    imported = 0
+    for chunk in chunked(planned, settings.IMPORT_CHUNK_SIZE):
+        chunk_errors = await service.upsert_accounts(list(chunk), conflict_strategy)
+        errors.extend(chunk_errors)
+        imported += sum(len(row_numbers) for row_numbers, _ in chunk) - len(chunk_errors)
 
+    errors.sort(key=lambda error: error[0])
     return AccountImportResult(
         total=len(df),
         imported=imported,
         skipped=skipped,
-        errors=errors[:10],  # Limit error messages
+        failed=len(errors),
+        errors=[f"Row {row_number}: {message}" for row_number, message in errors[:settings.IMPORT_MAX_ERRORS]],
     )
 
 
+def parse_import_rows(df) -> Tuple[List[Tuple[int, dict]], List[Tuple[int, str]]]:
+    """Map and validate sheet rows; returns ((row number, fields) pairs, row errors)."""
+    import pandas as pd
+
+    columns = {cn_name: en_name for cn_name, en_name in IMPORT_COLUMNS.items() if cn_name in df.columns}
+    rows, errors = [], []
+    for idx, record in enumerate(df[list(columns)].to_dict("records")):
+        row_number = idx + 2  # 1-based, after the header row
+        data = {}
+        for cn_name, en_name in columns.items():
+            value = record[cn_name]
+            if pd.notna(value):
+                if en_name == "sub2api":
+                    data[en_name] = str(value).strip() == "有"
+                else:
+                    data[en_name] = str(value).strip()
+
+        if "email" not in data:
+            errors.append((row_number, "Missing email"))
+            continue
+        try:
+            account = AccountCreate(**data)
+        except ValidationError as e:
+            message = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            errors.append((row_number, message))
+            continue
+        rows.append((row_number, account.model_dump(include=set(data))))
+    return rows, errors
+
+
 @router.get("/export/download")
 async def export_accounts(
     format: str = Query("excel", pattern=r"^(excel|csv|json)$"),
     include_password: bool = Query(False),
     account_ids: Optional[str] = Query(None, description="Comma-separated account IDs"),
     _: str = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Export accounts to file."""
     import pandas as pd
     import json
 
-    service = AccountService(db)
+    service = AsyncAccountService(db)
 
     # Get accounts
     if account_ids:
         id_list = [i.strip() for i in account_ids.split(",")]
-        accounts = [service.get_account_by_id(i) for i in id_list]
+        accounts = [await service.get_account_by_id(i, options=EXPORT_OPTIONS) for i in id_list]
         accounts = [a for a in accounts if a]
     else:
-        accounts, _ = service.get_accounts(page=1, page_size=10000)
+        accounts, _, _ = await service.get_accounts(
+            page=1, page_size=10000, with_total=False, options=EXPORT_OPTIONS
+        )
 
     # Build data
     data = []
@@ -461,6 +541,13 @@ async def export_accounts(
             all_custom_keys.update(acc.custom_fields.keys())
     all_custom_keys = sorted(all_custom_keys)
 
+    if include_password:
+        # Ciphertext was loaded with the page, decrypt it in one bulk call
+        plaintexts = iter(await run_in_threadpool(
+            crypto_service.decrypt_many,
+            [blob or None for acc in accounts for blob in (acc.password_encrypted, acc.totp_secret_encrypted)],
+        ))
+
     for acc in accounts:
         row = {
             "账号": acc.email,
@@ -474,11 +561,11 @@ async def export_accounts(
         }
 
         if include_password:
-            row["密码"] = service.get_decrypted_password(acc.id) or ""
-            row["2fa"] = service.get_decrypted_totp(acc.id) or ""
+            row["密码"] = next(plaintexts) or ""
+            row["2fa"] = next(plaintexts) or ""
         else:
-            row["密码"] = "******" if acc.password_encrypted else ""
-            row["2fa"] = "******" if acc.totp_secret_encrypted else ""
+            row["密码"] = "******" if acc.has_password else ""
+            row["2fa"] = "******" if acc.has_totp else ""
 
         # Add custom fields as additional columns
         for key in all_custom_keys:
@@ -487,18 +574,19 @@ async def export_accounts(
         data.append(row)
 
     if format == "json":
-        content = json.dumps(data, ensure_ascii=False, indent=2)
+        content = await run_in_threadpool(json.dumps, data, ensure_ascii=False, indent=2)
         return StreamingResponse(
             io.BytesIO(content.encode("utf-8")),
             media_type="application/json",
             headers={"Content-Disposition": "attachment; filename=accounts.json"},
         )
 
-    df = pd.DataFrame(data)
+    # Serialization is CPU bound, keep it off the event loop
+    df = await run_in_threadpool(pd.DataFrame, data)
 
     if format == "csv":
         output = io.StringIO()
-        df.to_csv(output, index=False)
+        await run_in_threadpool(df.to_csv, output, index=False)
         return StreamingResponse(
             io.BytesIO(output.getvalue().encode("utf-8-sig")),
             media_type="text/csv",
@@ -507,7 +595,7 @@ async def export_accounts(
 
     # Excel
     output = io.BytesIO()
-    df.to_excel(output, index=False, engine="openpyxl")
+    await run_in_threadpool(df.to_excel, output, index=False, engine="openpyxl")
     output.seek(0)
     return StreamingResponse(
         output,
@@ -1,31 +1,44 @@
 """Authentication API endpoints."""
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
-from app.models import get_db
+from app.models import get_async_db
 from app.schemas import (
     MasterPasswordSetup,
     LoginRequest,
     LoginResponse,
     PasswordChange,
+    KeyRotation,
     SystemStatus,
 )
-from app.services.auth_service import AuthService
+from app.services.auth_service import AsyncAuthService
+from app.services.kdf_executor import KdfBusyError, kdf_executor
+from app.services.token_cache import token_cache
+from app.services.totp_service import totp_cache
 from app.utils.security import get_current_user
 
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
+def kdf_busy(e: KdfBusyError) -> HTTPException:
+    """503 for a saturated KDF executor, the client should retry shortly."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(e),
+        headers={"Retry-After": "1"},
+    )
+
+
 @router.get("/status", response_model=SystemStatus)
-async def get_system_status(db: Session = Depends(get_db)):
+async def get_system_status(db: AsyncSession = Depends(get_async_db)):
     """Check if the system is initialized and locked status."""
-    auth_service = AuthService(db)
+    auth_service = AsyncAuthService(db)
     from app.services.crypto_service import crypto_service
 
     return SystemStatus(
-        is_initialized=auth_service.is_initialized(),
+        is_initialized=await auth_service.is_initialized(),
         is_locked=crypto_service._encryption_key is None,
     )
 
@@ -33,36 +46,41 @@ async def get_system_status(db: Session = Depends(get_db)):
 @router.post("/setup", status_code=status.HTTP_201_CREATED)
 async def setup_master_password(
     data: MasterPasswordSetup,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Set up the initial master password."""
-    auth_service = AuthService(db)
+    auth_service = AsyncAuthService(db)
 
-    if auth_service.is_initialized():
+    if await auth_service.is_initialized():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="System is already initialized",
         )
 
     try:
-        auth_service.setup_master_password(data.password)
+        await auth_service.setup_master_password(data.password)
         return {"message": "Master password set successfully"}
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except KdfBusyError as e:
+        raise kdf_busy(e)
 
 
 @router.post("/login", response_model=LoginResponse)
-async def login(data: LoginRequest, db: Session = Depends(get_db)):
+async def login(data: LoginRequest, db: AsyncSession = Depends(get_async_db)):
     """Login with master password."""
-    auth_service = AuthService(db)
+    auth_service = AsyncAuthService(db)
 
-    if not auth_service.is_initialized():
+    if not await auth_service.is_initialized():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="System not initialized. Please set up master password first.",
         )
 
-    token = auth_service.login(data.password)
+    try:
+        token = await auth_service.login(data.password)
+    except KdfBusyError as e:
+        raise kdf_busy(e)
     if not token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -78,11 +96,11 @@ async def login(data: LoginRequest, db: Session = Depends(get_db)):
 @router.post("/logout")
 async def logout(
     _: str = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Logout and clear session."""
-    auth_service = AuthService(db)
-    auth_service.logout()
+    auth_service = AsyncAuthService(db)
+    await auth_service.logout()
     return {"message": "Logged out successfully"}
 
 
@@ -91,6 +109,8 @@ async def lock(_: str = Depends(get_current_user)):
     """Lock the application (clear encryption key)."""
     from app.services.crypto_service import crypto_service
     crypto_service.clear_encryption_key()
+    token_cache.clear()
+    totp_cache.clear()
     return {"message": "Application locked"}
 
 
@@ -98,15 +118,69 @@ async def lock(_: str = Depends(get_current_user)):
 async def change_password(
     data: PasswordChange,
     _: str = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Change the master password."""
-    auth_service = AuthService(db)
+    auth_service = AsyncAuthService(db)
 
-    if not auth_service.change_master_password(data.current_password, data.new_password):
+    try:
+        changed = await auth_service.change_master_password(data.current_password, data.new_password)
+    except KdfBusyError as e:
+        raise kdf_busy(e)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    if not changed:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect",
         )
 
     return {"message": "Password changed successfully"}
+
+
+@router.get("/rekey-status")
+async def get_rekey_status(
+    _: str = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Progress of the background re-encryption (e.g. migrating a legacy vault to a data key)."""
+    return await AsyncAuthService(db).get_rekey_state()
+
+
+@router.post("/rotate-key")
+async def rotate_key(
+    data: KeyRotation,
+    _: str = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Rotate the vault data key; existing rows are rewritten in the background."""
+    auth_service = AsyncAuthService(db)
+
+    try:
+        rotated = await auth_service.rotate_data_key(data.password)
+    except KdfBusyError as e:
+        raise kdf_busy(e)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    if not rotated:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Password is incorrect",
+        )
+
+    return await auth_service.get_key_rotation_status()
+
+
+@router.get("/key-rotation")
+async def get_key_rotation_status(
+    _: str = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Current key version and progress of the background rotation."""
+    return await AsyncAuthService(db).get_key_rotation_status()
+
+
+@router.get("/kdf-metrics")
+async def get_kdf_metrics(_: str = Depends(get_current_user)):
+    """Queue state and per-stage timings of the KDF executor."""
+    return kdf_executor.metrics()
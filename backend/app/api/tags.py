@@ -1,10 +1,13 @@
 """Tag API endpoints."""
-from typing import List
+from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.models import get_db, Tag
+from app.models import get_async_db, db_writer, Account, Tag
+from app.models.database import account_tags
 from app.schemas import TagCreate, TagUpdate, TagResponse
 from app.utils.security import get_current_user
 
@@ -12,72 +15,89 @@ from app.utils.security import get_current_user
 router = APIRouter(prefix="/tags", tags=["Tags"])
 
 
+def tag_account_counts():
+    """Number of non-deleted accounts per tag, aggregated over account_tags."""
+    return (
+        select(account_tags.c.tag_id, func.count().label("account_count"))
+        .join(Account, Account.id == account_tags.c.account_id)
+        .where(Account.is_deleted == False)
+        .group_by(account_tags.c.tag_id)
+    )
+
+
+async def count_tag_accounts(db: AsyncSession, tag_id: str) -> int:
+    """Number of non-deleted accounts carrying one tag."""
+    return await db.scalar(
+        select(func.count())
+        .select_from(account_tags)
+        .join(Account, Account.id == account_tags.c.account_id)
+        .where(account_tags.c.tag_id == tag_id, Account.is_deleted == False)
+    )
+
+
+def tag_to_response(tag: Tag, account_count: int) -> TagResponse:
+    """Convert Tag model to response schema."""
+    return TagResponse(
+        id=tag.id,
+        name=tag.name,
+        color=tag.color,
+        created_at=tag.created_at,
+        account_count=account_count,
+    )
+
+
 @router.get("", response_model=List[TagResponse])
 async def list_tags(
     _: str = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get all tags."""
-    tags = db.query(Tag).order_by(Tag.name).all()
-    return [
-        TagResponse(
-            id=t.id,
-            name=t.name,
-            color=t.color,
-            created_at=t.created_at,
-            account_count=len(t.accounts),
-        )
-        for t in tags
-    ]
+    counts = tag_account_counts().subquery()
+    rows = await db.execute(
+        select(Tag, func.coalesce(counts.c.account_count, 0))
+        .outerjoin(counts, counts.c.tag_id == Tag.id)
+        .order_by(Tag.name)
+    )
+    return [tag_to_response(tag, account_count) for tag, account_count in rows]
 
 
 @router.get("/{tag_id}", response_model=TagResponse)
 async def get_tag(
     tag_id: str,
     _: str = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get tag by ID."""
-    tag = db.query(Tag).filter(Tag.id == tag_id).first()
+    tag = await db.get(Tag, tag_id)
     if not tag:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tag not found")
 
-    return TagResponse(
-        id=tag.id,
-        name=tag.name,
-        color=tag.color,
-        created_at=tag.created_at,
-        account_count=len(tag.accounts),
-    )
+    return tag_to_response(tag, await count_tag_accounts(db, tag.id))
 
 
 @router.post("", response_model=TagResponse, status_code=status.HTTP_201_CREATED)
 async def create_tag(
     data: TagCreate,
     _: str = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Create a new tag."""
     # Check if name exists
-    existing = db.query(Tag).filter(Tag.name == data.name).first()
+    existing = await db.scalar(select(Tag).where(Tag.name == data.name))
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Tag '{data.name}' already exists",
         )
 
-    tag = Tag(name=data.name, color=data.color)
-    db.add(tag)
-    db.commit()
-    db.refresh(tag)
+    def insert_tag(session: Session) -> Tag:
+        tag = Tag(name=data.name, color=data.color)
+        session.add(tag)
+        session.flush()
+        return tag
 
-    return TagResponse(
-        id=tag.id,
-        name=tag.name,
-        color=tag.color,
-        created_at=tag.created_at,
-        account_count=0,
-    )
+    tag = await db_writer.run(insert_tag)
+    return tag_to_response(tag, 0)
 
 
 @router.put("/{tag_id}", response_model=TagResponse)
@@ -85,10 +105,10 @@ async def update_tag(
     tag_id: str,
     data: TagUpdate,
     _: str = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Update a tag."""
-    tag = db.query(Tag).filter(Tag.id == tag_id).first()
+    tag = await db.get(Tag, tag_id)
     if not tag:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tag not found")
 
@@ -96,40 +116,44 @@ async def update_tag(
 
     # Check name uniqueness if updating name
     if "name" in update_data and update_data["name"] != tag.name:
-        existing = db.query(Tag).filter(Tag.name == update_data["name"]).first()
+        existing = await db.scalar(select(Tag).where(Tag.name == update_data["name"]))
         if existing:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Tag '{update_data['name']}' already exists",
             )
 
-    for key, value in update_data.items():
-        setattr(tag, key, value)
+    def apply_update(session: Session) -> Optional[Tag]:
+        tag = session.get(Tag, tag_id)
+        if tag:
+            for key, value in update_data.items():
+                setattr(tag, key, value)
+            session.flush()
+        return tag
 
-    db.commit()
-    db.refresh(tag)
+    tag = await db_writer.run(apply_update)
+    if not tag:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tag not found")
 
-    return TagResponse(
-        id=tag.id,
-        name=tag.name,
-        color=tag.color,
-        created_at=tag.created_at,
-        account_count=len(tag.accounts),
-    )
+    return tag_to_response(tag, await count_tag_accounts(db, tag.id))
 
 
 @router.delete("/{tag_id}")
 async def delete_tag(
     tag_id: str,
     _: str = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Delete a tag."""
-    tag = db.query(Tag).filter(Tag.id == tag_id).first()
+    tag = await db.get(Tag, tag_id)
     if not tag:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tag not found")
 
-    db.delete(tag)
-    db.commit()
+    def remove_tag(session: Session) -> None:
+        tag = session.get(Tag, tag_id)
+        if tag:
+            session.delete(tag)
+
+    await db_writer.run(remove_tag)
 
     return {"message": "Tag deleted successfully"}
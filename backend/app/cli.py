@@ -0,0 +1,60 @@
+"""Maintenance commands.
+
+Usage (from the backend directory):
+    python -m app.cli rebuild-search-index
+    python -m app.cli calibrate-kdf --target-ms 500 --max-memory-mb 64
+"""
+import argparse
+
+from app.models import SessionLocal, engine, init_db, rebuild_search_index
+from app.services.auth_service import AuthService
+from app.services.kdf_calibration import calibrate, time_argon2, time_scrypt
+
+
+def cmd_rebuild_search_index(args: argparse.Namespace) -> None:
+    """Re-populate the account full-text index."""
+    init_db()
+    with engine.begin() as conn:
+        count = rebuild_search_index(conn)
+    print(f"Search index rebuilt: {count} accounts indexed")
+
+
+def cmd_calibrate_kdf(args: argparse.Namespace) -> None:
+    """Benchmark the host and store Argon2id/scrypt parameters for the target login latency."""
+    try:
+        params = calibrate(args.target_ms, args.max_memory_mb)
+    except ValueError as e:
+        raise SystemExit(f"calibrate-kdf: {e}")
+    argon2_ms = time_argon2(params["argon2"]) * 1000
+    scrypt_ms = time_scrypt(params["scrypt"]) * 1000
+    print(f"Argon2id: {params['argon2']} ({argon2_ms:.0f} ms)")
+    print(f"scrypt:   {params['scrypt']} ({scrypt_ms:.0f} ms)")
+    print(f"Estimated login KDF time: {argon2_ms + scrypt_ms:.0f} ms (target {args.target_ms} ms)")
+    if args.dry_run:
+        return
+
+    init_db()
+    with SessionLocal() as session:
+        AuthService(session).store_kdf_params(params["argon2"], params["scrypt"])
+    print("Parameters stored; restart the server to apply them. The master password hash is upgraded at the next login.")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Account Management System maintenance")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = subparsers.add_parser("rebuild-search-index", help="Rebuild the account full-text search index")
+    rebuild.set_defaults(func=cmd_rebuild_search_index)
+
+    calibrate_kdf = subparsers.add_parser("calibrate-kdf", help="Pick Argon2id/scrypt costs for this host")
+    calibrate_kdf.add_argument("--target-ms", type=int, default=500, help="target KDF time per login")
+    calibrate_kdf.add_argument("--max-memory-mb", type=int, default=64, help="memory budget per KDF call")
+    calibrate_kdf.add_argument("--dry-run", action="store_true", help="print the parameters without storing them")
+    calibrate_kdf.set_defaults(func=cmd_calibrate_kdf)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
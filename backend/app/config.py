@@ -1,6 +1,8 @@
 """Application configuration settings."""
 import os
 from pathlib import Path
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
 
@@ -18,10 +20,45 @@ class Settings(BaseSettings):
     DATABASE_PATH: Path = DATA_DIR / "accounts.db"
     BACKUP_DIR: Path = DATA_DIR / "backups"
 
+    # SQLite performance profile (applied to every new connection)
+    SQLITE_PRAGMAS_ENABLED: bool = True
+    SQLITE_JOURNAL_MODE: Literal["DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"] = "WAL"
+    SQLITE_SYNCHRONOUS: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024  # 256MB, 0 disables memory-mapped I/O
+    SQLITE_CACHE_SIZE: int = -64000  # 负数表示 KiB，即约 64MB 页缓存
+    SQLITE_TEMP_STORE: Literal["DEFAULT", "FILE", "MEMORY"] = "MEMORY"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # 等待写锁的最长时间（毫秒）
+
+    # Database connections: read-only pool for queries, one group-commit writer
+    DB_READ_POOL_SIZE: int = 8
+    DB_WRITE_MAX_BATCH_SIZE: int = 64  # 单次提交最多合并的写操作数
+    DB_WRITE_MAX_WAIT_MS: int = 5  # 收到第一个写操作后等待更多写操作的最长时间（毫秒）
+    DB_IN_CHUNK_SIZE: int = 500  # 批量操作中单条 IN (...) 语句的 ID 数，低于 SQLite 参数上限
+
+    # Bulk encryption: batches of at least CRYPTO_PARALLEL_MIN_ITEMS fields are split across worker threads
+    CRYPTO_WORKERS: int = min(4, os.cpu_count() or 1)
+    CRYPTO_PARALLEL_MIN_ITEMS: int = 2048
+
+    # Key derivation (Argon2id / scrypt) runs on a bounded pool; requests beyond the queue get 503
+    KDF_MAX_WORKERS: int = 2  # 同时进行的 KDF 计算数（每个 Argon2 约占 64MB 内存）
+    KDF_MAX_QUEUE: int = 8  # 排队等待的 KDF 计算数上限
+
+    # Master password change re-encrypts accounts in chunks, committing a checkpoint per chunk
+    REKEY_CHUNK_SIZE: int = 1000
+
+    # Excel import: rows written per transaction, and how many row errors the response lists
+    IMPORT_CHUNK_SIZE: int = 2000
+    IMPORT_MAX_ERRORS: int = 100  # 超出部分只计入 failed
+
+    # Background rewrite of ciphertext to the current key version after a rotation
+    KEY_ROTATION_BATCH_SIZE: int = 200  # 每批重写的账号数
+    KEY_ROTATION_INTERVAL_MS: int = 200  # 批次之间的暂停（毫秒），让出写入线程
+
     # Security - Use a fixed secret key or load from env, otherwise JWT tokens will invalidate on restart
     SECRET_KEY: str = os.environ.get("SECRET_KEY", "account-management-system-secret-key-2024-please-change-in-production")
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRE_MINUTES: int = 1440  # 24 hours
+    TOKEN_CACHE_SIZE: int = 256  # 已验证 token 的 LRU 缓存大小，0 表示关闭
     MASTER_PASSWORD_MIN_LENGTH: int = 8
 
     # Clipboard
@@ -30,6 +67,8 @@ class Settings(BaseSettings):
     # Pagination
     DEFAULT_PAGE_SIZE: int = 20
     MAX_PAGE_SIZE: int = 100
+    TOTP_CODES_MAX_ACCOUNTS: int = 500  # 单次批量生成 TOTP 验证码的账号数上限
+    SECRETS_MAX_ACCOUNTS: int = 5000  # 单次批量查看密码的账号数上限（一次 IN 查询）
 
     # Auto Backup
     AUTO_BACKUP_ENABLED: bool = True
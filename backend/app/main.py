@@ -6,9 +6,11 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
-from app.models import init_db
+from app.models import SessionLocal, async_engine, config_cache, db_writer, init_db, run_migrations
 from app.api import auth_router, accounts_router, tags_router, backup_router
+from app.services.auth_service import AuthService
 from app.services.backup_service import backup_service
+from app.services.kdf_executor import kdf_executor
 
 # Configure logging
 logging.basicConfig(
@@ -21,8 +23,13 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events."""
-    # Startup: Initialize database
+    # Startup: Initialize database and bring existing schemas up to date
     init_db()
+    run_migrations()
+    with SessionLocal() as session:
+        config_cache.load(session)
+        AuthService(session).apply_kdf_params()
+    db_writer.start()
 
     # Start backup service
     backup_service.start()
@@ -32,6 +39,9 @@ async def lifespan(app: FastAPI):
 
     # Shutdown: Clean up
     backup_service.stop()
+    db_writer.stop()
+    kdf_executor.shutdown()
+    await async_engine.dispose()
     logger.info("Application stopped")
 
 
@@ -1 +1,20 @@
-from app.models.database import Account, Tag, SystemConfig, Base, engine, SessionLocal, init_db, get_db
+from app.models.database import (
+    Account,
+    Tag,
+    SystemConfig,
+    Base,
+    engine,
+    SessionLocal,
+    async_engine,
+    AsyncSessionLocal,
+    write_engine,
+    WriteSessionLocal,
+    apply_sqlite_pragmas,
+    init_db,
+    get_db,
+    get_async_db,
+)
+from app.models.search_index import rebuild_search_index
+from app.models.writer import db_writer, commit_or_flush
+from app.models.config_cache import config_cache
+from app.models.migrations import run_migrations
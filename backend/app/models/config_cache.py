@@ -0,0 +1,103 @@
+"""Process-wide cache of the ``system_config`` table.
+
+The table holds a handful of rows (initialized flag, password hash, salt,
+wrapped data key, checkpoints) that are read on nearly every request but
+change only during setup, login migrations and password changes. All of it is
+kept in one dictionary, loaded at startup and reloaded on demand.
+
+Writes go through ``set`` / ``set_many`` (or any ORM flush touching a
+SystemConfig row) and invalidate the cache instead of patching it: inside the
+group-commit writer a job's savepoint may still roll back after the write, so
+only the database knows the final value. The cache is invalidated again once
+the transaction ends, and the next read reloads the whole table in one query.
+A generation counter keeps a reload that raced with a write from caching
+values older than that write.
+"""
+import threading
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.models.database import SystemConfig
+
+# Session.info flag: this transaction wrote system_config rows
+CONFIG_DIRTY = "config_dirty"
+
+
+class ConfigCache:
+    """Read-through, invalidate-on-write cache of system_config key/value pairs."""
+
+    def __init__(self):
+        self._values: Optional[Dict[str, str]] = None
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._values is not None
+
+    def load(self, session: Session) -> Dict[str, str]:
+        """(Re)load every row; called at startup and after invalidation."""
+        with self._lock:
+            generation = self._generation
+        values = dict(session.execute(select(SystemConfig.key, SystemConfig.value)).all())
+        with self._lock:
+            if generation == self._generation:
+                self._values = values
+        return values
+
+    def _snapshot(self, session: Session) -> Dict[str, str]:
+        if session.info.get(CONFIG_DIRTY):
+            # This transaction has its own uncommitted writes: read them, don't cache them
+            session.flush()
+            return dict(session.execute(select(SystemConfig.key, SystemConfig.value)).all())
+        values = self._values
+        return values if values is not None else self.load(session)
+
+    def get(self, session: Session, key: str) -> Optional[str]:
+        """Value of ``key``, None if missing."""
+        return self._snapshot(session).get(key)
+
+    def get_many(self, session: Session, keys: Iterable[str]) -> Dict[str, str]:
+        """Values of the given keys that exist."""
+        values = self._snapshot(session)
+        return {key: values[key] for key in keys if key in values}
+
+    def set(self, session: Session, key: str, value: str) -> None:
+        """Insert or update one row in the session's transaction."""
+        self.set_many(session, {key: value})
+
+    def set_many(self, session: Session, values: Dict[str, str]) -> None:
+        """Insert or update several rows in the session's transaction."""
+        for key, value in values.items():
+            session.merge(SystemConfig(key=key, value=value))
+        self.mark_dirty(session)
+
+    def mark_dirty(self, session: Session) -> None:
+        """Invalidate now and again when the session's transaction ends."""
+        session.info[CONFIG_DIRTY] = True
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Drop the cached values; the next read reloads them."""
+        with self._lock:
+            self._generation += 1
+            self._values = None
+
+
+# Global cache instance
+config_cache = ConfigCache()
+
+
+@event.listens_for(Session, "before_flush")
+def _track_config_writes(session: Session, flush_context, instances) -> None:
+    if any(isinstance(obj, SystemConfig) for obj in (*session.new, *session.dirty, *session.deleted)):
+        config_cache.mark_dirty(session)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _invalidate_after_transaction(session: Session, transaction) -> None:
+    # Savepoints end inside the outer transaction; only its end makes writes final
+    if transaction.parent is None and session.info.pop(CONFIG_DIRTY, False):
+        config_cache.invalidate()
@@ -1,21 +1,26 @@
 """Database models and session management."""
 import uuid
 from datetime import datetime
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 
 from sqlalchemy import (
     Boolean,
     Column,
     DateTime,
     ForeignKey,
+    Index,
     LargeBinary,
     String,
     Table,
     Text,
     JSON,
     create_engine,
+    event,
+    text,
 )
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from app.config import settings
 
@@ -31,6 +36,7 @@ account_tags = Table(
     Base.metadata,
     Column("account_id", String(36), ForeignKey("accounts.id", ondelete="CASCADE"), primary_key=True),
     Column("tag_id", String(36), ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_account_tags_tag_account", "tag_id", "account_id"),
 )
 
 
@@ -38,10 +44,34 @@ class Account(Base):
     """Account model for storing Google account credentials."""
 
     __tablename__ = "accounts"
+    __table_args__ = (
+        # Serves the default listing order and keyset pagination
+        Index("ix_accounts_listing", "is_deleted", "created_at", "id"),
+        # List filters on live accounts; existing databases get these from app.models.migrations
+        Index("ix_accounts_source_active", "source", "created_at", "id", sqlite_where=text("is_deleted = 0")),
+        Index(
+            "ix_accounts_gpt_membership_active",
+            "gpt_membership",
+            "created_at",
+            "id",
+            sqlite_where=text("is_deleted = 0"),
+        ),
+        Index(
+            "ix_accounts_family_group_active",
+            "family_group",
+            "created_at",
+            "id",
+            sqlite_where=text("is_deleted = 0"),
+        ),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     email: Mapped[str] = mapped_column(String(255), unique=True, nullable=False, index=True)
-    password_encrypted: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)
+    # Ciphertext and custom fields are deferred: loaded only by the reveal, export
+    # and backup paths (undefer_group("secrets") / undefer(Account.custom_fields))
+    password_encrypted: Mapped[Optional[bytes]] = mapped_column(
+        LargeBinary, nullable=True, deferred=True, deferred_group="secrets"
+    )
     note: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     sub2api: Mapped[bool] = mapped_column(Boolean, default=False)
     source: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
@@ -49,8 +79,13 @@ class Account(Base):
     gpt_membership: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
     family_group: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
     recovery_email: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
-    totp_secret_encrypted: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)
-    custom_fields: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True, default=dict)
+    totp_secret_encrypted: Mapped[Optional[bytes]] = mapped_column(
+        LargeBinary, nullable=True, deferred=True, deferred_group="secrets"
+    )
+    custom_fields: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True, default=dict, deferred=True)
+    # Kept in sync with the ciphertext columns so listing never has to read them
+    has_password: Mapped[bool] = mapped_column(Boolean, default=False, server_default=text("0"), nullable=False)
+    has_totp: Mapped[bool] = mapped_column(Boolean, default=False, server_default=text("0"), nullable=False)
     is_deleted: Mapped[bool] = mapped_column(Boolean, default=False, index=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -61,6 +96,16 @@ class Account(Base):
     )
 
 
+@event.listens_for(Account.password_encrypted, "set")
+def _track_has_password(target, value, oldvalue, initiator):
+    target.has_password = value is not None
+
+
+@event.listens_for(Account.totp_secret_encrypted, "set")
+def _track_has_totp(target, value, oldvalue, initiator):
+    target.has_totp = value is not None
+
+
 class Tag(Base):
     """Tag model for categorizing accounts."""
 
@@ -72,8 +117,10 @@ class Tag(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
     # Relationship
+    # Loaded only on access: eager loading here would pull in every tagged account
+    # (and, through Account.tags, their tags) whenever a tag is loaded
     accounts: Mapped[List["Account"]] = relationship(
-        "Account", secondary=account_tags, back_populates="tags", lazy="selectin"
+        "Account", secondary=account_tags, back_populates="tags", lazy="select"
     )
 
 
@@ -87,16 +134,94 @@ class SystemConfig(Base):
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
+def apply_sqlite_pragmas(dbapi_connection, connection_record=None) -> None:
+    """Apply the configured SQLite pragma profile to a new DBAPI connection."""
+    if not settings.SQLITE_PRAGMAS_ENABLED:
+        return
+
+    cursor = dbapi_connection.cursor()
+    try:
+        # busy_timeout first so that switching journal mode can wait for other writers
+        cursor.execute(f"PRAGMA busy_timeout = {int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA journal_mode = {settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA mmap_size = {int(settings.SQLITE_MMAP_SIZE)}")
+        cursor.execute(f"PRAGMA cache_size = {int(settings.SQLITE_CACHE_SIZE)}")
+        cursor.execute(f"PRAGMA temp_store = {settings.SQLITE_TEMP_STORE}")
+    finally:
+        cursor.close()
+
+
 # Database engine and session
 engine = create_engine(
     f"sqlite:///{settings.DATABASE_PATH}",
     echo=settings.DEBUG,
     connect_args={"check_same_thread": False},
 )
+event.listen(engine, "connect", apply_sqlite_pragmas)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def set_query_only(dbapi_connection, connection_record=None) -> None:
+    """Make a DBAPI connection reject writes."""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA query_only = ON")
+    finally:
+        cursor.close()
+
+
+def use_immediate_transactions(target_engine) -> None:
+    """Start every transaction on ``target_engine`` with BEGIN IMMEDIATE.
+
+    pysqlite defers BEGIN until the first DML statement, which breaks SAVEPOINT
+    semantics and lets a transaction start as a reader and fail to upgrade. The
+    group-commit writer needs the write lock and a real outer transaction up front.
+    """
+
+    @event.listens_for(target_engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(target_engine, "begin")
+    def _begin_immediate(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+# Read pool (aiosqlite) for request handlers: query I/O is awaited instead of
+# blocking the event loop, and connections are read-only. All mutations go
+# through the group-commit writer (app.models.writer).
+async_engine = create_async_engine(
+    f"sqlite+aiosqlite:///{settings.DATABASE_PATH}",
+    echo=settings.DEBUG,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=settings.DB_READ_POOL_SIZE,
+    max_overflow=0,
+)
+event.listen(async_engine.sync_engine, "connect", apply_sqlite_pragmas)
+event.listen(async_engine.sync_engine, "connect", set_query_only)
+
+# expire_on_commit=False: attributes must stay loaded after commit, an implicit
+# refresh would need I/O outside of an awaitable context
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+# Single writer connection used by the group-commit writer thread
+write_engine = create_engine(
+    f"sqlite:///{settings.DATABASE_PATH}",
+    echo=settings.DEBUG,
+    connect_args={"check_same_thread": False},
+    poolclass=QueuePool,
+    pool_size=1,
+    max_overflow=0,
+)
+event.listen(write_engine, "connect", apply_sqlite_pragmas)
+use_immediate_transactions(write_engine)
+
+# Results handed back to callers must stay readable after the batch commits
+WriteSessionLocal = sessionmaker(autoflush=False, expire_on_commit=False, bind=write_engine)
+
+
 def init_db():
     """Initialize database tables."""
     Base.metadata.create_all(bind=engine)
@@ -109,3 +234,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Get async database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,117 @@
+"""Versioned schema migrations.
+
+``Base.metadata.create_all`` only creates missing tables, so an existing
+database never picks up new indexes or columns. Migrations fill that gap: each
+one has a version number and runs once, and the applied version is stored
+under ``schema_version`` in ``system_config``.
+
+Migrations must be idempotent: on a fresh database ``create_all`` has already
+built the current schema, and a crash between a migration and its version bump
+re-runs it on the next start (use IF NOT EXISTS, check columns first).
+"""
+import logging
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy.engine import Connection, Engine
+
+from app.models import database
+from app.models.search_index import FTS_TABLE, create_search_index, search_index_tokenizer
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION_KEY = "schema_version"
+
+
+def _create_indexes(*statements: str) -> Callable[[Connection], None]:
+    def migrate(conn: Connection) -> None:
+        for statement in statements:
+            conn.exec_driver_sql(statement)
+
+    return migrate
+
+
+def _add_secret_flags(conn: Connection) -> None:
+    columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(accounts)")}
+    for column in ("has_password", "has_totp"):
+        if column not in columns:
+            conn.exec_driver_sql(f"ALTER TABLE accounts ADD COLUMN {column} BOOLEAN NOT NULL DEFAULT 0")
+    conn.exec_driver_sql(
+        "UPDATE accounts SET has_password = password_encrypted IS NOT NULL, "
+        "has_totp = totp_secret_encrypted IS NOT NULL"
+    )
+
+
+def _trigram_search_index(conn: Connection) -> None:
+    # The unicode61 index only matched token prefixes; rebuild it with trigrams
+    if search_index_tokenizer(conn) != "trigram":
+        conn.exec_driver_sql(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+        create_search_index(conn)
+
+
+# (version, description, migration); append only, never renumber
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (
+        1,
+        "listing index for keyset pagination",
+        _create_indexes(
+            "CREATE INDEX IF NOT EXISTS ix_accounts_listing ON accounts (is_deleted, created_at, id)",
+        ),
+    ),
+    (
+        2,
+        "partial indexes for list filters and tag lookups",
+        _create_indexes(
+            "CREATE INDEX IF NOT EXISTS ix_accounts_source_active "
+            "ON accounts (source, created_at, id) WHERE is_deleted = 0",
+            "CREATE INDEX IF NOT EXISTS ix_accounts_gpt_membership_active "
+            "ON accounts (gpt_membership, created_at, id) WHERE is_deleted = 0",
+            "CREATE INDEX IF NOT EXISTS ix_accounts_family_group_active "
+            "ON accounts (family_group, created_at, id) WHERE is_deleted = 0",
+            "CREATE INDEX IF NOT EXISTS ix_account_tags_tag_account ON account_tags (tag_id, account_id)",
+        ),
+    ),
+    (3, "stored has_password / has_totp flags", _add_secret_flags),
+    (4, "trigram tokenizer for substring search", _trigram_search_index),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn: Connection) -> int:
+    """Return the applied schema version (0 for databases never migrated)."""
+    value = conn.exec_driver_sql(
+        "SELECT value FROM system_config WHERE key = ?", (SCHEMA_VERSION_KEY,)
+    ).scalar()
+    return int(value) if value else 0
+
+
+def _set_schema_version(conn: Connection, version: int) -> None:
+    conn.exec_driver_sql(
+        "INSERT INTO system_config (key, value, updated_at) VALUES (?, ?, ?) "
+        "ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+        (SCHEMA_VERSION_KEY, str(version), datetime.utcnow()),
+    )
+
+
+def run_migrations(bind: Optional[Engine] = None) -> int:
+    """Apply pending migrations and return the resulting schema version."""
+    bind = bind or database.engine
+
+    with bind.connect() as conn:
+        current = get_schema_version(conn)
+
+    pending = [m for m in MIGRATIONS if m[0] > current]
+    for version, description, migrate in pending:
+        with bind.begin() as conn:
+            logger.info(f"Applying migration {version}: {description}")
+            migrate(conn)
+            _set_schema_version(conn, version)
+        current = version
+
+    if pending:
+        # Refresh planner statistics so the new indexes get picked up
+        with bind.begin() as conn:
+            conn.exec_driver_sql("PRAGMA optimize")
+
+    return current
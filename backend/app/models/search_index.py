@@ -0,0 +1,137 @@
+"""SQLite FTS5 full-text index over account fields.
+
+The ``accounts_fts`` virtual table mirrors the searchable columns of ``accounts``
+(email, note, recovery_email, family_group and the values of custom_fields) and
+shares its rowid. Triggers keep it in sync for every write path, including bulk
+SQL statements that bypass the ORM.
+
+The trigram tokenizer indexes every three-character substring, so a term
+matches anywhere inside a value ("mail" in "@gmail.com", "家庭组" in CJK text
+without spaces), like the substring search it replaced. Terms shorter than
+three characters cannot use the index; ``build_match_query`` returns None for
+them and the caller falls back to a substring scan.
+
+The index is keyed on ``accounts.rowid``, which ``VACUUM`` may renumber; run
+``python -m app.cli rebuild-search-index`` after vacuuming the database.
+"""
+import re
+from typing import Optional
+
+from sqlalchemy import Column, Float, Integer, MetaData, Table, Text, event, literal_column
+from sqlalchemy.engine import Connection
+
+from app.models.database import Base
+
+FTS_TABLE = "accounts_fts"
+TRIGRAM_MIN_LENGTH = 3
+
+# Not part of Base.metadata: the virtual table is created by the DDL below
+accounts_fts = Table(
+    FTS_TABLE,
+    MetaData(),
+    Column("rowid", Integer, primary_key=True),
+    Column("email", Text),
+    Column("note", Text),
+    Column("recovery_email", Text),
+    Column("family_group", Text),
+    Column("custom_fields", Text),
+    Column("rank", Float),
+)
+
+_CUSTOM_FIELDS_TEXT = "(SELECT group_concat(value, ' ') FROM json_each({row}.custom_fields))"
+
+_CREATE_STATEMENTS = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        email, note, recovery_email, family_group, custom_fields,
+        tokenize = 'trigram'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS accounts_fts_ai AFTER INSERT ON accounts BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, email, note, recovery_email, family_group, custom_fields)
+        VALUES (new.rowid, new.email, new.note, new.recovery_email, new.family_group,
+                {_CUSTOM_FIELDS_TEXT.format(row="new")});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS accounts_fts_ad AFTER DELETE ON accounts BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.rowid;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS accounts_fts_au
+    AFTER UPDATE OF email, note, recovery_email, family_group, custom_fields ON accounts BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.rowid;
+        INSERT INTO {FTS_TABLE}(rowid, email, note, recovery_email, family_group, custom_fields)
+        VALUES (new.rowid, new.email, new.note, new.recovery_email, new.family_group,
+                {_CUSTOM_FIELDS_TEXT.format(row="new")});
+    END
+    """,
+]
+
+
+def search_index_tokenizer(connection: Connection) -> Optional[str]:
+    """Tokenizer clause the existing FTS table was created with, None if missing."""
+    sql = connection.exec_driver_sql(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+    ).scalar()
+    match = re.search(r"tokenize\s*=\s*'([^']*)'", sql or "")
+    return match.group(1) if match else None
+
+
+def create_search_index(connection: Connection) -> None:
+    """Create the FTS table and sync triggers, populating it on first creation."""
+    exists = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+    ).first()
+    for statement in _CREATE_STATEMENTS:
+        connection.exec_driver_sql(statement)
+    if not exists:
+        rebuild_search_index(connection)
+
+
+def rebuild_search_index(connection: Connection) -> int:
+    """Re-populate the FTS table from the accounts table. Returns the row count."""
+    connection.exec_driver_sql(f"DELETE FROM {FTS_TABLE}")
+    connection.exec_driver_sql(
+        f"""
+        INSERT INTO {FTS_TABLE}(rowid, email, note, recovery_email, family_group, custom_fields)
+        SELECT rowid, email, note, recovery_email, family_group, {_CUSTOM_FIELDS_TEXT.format(row="accounts")}
+        FROM accounts
+        """
+    )
+    connection.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+    return connection.exec_driver_sql(f"SELECT count(*) FROM {FTS_TABLE}").scalar()
+
+
+def build_match_query(search: str) -> Optional[str]:
+    """Turn free text into an FTS5 query that substring-matches every term.
+
+    Each whitespace-separated term becomes a quoted phrase, so "doe@gm"
+    matches "john.doe@gmail.com". Returns None when the text contains nothing
+    indexable, or a term too short for trigrams.
+    """
+    terms = []
+    for term in search.split():
+        if not re.search(r"\w", term):
+            continue
+        if len(term) < TRIGRAM_MIN_LENGTH:
+            return None
+        terms.append('"{}"'.format(term.replace('"', '""')))
+    return " ".join(terms) or None
+
+
+def match_clause(fts_query: str):
+    """SQL expression matching the FTS table against an FTS5 query."""
+    return literal_column(FTS_TABLE).match(fts_query)
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _after_create(target, connection, **kw):
+    create_search_index(connection)
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def _before_drop(target, connection, **kw):
+    connection.exec_driver_sql(f"DROP TABLE IF EXISTS {FTS_TABLE}")
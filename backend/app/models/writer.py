@@ -0,0 +1,137 @@
+"""Serialized group-commit writer.
+
+SQLite allows one writer at a time, so instead of letting every request open
+its own write transaction and fight over the lock, mutations are queued to a
+single writer thread. The thread takes whatever is queued (up to
+``DB_WRITE_MAX_BATCH_SIZE`` jobs, waiting at most ``DB_WRITE_MAX_WAIT_MS`` for
+more after the first one), runs each job in its own SAVEPOINT and commits the
+whole batch once. Each caller gets its job's result after the batch is durable.
+
+A job is a callable taking a Session. Services called from a job must use
+``commit_or_flush`` instead of ``Session.commit`` so that the batch, not the
+job, decides when to commit.
+"""
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple, TypeVar
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import database
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Session.info flag marking sessions owned by the writer thread
+GROUP_COMMIT = "group_commit"
+
+
+def commit_or_flush(session: Session) -> None:
+    """Commit, or only flush when the session belongs to a group-commit batch."""
+    if session.info.get(GROUP_COMMIT):
+        session.flush()
+    else:
+        session.commit()
+
+
+class GroupCommitWriter:
+    """Single writer thread that commits queued mutations in groups."""
+
+    def __init__(self, max_batch_size: Optional[int] = None, max_wait_ms: Optional[int] = None):
+        self.max_batch_size = max_batch_size or settings.DB_WRITE_MAX_BATCH_SIZE
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else settings.DB_WRITE_MAX_WAIT_MS) / 1000
+        self._queue: "queue.Queue[Optional[Tuple[Callable[[Session], Any], Future]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.jobs = 0
+
+    def start(self) -> None:
+        """Start the writer thread (idempotent)."""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Commit what is queued, then stop the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread:
+            self._queue.put(None)
+            thread.join()
+
+    def submit(self, job: Callable[[Session], T]) -> "Future[T]":
+        """Queue a job and return a future resolved once its batch is committed."""
+        self.start()
+        future: Future = Future()
+        self._queue.put((job, future))
+        return future
+
+    async def run(self, job: Callable[[Session], T]) -> T:
+        """Queue a job and wait for its committed result without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(job))
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+
+            # Gather more jobs until the batch is full or the wait window closes
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._commit_batch(batch)
+
+    def _commit_batch(self, batch: List[Tuple[Callable[[Session], Any], Future]]) -> None:
+        outcomes: List[Tuple[Future, Any, Optional[BaseException]]] = []
+        session = database.WriteSessionLocal()
+        session.info[GROUP_COMMIT] = True
+        try:
+            for job, future in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    # A failing job only rolls back its own savepoint
+                    with session.begin_nested():
+                        result = job(session)
+                    outcomes.append((future, result, None))
+                except Exception as e:
+                    outcomes.append((future, None, e))
+            session.commit()
+        except Exception as e:
+            logger.error(f"Group commit failed: {e}")
+            session.rollback()
+            outcomes = [(future, None, error or e) for future, _, error in outcomes]
+        finally:
+            session.close()
+
+        self.batches += 1
+        self.jobs += len(outcomes)
+        for future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+# Global writer instance
+db_writer = GroupCommitWriter()
@@ -3,6 +3,7 @@ from app.schemas.auth import (
     LoginRequest,
     LoginResponse,
     PasswordChange,
+    KeyRotation,
     TokenData,
     SystemStatus,
 )
@@ -21,7 +22,14 @@ from app.schemas.account import (
     AccountImportRequest,
     AccountImportResult,
     AccountExportRequest,
+    AccountFilter,
+    BatchTarget,
     BatchDeleteRequest,
     BatchTagsRequest,
     BatchUpdateRequest,
+    TotpCodesRequest,
+    TotpCode,
+    TotpCodesResponse,
+    SecretsRequest,
+    SecretsResponse,
 )
@@ -1,8 +1,8 @@
 """Pydantic schemas for accounts."""
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Literal, Optional
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, model_validator
 
 
 class TagBase(BaseModel):
@@ -110,10 +110,12 @@ class AccountListResponse(BaseModel):
     """Schema for paginated account list."""
 
     items: List[AccountResponse]
-    total: int
+    total: Optional[int] = None  # None when requested with with_total=false
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    has_more: bool = False
+    next_cursor: Optional[str] = None
 
 
 class AccountImportRequest(BaseModel):
@@ -128,7 +130,8 @@ class AccountImportResult(BaseModel):
     total: int
     imported: int
     skipped: int
-    errors: List[str]
+    failed: int = 0
+    errors: List[str]  # First IMPORT_MAX_ERRORS row errors, in sheet order
 
 
 class AccountExportRequest(BaseModel):
@@ -139,23 +142,49 @@ class AccountExportRequest(BaseModel):
     account_ids: Optional[List[str]] = None
 
 
-class BatchDeleteRequest(BaseModel):
-    """Schema for batch delete request."""
+class AccountFilter(BaseModel):
+    """The account list filters, selecting every matching live account."""
 
-    account_ids: List[str] = Field(..., min_length=1)
+    search: Optional[str] = None
+    source: Optional[str] = None
+    tag_ids: Optional[List[str]] = None
+    gpt_membership: Optional[str] = None
+
+    @property
+    def is_empty(self) -> bool:
+        """True when no criterion is set, i.e. the filter matches every account."""
+        return not any(self.model_dump().values())
+
+
+class BatchTarget(BaseModel):
+    """Accounts a batch operation applies to: explicit IDs, a non-empty filter, or ``all``."""
+
+    account_ids: Optional[List[str]] = Field(None, min_length=1)
+    filters: Optional[AccountFilter] = None
+    all: bool = False  # Explicit opt-in to apply the operation to every live account
 
+    @model_validator(mode="after")
+    def one_target(self):
+        if sum((self.account_ids is not None, self.filters is not None, self.all)) != 1:
+            raise ValueError("Provide exactly one of account_ids, filters or all")
+        if self.filters is not None and self.filters.is_empty:
+            raise ValueError("filters must set at least one criterion; use all to target every account")
+        return self
 
-class BatchTagsRequest(BaseModel):
+
+class BatchDeleteRequest(BatchTarget):
+    """Schema for batch delete request."""
+
+
+class BatchTagsRequest(BatchTarget):
     """Schema for batch tags update request."""
 
-    account_ids: List[str] = Field(..., min_length=1)
     tag_ids: List[str] = Field(default_factory=list)
 
 
-class BatchUpdateRequest(BaseModel):
+class BatchUpdateRequest(BatchTarget):
     """Schema for batch update request."""
 
-    account_ids: List[str] = Field(..., min_length=1)
     # Include optional update fields
     email: Optional[EmailStr] = None
     note: Optional[str] = None
@@ -166,3 +195,48 @@ class BatchUpdateRequest(BaseModel):
     family_group: Optional[str] = Field(None, max_length=100)
     recovery_email: Optional[EmailStr] = None
     tag_ids: Optional[List[str]] = None
+
+
+class TotpCodesRequest(BaseModel):
+    """Schema for batch TOTP code request: explicit account IDs, or the list filters."""
+
+    account_ids: Optional[List[str]] = Field(None, min_length=1)
+    filters: Optional[AccountFilter] = None
+
+    @model_validator(mode="after")
+    def one_target(self):
+        if self.account_ids is not None and self.filters is not None:
+            raise ValueError("Provide either account_ids or filters")
+        return self
+
+
+class TotpCode(BaseModel):
+    """Current TOTP code of one account."""
+
+    id: str
+    code: Optional[str] = None  # None when the account has no usable secret
+    period: Optional[int] = None
+    seconds_remaining: Optional[int] = None
+
+
+class TotpCodesResponse(BaseModel):
+    """Schema for batch TOTP code response."""
+
+    codes: List[TotpCode]
+    not_found: List[str] = Field(default_factory=list)
+
+
+class SecretsRequest(BaseModel):
+    """Schema for batch secret reveal request."""
+
+    account_ids: List[str] = Field(..., min_length=1)
+    fields: List[Literal["password", "totp_secret"]] = Field(
+        default_factory=lambda: ["password", "totp_secret"], min_length=1
+    )
+
+
+class SecretsResponse(BaseModel):
+    """Schema for batch secret reveal response: decrypted fields by account ID."""
+
+    secrets: Dict[str, Dict[str, Optional[str]]]
+    not_found: List[str] = Field(default_factory=list)
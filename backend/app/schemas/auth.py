@@ -59,6 +59,12 @@ class PasswordChange(BaseModel):
         return v
 
 
+class KeyRotation(BaseModel):
+    """Schema for rotating the vault data key."""
+
+    password: str = Field(..., min_length=1)
+
+
 class TokenData(BaseModel):
     """Schema for JWT token data."""
 
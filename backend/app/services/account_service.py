@@ -1,12 +1,89 @@
 """Account service for CRUD operations."""
-from typing import List, Optional, Tuple
-
-from sqlalchemy import or_, func
-from sqlalchemy.orm import Session
-
-from app.models import Account, Tag
+import base64
+import binascii
+import json
+import time
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+from sqlalchemy import Select, Subquery, delete, func, insert, literal_column, or_, select, true, tuple_, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, undefer, undefer_group
+
+from app.config import settings
+from app.models import Account, Tag, commit_or_flush, db_writer
+from app.models.database import account_tags
+from app.models.search_index import accounts_fts, build_match_query, match_clause
 from app.schemas import AccountCreate, AccountUpdate
 from app.services.crypto_service import crypto_service
+from app.services.totp_service import parse_secret, seconds_remaining, totp, totp_cache
+
+
+# Columns served by the account list, ciphertext reduced to presence flags
+LIST_COLUMNS = (
+    Account.id,
+    Account.email,
+    Account.note,
+    Account.sub2api,
+    Account.source,
+    Account.browser,
+    Account.gpt_membership,
+    Account.family_group,
+    Account.recovery_email,
+    Account.has_password,
+    Account.has_totp,
+    Account.custom_fields,
+    Account.created_at,
+    Account.updated_at,
+)
+LIST_COLUMN_NAMES = tuple(column.key for column in LIST_COLUMNS)
+
+# Revealable fields and their ciphertext columns
+SECRET_FIELDS = {"password": Account.password_encrypted, "totp_secret": Account.totp_secret_encrypted}
+SECRET_FIELD_NAMES = tuple(SECRET_FIELDS)
+SECRET_FLAGS = {"password": Account.has_password, "totp_secret": Account.has_totp}
+
+# Plain columns the batch update may set with one UPDATE (secrets need per-row encryption)
+BULK_UPDATE_FIELDS = (
+    "email", "note", "sub2api", "source", "browser", "gpt_membership", "family_group", "recovery_email",
+)
+
+# Loader options for the deferred Account columns
+DETAIL_OPTIONS = (undefer(Account.custom_fields),)
+EXPORT_OPTIONS = (undefer(Account.custom_fields), undefer_group("secrets"))
+
+
+T = TypeVar("T")
+
+# An import row ready to write: the sheet row numbers it stands for (duplicate
+# emails are folded into one row) and its column values
+ImportRow = Tuple[List[int], Dict[str, object]]
+
+
+def chunked(items: Sequence[T], size: Optional[int] = None) -> Iterator[Sequence[T]]:
+    """Split items into slices small enough for one ``IN (...)`` statement."""
+    size = size or settings.DB_IN_CHUNK_SIZE
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def encode_cursor(created_at: datetime, account_id: str) -> str:
+    """Encode a (created_at, id) listing position as an opaque cursor."""
+    payload = json.dumps([created_at.isoformat(), account_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a cursor produced by encode_cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, account_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), str(account_id)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
 
 
 class AccountService:
@@ -15,52 +92,183 @@ class AccountService:
     def __init__(self, db: Session):
         self.db = db
 
-    def get_accounts(
+    def _filtered(
         self,
-        page: int = 1,
-        page_size: int = 20,
+        stmt: Select,
         search: Optional[str] = None,
         source: Optional[str] = None,
         tag_ids: Optional[List[str]] = None,
         gpt_membership: Optional[str] = None,
-    ) -> Tuple[List[Account], int]:
-        """Get paginated list of accounts with optional filters."""
-        query = self.db.query(Account).filter(Account.is_deleted == False)
-
-        # Apply search filter
-        if search:
-            search_pattern = f"%{search}%"
-            query = query.filter(
-                or_(
-                    Account.email.ilike(search_pattern),
-                    Account.note.ilike(search_pattern),
-                )
+    ) -> Tuple[Select, Optional[Subquery]]:
+        """Apply the list filters to a select over accounts.
+
+        Returns the filtered statement and, when the search went through the
+        full-text index, the ranked match subquery joined into it.
+        """
+        stmt = stmt.where(Account.is_deleted == False)
+
+        # Apply search filter through the FTS index, ranked by relevance
+        fts_query = build_match_query(search) if search else None
+        ranked = None
+        if fts_query:
+            ranked = (
+                select(accounts_fts.c.rowid, accounts_fts.c.rank)
+                .where(match_clause(fts_query))
+                .subquery()
             )
+            stmt = stmt.join(ranked, ranked.c.rowid == literal_column("accounts.rowid"))
+        elif search:
+            # Nothing indexable (punctuation, or terms under three characters such as
+            # two-character CJK words): substring scan over the same fields, every term
+            for term in search.split():
+                pattern = f"%{term}%"
+                custom_values = func.json_each(Account.custom_fields).table_valued("value")
+                stmt = stmt.where(
+                    or_(
+                        Account.email.ilike(pattern),
+                        Account.note.ilike(pattern),
+                        Account.recovery_email.ilike(pattern),
+                        Account.family_group.ilike(pattern),
+                        select(custom_values.c.value).where(custom_values.c.value.ilike(pattern)).exists(),
+                    )
+                )
 
         # Apply source filter
         if source:
-            query = query.filter(Account.source == source)
+            stmt = stmt.where(Account.source == source)
 
         # Apply GPT membership filter
         if gpt_membership:
-            query = query.filter(Account.gpt_membership == gpt_membership)
+            stmt = stmt.where(Account.gpt_membership == gpt_membership)
 
         # Apply tag filter
         if tag_ids:
-            query = query.filter(Account.tags.any(Tag.id.in_(tag_ids)))
-
-        # Get total count
-        total = query.count()
+            stmt = stmt.where(Account.tags.any(Tag.id.in_(tag_ids)))
 
-        # Apply pagination
-        offset = (page - 1) * page_size
-        accounts = query.order_by(Account.created_at.desc()).offset(offset).limit(page_size).all()
+        return stmt, ranked
 
-        return accounts, total
+    def _paginate(
+        self,
+        stmt: Select,
+        ranked: Optional[Subquery],
+        page: int,
+        page_size: int,
+        cursor: Optional[str],
+        with_total: bool,
+    ) -> Tuple[list, Optional[int], bool]:
+        """Execute one page of a filtered select.
+
+        The total rides along as a scalar subquery column named ``total`` so the
+        page and the count come back from one statement. One row past the page is
+        fetched to derive ``has_more``.
+        """
+        count_stmt = stmt.with_only_columns(func.count(Account.id))
+        if with_total:
+            stmt = stmt.add_columns(count_stmt.scalar_subquery().label("total"))
+
+        # Apply pagination, id breaks ties between equal timestamps
+        if ranked is not None:
+            if cursor:
+                raise ValueError("Cursor pagination cannot be combined with search")
+            stmt = stmt.order_by(ranked.c.rank)
+        stmt = stmt.order_by(Account.created_at.desc(), Account.id.desc())
+        if cursor:
+            created_at, account_id = decode_cursor(cursor)
+            stmt = stmt.where(tuple_(Account.created_at, Account.id) < tuple_(created_at, account_id))
+        else:
+            stmt = stmt.offset((page - 1) * page_size)
+        rows = self.db.execute(stmt.limit(page_size + 1)).all()
+
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if not with_total:
+            return rows, None, has_more
+
+        if rows:
+            total = rows[0].total
+        elif page == 1 and not cursor:
+            total = 0
+        else:
+            # Past the last page: no row carried the total, count separately
+            total = self.db.execute(count_stmt).scalar()
+        return rows, total, has_more
 
-    def get_account_by_id(self, account_id: str) -> Optional[Account]:
+    def get_accounts(
+        self,
+        page: int = 1,
+        page_size: int = 20,
+        search: Optional[str] = None,
+        source: Optional[str] = None,
+        tag_ids: Optional[List[str]] = None,
+        gpt_membership: Optional[str] = None,
+        cursor: Optional[str] = None,
+        with_total: bool = True,
+        options: tuple = (),
+    ) -> Tuple[List[Account], Optional[int], bool]:
+        """Get paginated list of accounts with optional filters.
+
+        When ``cursor`` is given, the page starts right after the cursor position
+        (keyset pagination) and ``page`` is ignored. ``search`` prefix-matches
+        against the full-text index and orders results by relevance first.
+
+        The page and the total come back from a single statement. With
+        ``with_total=False`` no counting happens and total is None; ``has_more``
+        is always derived from fetching one row past the page.
+
+        Ciphertext and custom_fields are deferred; pass ``options`` (e.g.
+        EXPORT_OPTIONS) to load them with the page.
+        """
+        stmt, ranked = self._filtered(select(Account).options(*options), search, source, tag_ids, gpt_membership)
+        rows, total, has_more = self._paginate(stmt, ranked, page, page_size, cursor, with_total)
+        return [row[0] for row in rows], total, has_more
+
+    def list_account_rows(
+        self,
+        page: int = 1,
+        page_size: int = 20,
+        search: Optional[str] = None,
+        source: Optional[str] = None,
+        tag_ids: Optional[List[str]] = None,
+        gpt_membership: Optional[str] = None,
+        cursor: Optional[str] = None,
+        with_total: bool = True,
+    ) -> Tuple[List[dict], Optional[int], bool]:
+        """Lightweight variant of get_accounts for the list endpoint.
+
+        Selects only the listed columns (no ciphertext, only the stored
+        has_password / has_totp flags), batch-loads tag briefs with one extra query and returns
+        plain dicts shaped like AccountResponse.
+        """
+        stmt, ranked = self._filtered(
+            select(*LIST_COLUMNS), search, source, tag_ids, gpt_membership
+        )
+        rows, total, has_more = self._paginate(stmt, ranked, page, page_size, cursor, with_total)
+
+        items = [{name: row._mapping[name] for name in LIST_COLUMN_NAMES} for row in rows]
+        tags_by_account = self.get_tag_briefs([item["id"] for item in items])
+        for item in items:
+            item["custom_fields"] = item["custom_fields"] or {}
+            item["tags"] = tags_by_account.get(item["id"], [])
+        return items, total, has_more
+
+    def get_tag_briefs(self, account_ids: List[str]) -> Dict[str, List[dict]]:
+        """Map account ID to its tag briefs, loaded with a single query."""
+        if not account_ids:
+            return {}
+        rows = self.db.execute(
+            select(account_tags.c.account_id, Tag.id, Tag.name, Tag.color)
+            .join(Tag, Tag.id == account_tags.c.tag_id)
+            .where(account_tags.c.account_id.in_(account_ids))
+            .order_by(Tag.name)
+        ).all()
+        tags_by_account: Dict[str, List[dict]] = {}
+        for account_id, tag_id, name, color in rows:
+            tags_by_account.setdefault(account_id, []).append({"id": tag_id, "name": name, "color": color})
+        return tags_by_account
+
+    def get_account_by_id(self, account_id: str, options: tuple = ()) -> Optional[Account]:
         """Get account by ID."""
-        return self.db.query(Account).filter(
+        return self.db.query(Account).options(*options).filter(
             Account.id == account_id,
             Account.is_deleted == False
         ).first()
@@ -72,6 +280,15 @@ class AccountService:
             Account.is_deleted == False
         ).first()
 
+    def _refresh(self, account: Account) -> None:
+        """Reload an account after a write, including custom_fields (refresh skips deferred columns)."""
+        self.db.execute(
+            select(Account)
+            .options(*DETAIL_OPTIONS)
+            .where(Account.id == account.id)
+            .execution_options(populate_existing=True)
+        ).scalar_one()
+
     def create_account(self, data: AccountCreate) -> Account:
         """Create a new account."""
         # Check if email already exists
@@ -109,14 +326,14 @@ class AccountService:
             account.tags = tags
 
         self.db.add(account)
-        self.db.commit()
-        self.db.refresh(account)
+        commit_or_flush(self.db)
+        self._refresh(account)
 
         return account
 
     def update_account(self, account_id: str, data: AccountUpdate) -> Optional[Account]:
         """Update an existing account."""
-        account = self.get_account_by_id(account_id)
+        account = self.get_account_by_id(account_id, options=DETAIL_OPTIONS)
         if not account:
             return None
 
@@ -150,8 +367,8 @@ class AccountService:
         for key, value in update_data.items():
             setattr(account, key, value)
 
-        self.db.commit()
-        self.db.refresh(account)
+        commit_or_flush(self.db)
+        self._refresh(account)
 
         return account
 
@@ -166,24 +383,431 @@ class AccountService:
         else:
             account.is_deleted = True
 
-        self.db.commit()
+        commit_or_flush(self.db)
         return True
 
+    def _targets(self, account_ids: Optional[List[str]] = None, filters: Optional[dict] = None) -> Iterator[tuple]:
+        """WHERE clauses selecting the live accounts a batch operation applies to.
+
+        Explicit IDs give one clause per chunk of ``DB_IN_CHUNK_SIZE``; list
+        filters give a single clause with the filtered query as a subquery, so
+        the matching accounts never travel through Python. An empty ``filters``
+        dict selects every live account; passing neither raises ValueError.
+        """
+        if account_ids is None and filters is None:
+            raise ValueError("Batch operations need account_ids or filters")
+        if account_ids is not None:
+            for chunk in chunked(list(dict.fromkeys(account_ids))):
+                yield Account.id.in_(chunk), Account.is_deleted == False
+        else:
+            stmt, _ = self._filtered(select(Account.id), **filters)
+            yield (Account.id.in_(stmt.correlate(None)),)
+
+    def count_accounts(self, account_ids: Optional[List[str]] = None, filters: Optional[dict] = None) -> int:
+        """Number of live accounts a batch operation would touch (dry run)."""
+        return sum(
+            self.db.scalar(select(func.count()).select_from(Account).where(*target))
+            for target in self._targets(account_ids, filters)
+        )
+
+    def delete_accounts(
+        self, account_ids: Optional[List[str]] = None, hard_delete: bool = False, filters: Optional[dict] = None
+    ) -> int:
+        """Delete many live accounts with set-based statements; returns how many were deleted.
+
+        The accounts are the given IDs or those matching the list ``filters``.
+        One UPDATE (soft) per chunk of IDs or per filter. Hard deletes first
+        fix the set of accounts (a tag filter stops matching once the links
+        are gone), then DELETE the tag links and the accounts per chunk of
+        those IDs. All in the caller's transaction; unknown and already
+        deleted IDs are not counted.
+        """
+        deleted = 0
+        for target in self._targets(account_ids, filters):
+            if not hard_delete:
+                result = self.db.execute(
+                    update(Account)
+                    .where(*target)
+                    .values(is_deleted=True, updated_at=datetime.utcnow())
+                    .execution_options(synchronize_session=False)
+                )
+                deleted += result.rowcount
+                continue
+            found = self.db.scalars(select(Account.id).where(*target)).all()
+            for chunk in chunked(found):
+                self.db.execute(delete(account_tags).where(account_tags.c.account_id.in_(chunk)))
+                result = self.db.execute(
+                    delete(Account).where(Account.id.in_(chunk)).execution_options(synchronize_session=False)
+                )
+                deleted += result.rowcount
+
+        commit_or_flush(self.db)
+        return deleted
+
+    def update_tags(
+        self,
+        account_ids: Optional[List[str]],
+        tag_ids: List[str],
+        action: str = "add",
+        filters: Optional[dict] = None,
+    ) -> int:
+        """Add, remove or set tags on many live accounts; returns how many accounts were updated.
+
+        The accounts are the given IDs or those matching the list ``filters``.
+        One UPDATE ... RETURNING touches updated_at and fixes the set of
+        accounts (a tag filter may stop matching once links change), then
+        ``account_tags`` is changed directly per chunk: one DELETE
+        (remove/set) and/or one INSERT OR IGNORE ... SELECT (add/set, unknown
+        tag IDs drop out of the join).
+        """
+        if action not in ("add", "remove", "set"):
+            raise ValueError(f"Unknown tag action: {action}")
+        now = datetime.utcnow()
+        updated = 0
+        for target in self._targets(account_ids, filters):
+            found = self._touch(target, {"updated_at": now})
+            for chunk in chunked(found):
+                self._update_tag_links((Account.id.in_(chunk),), tag_ids, action)
+            updated += len(found)
+
+        commit_or_flush(self.db)
+        return updated
+
+    def _touch(self, target: tuple, values: Dict[str, object]) -> List[str]:
+        """UPDATE the accounts matching ``target``; returns their IDs."""
+        return self.db.scalars(
+            update(Account)
+            .where(*target)
+            .values(**values)
+            .returning(Account.id)
+            .execution_options(synchronize_session=False)
+        ).all()
+
+    def _update_tag_links(self, accounts: tuple, tag_ids: List[str], action: str) -> None:
+        """Apply a tag action to the account_tags rows of the accounts matching ``accounts``."""
+        if action != "add":
+            links = delete(account_tags).where(account_tags.c.account_id.in_(select(Account.id).where(*accounts)))
+            if action == "remove":
+                links = links.where(account_tags.c.tag_id.in_(tag_ids))
+            self.db.execute(links)
+        if action != "remove" and tag_ids:
+            self.db.execute(
+                insert(account_tags)
+                .prefix_with("OR IGNORE")
+                .from_select(
+                    ["account_id", "tag_id"],
+                    # Deliberate cross join: every matching account x every existing tag
+                    select(Account.id, Tag.id).join(Tag, true()).where(*accounts, Tag.id.in_(tag_ids)),
+                )
+            )
+
+    def update_accounts(
+        self, account_ids: Optional[List[str]], values: Dict[str, object], filters: Optional[dict] = None
+    ) -> Tuple[int, List[str]]:
+        """Apply the same field values to many live accounts; returns (updated count, missing IDs).
+
+        The accounts are the given IDs or those matching the list ``filters``.
+        ``values`` holds plain account columns plus an optional ``tag_ids``
+        (replaces the tags). Per chunk of IDs, or per filter, this is one
+        UPDATE ... RETURNING id, plus the tag link statements of
+        ``update_tags``. Nulls for the non-nullable ``email`` / ``sub2api``
+        mean "leave unchanged".
+        """
+        values = dict(values)
+        tag_ids = values.pop("tag_ids", None)
+        unknown = set(values) - set(BULK_UPDATE_FIELDS)
+        if unknown:
+            raise ValueError(f"Fields cannot be bulk updated: {', '.join(sorted(unknown))}")
+        values = {k: v for k, v in values.items() if v is not None or Account.__table__.c[k].nullable}
+
+        if "email" in values:
+            if account_ids is None or len(set(account_ids)) > 1:
+                raise ValueError("Email must be unique and cannot be set on several accounts")
+            existing = self.get_account_by_email(values["email"])
+            if existing and existing.id not in account_ids:
+                raise ValueError(f"Account with email {values['email']} already exists")
+
+        values["updated_at"] = datetime.utcnow()
+        updated = 0
+        found_ids = set()
+        for target in self._targets(account_ids, filters):
+            found = self._touch(target, values)
+            if tag_ids is not None:
+                for chunk in chunked(found):
+                    self._update_tag_links((Account.id.in_(chunk),), tag_ids, "set")
+            updated += len(found)
+            found_ids.update(found)
+
+        commit_or_flush(self.db)
+        missing = [] if account_ids is None else [i for i in dict.fromkeys(account_ids) if i not in found_ids]
+        return updated, missing
+
+    def get_import_conflicts(self, emails: List[str]) -> Dict[str, Row]:
+        """Existing accounts (deleted ones included) among ``emails``, by email.
+
+        One query per chunk of ``DB_IN_CHUNK_SIZE`` emails; each row carries
+        ``is_deleted``, ``has_password`` and ``has_totp``.
+        """
+        found: Dict[str, Row] = {}
+        for chunk in chunked(list(dict.fromkeys(emails))):
+            rows = self.db.execute(
+                select(Account.email, Account.is_deleted, Account.has_password, Account.has_totp)
+                .where(Account.email.in_(chunk))
+            ).all()
+            found.update((row.email, row) for row in rows)
+        return found
+
+    @staticmethod
+    def plan_import(
+        rows: List[Tuple[int, Dict[str, object]]], conflict_strategy: str, existing: Dict[str, Row]
+    ) -> Tuple[List[ImportRow], int, List[Tuple[int, str]]]:
+        """Decide what an import writes; returns (rows to write, skipped count, row errors).
+
+        Rows repeating an email are folded into the first one, the way
+        importing them one after the other would have ended: ``skip`` keeps the
+        first, ``overwrite`` lets later values win, ``merge`` only fills what
+        is still missing. Emails of deleted accounts cannot be imported. With
+        ``merge``, secrets the account already has are dropped here so they
+        are never encrypted.
+        """
+        planned: Dict[str, ImportRow] = {}
+        skipped = 0
+        errors: List[Tuple[int, str]] = []
+        for row_number, data in rows:
+            email = data["email"]
+            current = existing.get(email)
+            if current is not None and current.is_deleted:
+                errors.append((row_number, f"Account with email {email} is deleted"))
+            elif conflict_strategy == "skip" and (current is not None or email in planned):
+                skipped += 1
+            elif email in planned:
+                row_numbers, values = planned[email]
+                row_numbers.append(row_number)
+                if conflict_strategy == "overwrite":
+                    values.update(data)
+                else:
+                    for key, value in data.items():
+                        values.setdefault(key, value)
+            else:
+                planned[email] = ([row_number], dict(data))
+
+        if conflict_strategy == "merge":
+            for email, (_, values) in planned.items():
+                current = existing.get(email)
+                for field, flag in SECRET_FLAGS.items():
+                    if current is not None and getattr(current, flag.key):
+                        values.pop(field, None)
+        return list(planned.values()), skipped, errors
+
+    @staticmethod
+    def encrypt_import_rows(rows: List[ImportRow]) -> None:
+        """Replace plaintext secrets by ciphertext and presence flags, in one bulk call."""
+        plaintexts = [values.pop(field, None) or None for _, values in rows for field in SECRET_FIELD_NAMES]
+        encrypted = iter(crypto_service.encrypt_many(plaintexts))
+        for _, values in rows:
+            for field in SECRET_FIELD_NAMES:
+                ciphertext = next(encrypted)
+                if ciphertext is not None:
+                    values[SECRET_FIELDS[field].key] = ciphertext
+                    values[SECRET_FLAGS[field].key] = True
+
+    def upsert_accounts(self, rows: List[ImportRow], conflict_strategy: str) -> List[Tuple[int, str]]:
+        """Write prepared import rows; returns (row number, message) for the rows that failed.
+
+        Rows are grouped by the columns they carry and each group is one
+        ``INSERT ... ON CONFLICT(email)`` statement: DO NOTHING for ``skip``,
+        DO UPDATE for ``overwrite`` / ``merge`` (never on deleted accounts).
+        Should the bulk write fail, it is rolled back to a savepoint and
+        retried row by row, so each error is reported on its own row.
+        """
+        errors: List[Tuple[int, str]] = []
+        try:
+            with self.db.begin_nested():
+                self._upsert(rows, conflict_strategy)
+        except SQLAlchemyError:
+            for row in rows:
+                try:
+                    with self.db.begin_nested():
+                        self._upsert([row], conflict_strategy)
+                except SQLAlchemyError as e:
+                    errors.extend((row_number, str(getattr(e, "orig", None) or e)) for row_number in row[0])
+
+        commit_or_flush(self.db)
+        return errors
+
+    def _upsert(self, rows: List[ImportRow], conflict_strategy: str) -> None:
+        now = datetime.utcnow()
+        groups: Dict[Tuple[str, ...], List[Dict[str, object]]] = {}
+        for _, values in rows:
+            groups.setdefault(tuple(sorted(values)), []).append(values)
+
+        for columns, group in groups.items():
+            stmt = sqlite_insert(Account)
+            updates = self._import_updates(stmt.excluded, columns, conflict_strategy)
+            if updates:
+                updates["updated_at"] = now
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[Account.email], set_=updates, where=Account.is_deleted == False
+                )
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=[Account.email])
+            self.db.execute(stmt, group)
+
+    @staticmethod
+    def _import_updates(excluded, columns: Tuple[str, ...], conflict_strategy: str) -> Dict[str, object]:
+        """SET clause applied when an imported email already exists."""
+        if conflict_strategy == "skip":
+            return {}
+        current = Account.__table__.c
+        updates: Dict[str, object] = {}
+        for column in columns:
+            if column == "email":
+                continue
+            if conflict_strategy == "overwrite" or column in ("has_password", "has_totp"):
+                updates[column] = excluded[column]
+            elif column in ("password_encrypted", "totp_secret_encrypted"):
+                updates[column] = func.coalesce(current[column], excluded[column])
+            elif column != "sub2api":  # merge: a stored flag is never "empty"
+                updates[column] = func.coalesce(func.nullif(current[column], ""), excluded[column])
+        return updates
+
+    def _get_ciphertext(self, account_id: str, column) -> Optional[bytes]:
+        """Load a single ciphertext column without materializing the account."""
+        return self.db.execute(
+            select(column).where(Account.id == account_id, Account.is_deleted == False)
+        ).scalar()
+
     def get_decrypted_password(self, account_id: str) -> Optional[str]:
         """Get decrypted password for an account."""
-        account = self.get_account_by_id(account_id)
-        if not account or not account.password_encrypted:
+        encrypted = self._get_ciphertext(account_id, Account.password_encrypted)
+        if not encrypted:
             return None
 
-        return crypto_service.decrypt(account.password_encrypted)
+        return crypto_service.decrypt(encrypted)
 
     def get_decrypted_totp(self, account_id: str) -> Optional[str]:
         """Get decrypted TOTP secret for an account."""
-        account = self.get_account_by_id(account_id)
-        if not account or not account.totp_secret_encrypted:
+        encrypted = self._get_ciphertext(account_id, Account.totp_secret_encrypted)
+        if not encrypted:
             return None
 
-        return crypto_service.decrypt(account.totp_secret_encrypted)
+        return crypto_service.decrypt(encrypted)
+
+    def get_ciphertexts(
+        self, account_ids: List[str], fields: Tuple[str, ...] = SECRET_FIELD_NAMES
+    ) -> Tuple[Dict[str, tuple], List[str]]:
+        """Load only the requested ciphertext columns for many accounts.
+
+        One IN query per chunk of ``DB_IN_CHUNK_SIZE`` IDs. Returns
+        ``{account_id: (ciphertext per field)}`` in request order and the IDs
+        that do not exist (or are deleted).
+        """
+        if len(account_ids) > settings.SECRETS_MAX_ACCOUNTS:
+            raise ValueError(f"At most {settings.SECRETS_MAX_ACCOUNTS} accounts per request")
+        columns = [SECRET_FIELDS[field] for field in fields]
+        requested = list(dict.fromkeys(account_ids))
+        found: Dict[str, tuple] = {}
+        for chunk in chunked(requested):
+            found.update(
+                (row[0], tuple(row[1:]))
+                for row in self.db.execute(
+                    select(Account.id, *columns).where(Account.id.in_(chunk), Account.is_deleted == False)
+                )
+            )
+        return (
+            {account_id: found[account_id] for account_id in requested if account_id in found},
+            [account_id for account_id in requested if account_id not in found],
+        )
+
+    @staticmethod
+    def decrypt_secrets(
+        ciphertexts: Dict[str, tuple], fields: Tuple[str, ...] = SECRET_FIELD_NAMES
+    ) -> Dict[str, Dict[str, Optional[str]]]:
+        """Decrypt the output of get_ciphertexts in one batch; empty values become None."""
+        plaintexts = iter(crypto_service.decrypt_many(
+            [blob or None for row in ciphertexts.values() for blob in row]
+        ))
+        return {
+            account_id: {field: next(plaintexts) for field in fields}
+            for account_id in ciphertexts
+        }
+
+    def get_secrets(
+        self, account_ids: List[str], fields: Tuple[str, ...] = SECRET_FIELD_NAMES
+    ) -> Tuple[Dict[str, Dict[str, Optional[str]]], List[str]]:
+        """Decrypted secrets for many accounts, and the IDs not found."""
+        ciphertexts, not_found = self.get_ciphertexts(account_ids, fields)
+        return self.decrypt_secrets(ciphertexts, fields), not_found
+
+    def get_totp_ciphertexts(
+        self, account_ids: Optional[List[str]] = None, filters: Optional[dict] = None
+    ) -> Tuple[List[Tuple[str, Optional[bytes]]], List[str]]:
+        """TOTP ciphertexts for the given accounts, or for those matching the list filters.
+
+        Only the ciphertext column is loaded. Returns ``(id, ciphertext)`` pairs
+        in request (or list) order and the requested IDs that do not exist.
+        Without ``account_ids``, up to ``TOTP_CODES_MAX_ACCOUNTS`` matching
+        accounts that have a secret are returned.
+        """
+        limit = settings.TOTP_CODES_MAX_ACCOUNTS
+        stmt = select(Account.id, Account.totp_secret_encrypted)
+        if account_ids is None:
+            stmt, _ = self._filtered(stmt.where(Account.has_totp == True), **(filters or {}))
+            rows = self.db.execute(stmt.order_by(Account.created_at.desc(), Account.id.desc()).limit(limit)).all()
+            return [tuple(row) for row in rows], []
+
+        if len(account_ids) > limit:
+            raise ValueError(f"At most {limit} accounts per request")
+        requested = list(dict.fromkeys(account_ids))
+        found: Dict[str, Optional[bytes]] = {}
+        for chunk in chunked(requested):
+            found.update(self.db.execute(stmt.where(Account.id.in_(chunk), Account.is_deleted == False)).all())
+        return (
+            [(account_id, found[account_id]) for account_id in requested if account_id in found],
+            [account_id for account_id in requested if account_id not in found],
+        )
+
+    @staticmethod
+    def compute_totp_codes(rows: List[Tuple[str, Optional[bytes]]], now: Optional[float] = None) -> List[dict]:
+        """Current codes for the output of get_totp_ciphertexts.
+
+        Secrets not in the per-window cache are decrypted in one batch.
+        ``code`` is None for accounts without a usable secret.
+        """
+        now = time.time() if now is None else now
+        ciphertexts = [ciphertext for _, ciphertext in rows if ciphertext]
+        secrets = totp_cache.get_many(ciphertexts, now)
+        missing = list(dict.fromkeys(c for c in ciphertexts if c not in secrets))
+        if missing:
+            parsed = {}
+            for ciphertext, plaintext in zip(missing, crypto_service.decrypt_many(missing)):
+                try:
+                    parsed[ciphertext] = parse_secret(plaintext)
+                except ValueError:
+                    parsed[ciphertext] = None
+            totp_cache.put_many(parsed, now)
+            secrets.update(parsed)
+
+        codes = []
+        for account_id, ciphertext in rows:
+            secret = secrets.get(ciphertext) if ciphertext else None
+            codes.append({
+                "id": account_id,
+                "code": totp(secret, now) if secret else None,
+                "period": secret.period if secret else None,
+                "seconds_remaining": seconds_remaining(secret, now) if secret else None,
+            })
+        return codes
+
+    def get_totp_codes(
+        self,
+        account_ids: Optional[List[str]] = None,
+        filters: Optional[dict] = None,
+        now: Optional[float] = None,
+    ) -> Tuple[List[dict], List[str]]:
+        """Current TOTP codes for the given accounts, or for those matching the list filters."""
+        rows, not_found = self.get_totp_ciphertexts(account_ids, filters)
+        return self.compute_totp_codes(rows, now), not_found
 
     def get_sources(self) -> List[str]:
         """Get all unique sources."""
@@ -212,3 +836,166 @@ class AccountService:
             "with_gpt_membership": with_gpt,
             "by_source": {s or "unknown": c for s, c in by_source},
         }
+
+
+class AsyncAccountService:
+    """Async variant of AccountService bound to an AsyncSession.
+
+    The query logic is shared with AccountService. Reads run through
+    ``AsyncSession.run_sync`` on the read-only pool: statements are sent over the
+    aiosqlite driver and awaited, so other requests keep running while the
+    database works. Mutations are queued to the group-commit writer.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_accounts(
+        self,
+        page: int = 1,
+        page_size: int = 20,
+        search: Optional[str] = None,
+        source: Optional[str] = None,
+        tag_ids: Optional[List[str]] = None,
+        gpt_membership: Optional[str] = None,
+        cursor: Optional[str] = None,
+        with_total: bool = True,
+        options: tuple = (),
+    ) -> Tuple[List[Account], Optional[int], bool]:
+        """Get paginated list of accounts with optional filters."""
+        return await self.db.run_sync(
+            lambda session: AccountService(session).get_accounts(
+                page=page,
+                page_size=page_size,
+                search=search,
+                source=source,
+                tag_ids=tag_ids,
+                gpt_membership=gpt_membership,
+                cursor=cursor,
+                with_total=with_total,
+                options=options,
+            )
+        )
+
+    async def list_account_rows(
+        self,
+        page: int = 1,
+        page_size: int = 20,
+        search: Optional[str] = None,
+        source: Optional[str] = None,
+        tag_ids: Optional[List[str]] = None,
+        gpt_membership: Optional[str] = None,
+        cursor: Optional[str] = None,
+        with_total: bool = True,
+    ) -> Tuple[List[dict], Optional[int], bool]:
+        """Lightweight variant of get_accounts for the list endpoint."""
+        return await self.db.run_sync(
+            lambda session: AccountService(session).list_account_rows(
+                page=page,
+                page_size=page_size,
+                search=search,
+                source=source,
+                tag_ids=tag_ids,
+                gpt_membership=gpt_membership,
+                cursor=cursor,
+                with_total=with_total,
+            )
+        )
+
+    async def get_account_by_id(self, account_id: str, options: tuple = ()) -> Optional[Account]:
+        """Get account by ID."""
+        return await self.db.run_sync(
+            lambda session: AccountService(session).get_account_by_id(account_id, options=options)
+        )
+
+    async def get_account_by_email(self, email: str) -> Optional[Account]:
+        """Get account by email."""
+        return await self.db.run_sync(lambda session: AccountService(session).get_account_by_email(email))
+
+    async def create_account(self, data: AccountCreate) -> Account:
+        """Create a new account."""
+        return await db_writer.run(lambda session: AccountService(session).create_account(data))
+
+    async def update_account(self, account_id: str, data: AccountUpdate) -> Optional[Account]:
+        """Update an existing account."""
+        return await db_writer.run(lambda session: AccountService(session).update_account(account_id, data))
+
+    async def delete_account(self, account_id: str, hard_delete: bool = False) -> bool:
+        """Delete an account (soft or hard delete)."""
+        return await db_writer.run(
+            lambda session: AccountService(session).delete_account(account_id, hard_delete=hard_delete)
+        )
+
+    async def count_accounts(self, account_ids: Optional[List[str]] = None, filters: Optional[dict] = None) -> int:
+        """Number of live accounts a batch operation would touch."""
+        return await self.db.run_sync(lambda session: AccountService(session).count_accounts(account_ids, filters))
+
+    async def delete_accounts(
+        self, account_ids: Optional[List[str]] = None, hard_delete: bool = False, filters: Optional[dict] = None
+    ) -> int:
+        """Delete many accounts in one writer job; returns how many were deleted."""
+        return await db_writer.run(
+            lambda session: AccountService(session).delete_accounts(
+                account_ids, hard_delete=hard_delete, filters=filters
+            )
+        )
+
+    async def update_tags(
+        self,
+        account_ids: Optional[List[str]],
+        tag_ids: List[str],
+        action: str = "add",
+        filters: Optional[dict] = None,
+    ) -> int:
+        """Add, remove or set tags on many accounts in one writer job."""
+        return await db_writer.run(
+            lambda session: AccountService(session).update_tags(account_ids, tag_ids, action=action, filters=filters)
+        )
+
+    async def update_accounts(
+        self, account_ids: Optional[List[str]], values: Dict[str, object], filters: Optional[dict] = None
+    ) -> Tuple[int, List[str]]:
+        """Apply the same field values to many accounts in one writer job."""
+        return await db_writer.run(
+            lambda session: AccountService(session).update_accounts(account_ids, values, filters=filters)
+        )
+
+    async def get_import_conflicts(self, emails: List[str]) -> Dict[str, Row]:
+        """Existing accounts (deleted ones included) among ``emails``, by email."""
+        return await self.db.run_sync(lambda session: AccountService(session).get_import_conflicts(emails))
+
+    async def upsert_accounts(self, rows: List[ImportRow], conflict_strategy: str) -> List[Tuple[int, str]]:
+        """Write one chunk of prepared import rows in one writer job."""
+        return await db_writer.run(lambda session: AccountService(session).upsert_accounts(rows, conflict_strategy))
+
+    async def get_decrypted_password(self, account_id: str) -> Optional[str]:
+        """Get decrypted password for an account."""
+        return await self.db.run_sync(lambda session: AccountService(session).get_decrypted_password(account_id))
+
+    async def get_decrypted_totp(self, account_id: str) -> Optional[str]:
+        """Get decrypted TOTP secret for an account."""
+        return await self.db.run_sync(lambda session: AccountService(session).get_decrypted_totp(account_id))
+
+    async def get_ciphertexts(
+        self, account_ids: List[str], fields: Tuple[str, ...] = SECRET_FIELD_NAMES
+    ) -> Tuple[Dict[str, tuple], List[str]]:
+        """Load only the requested ciphertext columns for many accounts, chunked IN queries."""
+        return await self.db.run_sync(
+            lambda session: AccountService(session).get_ciphertexts(account_ids, fields)
+        )
+
+    async def get_totp_ciphertexts(
+        self, account_ids: Optional[List[str]] = None, filters: Optional[dict] = None
+    ) -> Tuple[List[Tuple[str, Optional[bytes]]], List[str]]:
+        """TOTP ciphertexts for the given accounts, or for those matching the list filters."""
+        return await self.db.run_sync(
+            lambda session: AccountService(session).get_totp_ciphertexts(account_ids, filters)
+        )
+
+    async def get_sources(self) -> List[str]:
+        """Get all unique sources."""
+        return await self.db.run_sync(lambda session: AccountService(session).get_sources())
+
+    async def get_stats(self) -> dict:
+        """Get account statistics."""
+        return await self.db.run_sync(lambda session: AccountService(session).get_stats())
@@ -1,15 +1,31 @@
 """Authentication service for managing master password and sessions."""
 import base64
+import json
+import logging
+from concurrent.futures import Future
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 import jwt
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.config import settings
-from app.models import SystemConfig
+from app.models import commit_or_flush, config_cache, db_writer
 from app.schemas import TokenData
-from app.services.crypto_service import crypto_service
+from app.services.crypto_service import DEFAULT_SCRYPT_PARAMS, crypto_service
+from app.services.kdf_executor import KdfBusyError, kdf_executor
+from app.services.key_rotation import (
+    KEY_VERSION_CONFIG_KEY,
+    PREVIOUS_KEYS_CONFIG_KEY,
+    KeyRotationService,
+    key_rotator,
+)
+from app.services.rekey_service import PUBLIC_FIELDS, RekeyService, rekey_runner
+from app.services.token_cache import token_cache
+from app.services.totp_service import totp_cache
+
+logger = logging.getLogger(__name__)
 
 
 class AuthService:
@@ -18,63 +34,209 @@ class AuthService:
     CONFIG_KEY_PASSWORD_HASH = "master_password_hash"
     CONFIG_KEY_ENCRYPTION_SALT = "encryption_salt"
     CONFIG_KEY_INITIALIZED = "is_initialized"
+    # Random vault data key encrypting account secrets, wrapped by the master-derived key
+    CONFIG_KEY_DATA_KEY = "vault_data_key"
+    # Version of the current data key, and older versions wrapped by the current data key
+    CONFIG_KEY_KEY_VERSION = KEY_VERSION_CONFIG_KEY
+    CONFIG_KEY_PREVIOUS_KEYS = PREVIOUS_KEYS_CONFIG_KEY
+    # Calibrated Argon2/scrypt parameters for new hashes and keys (see `app.cli calibrate-kdf`)
+    CONFIG_KEY_KDF_PARAMS = "kdf_params"
+    # scrypt parameters the stored salt and wrapped data key were derived with
+    CONFIG_KEY_SCRYPT_PARAMS = "scrypt_params"
 
     def __init__(self, db: Session):
         self.db = db
 
     def is_initialized(self) -> bool:
         """Check if the system has been initialized with a master password."""
-        config = self.db.query(SystemConfig).filter_by(key=self.CONFIG_KEY_INITIALIZED).first()
-        return config is not None and config.value == "true"
+        return config_cache.get(self.db, self.CONFIG_KEY_INITIALIZED) == "true"
 
     def setup_master_password(self, password: str) -> bool:
         """Set up the initial master password."""
         if self.is_initialized():
             raise ValueError("System is already initialized")
 
-        # Generate salt and hash password
-        salt = crypto_service.generate_salt()
-        password_hash = crypto_service.hash_password(password)
+        # Generate salt, hash password and derive the master key
+        salt, master_key, password_hash, scrypt_params = self.derive_credentials(password)
 
-        # Store in database
-        configs = [
-            SystemConfig(key=self.CONFIG_KEY_PASSWORD_HASH, value=password_hash),
-            SystemConfig(key=self.CONFIG_KEY_ENCRYPTION_SALT, value=base64.b64encode(salt).decode()),
-            SystemConfig(key=self.CONFIG_KEY_INITIALIZED, value="true"),
-        ]
+        # Random vault data key, wrapped by the master-derived key
+        data_key = crypto_service.generate_data_key()
+        self.store_master_password(
+            password_hash, salt, crypto_service.wrap_key(data_key, master_key), scrypt_params
+        )
+        crypto_service.set_encryption_key(data_key)
 
-        for config in configs:
-            self.db.merge(config)
-        self.db.commit()
+        return True
 
-        # Set up encryption key
-        encryption_key = crypto_service.derive_key(password, salt)
-        crypto_service.set_encryption_key(encryption_key)
+    def store_master_password(
+        self,
+        password_hash: str,
+        salt: bytes,
+        wrapped_data_key: str,
+        scrypt_params: Optional[Dict[str, int]] = None,
+    ) -> None:
+        """Persist a precomputed master password hash, salt and wrapped data key.
+
+        ``scrypt_params`` are the parameters the wrapping key was derived with,
+        the currently configured ones by default.
+        """
+        if self.is_initialized():
+            raise ValueError("System is already initialized")
 
-        return True
+        config_cache.set_many(self.db, {
+            self.CONFIG_KEY_PASSWORD_HASH: password_hash,
+            self.CONFIG_KEY_ENCRYPTION_SALT: base64.b64encode(salt).decode(),
+            self.CONFIG_KEY_DATA_KEY: wrapped_data_key,
+            self.CONFIG_KEY_SCRYPT_PARAMS: json.dumps(scrypt_params or crypto_service.scrypt_params),
+            self.CONFIG_KEY_INITIALIZED: "true",
+        })
+        commit_or_flush(self.db)
+
+    def get_credentials(self) -> Optional[Tuple[str, bytes, Optional[str]]]:
+        """Return the stored (password hash, salt, wrapped data key), or None if missing.
+
+        The wrapped data key is None for vaults created before envelope
+        encryption, whose data is still encrypted with the master key itself.
+        """
+        configs = config_cache.get_many(
+            self.db, [self.CONFIG_KEY_PASSWORD_HASH, self.CONFIG_KEY_ENCRYPTION_SALT, self.CONFIG_KEY_DATA_KEY]
+        )
+        if self.CONFIG_KEY_PASSWORD_HASH not in configs or self.CONFIG_KEY_ENCRYPTION_SALT not in configs:
+            return None
+        return (
+            configs[self.CONFIG_KEY_PASSWORD_HASH],
+            base64.b64decode(configs[self.CONFIG_KEY_ENCRYPTION_SALT]),
+            configs.get(self.CONFIG_KEY_DATA_KEY),
+        )
+
+    def get_scrypt_params(self) -> Dict[str, int]:
+        """scrypt parameters of the stored credentials (the old fixed ones if never recorded)."""
+        value = config_cache.get(self.db, self.CONFIG_KEY_SCRYPT_PARAMS)
+        return json.loads(value) if value else dict(DEFAULT_SCRYPT_PARAMS)
+
+    def apply_kdf_params(self) -> None:
+        """Configure crypto_service with the calibrated KDF parameters, if any were stored."""
+        value = config_cache.get(self.db, self.CONFIG_KEY_KDF_PARAMS)
+        if value:
+            params = json.loads(value)
+            crypto_service.configure_kdf(params["argon2"], params["scrypt"])
+
+    def store_kdf_params(self, argon2_params: Dict[str, int], scrypt_params: Dict[str, int]) -> None:
+        """Persist calibrated KDF parameters; stored credentials are upgraded at the next login."""
+        config_cache.set(self.db, self.CONFIG_KEY_KDF_PARAMS, json.dumps({"argon2": argon2_params, "scrypt": scrypt_params}))
+        commit_or_flush(self.db)
+
+    @staticmethod
+    def needs_upgrade(password_hash: str, scrypt_params: Dict[str, int]) -> bool:
+        """Whether stored credentials were made with other than the configured KDF parameters."""
+        return crypto_service.needs_rehash(password_hash) or scrypt_params != crypto_service.scrypt_params
+
+    @staticmethod
+    def derive_credentials(password: str) -> Tuple[bytes, bytes, str, Dict[str, int]]:
+        """Fresh salt, master key, password hash and the scrypt parameters used, at the configured costs."""
+        scrypt_params = dict(crypto_service.scrypt_params)
+        salt = crypto_service.generate_salt()
+        master_key = crypto_service.derive_key(password, salt, scrypt_params)
+        return salt, master_key, crypto_service.hash_password(password), scrypt_params
+
+    def upgrade_credentials(self, password: str, password_hash: str, master_key: bytes) -> bool:
+        """Re-hash the password and re-wrap the data key with the configured KDF parameters."""
+        salt, new_key, new_hash, scrypt_params = self.derive_credentials(password)
+        return self.rewrap_data_key(password_hash, master_key, new_key, salt, new_hash, scrypt_params)
+
+    def load_keyring(self, data_key: bytes) -> None:
+        """Load the current data key and every older key version into crypto_service."""
+        version = config_cache.get(self.db, self.CONFIG_KEY_KEY_VERSION)
+        crypto_service.set_encryption_key(data_key, int(version) if version else 1)
+        previous = config_cache.get(self.db, self.CONFIG_KEY_PREVIOUS_KEYS)
+        for old_version, wrapped in (json.loads(previous) if previous else {}).items():
+            crypto_service.add_key(int(old_version), crypto_service.unwrap_key(wrapped, data_key))
+
+    def rotate_data_key(self, expected_hash: str, master_key: bytes) -> bytes:
+        """Make a fresh data key current, keeping older versions for decryption.
+
+        Older keys are stored wrapped by the new data key, so a later password
+        change still only re-wraps one key. Existing rows keep their ciphertext
+        until the background rotator rewrites them. Returns the new data key.
+        """
+        credentials = self.get_credentials()
+        if not credentials or credentials[0] != expected_hash:
+            raise ValueError("Master password changed, try again")
+        if not credentials[2]:
+            raise ValueError("The vault has no data key yet; log in again to migrate it before rotating")
+        if RekeyService(self.db).is_running():
+            raise ValueError("A re-encryption is already in progress")
+
+        data_key = crypto_service.unwrap_key(credentials[2], master_key)
+        version_config = config_cache.get(self.db, self.CONFIG_KEY_KEY_VERSION)
+        version = int(version_config) if version_config else 1
+        previous_config = config_cache.get(self.db, self.CONFIG_KEY_PREVIOUS_KEYS)
+        keys = {
+            int(v): crypto_service.unwrap_key(w, data_key)
+            for v, w in (json.loads(previous_config) if previous_config else {}).items()
+        }
+        keys[version] = data_key
+
+        new_key = crypto_service.generate_data_key()
+        config_cache.set_many(self.db, {
+            self.CONFIG_KEY_DATA_KEY: crypto_service.wrap_key(new_key, master_key),
+            self.CONFIG_KEY_KEY_VERSION: str(version + 1),
+            self.CONFIG_KEY_PREVIOUS_KEYS: json.dumps(
+                {str(v): crypto_service.wrap_key(k, new_key) for v, k in sorted(keys.items())}
+            ),
+        })
+        commit_or_flush(self.db)
+        return new_key
+
+    def begin_envelope_migration(self, master_key: bytes) -> bytes:
+        """Give a legacy vault a data key and start re-encrypting into it.
+
+        Stores the new data key wrapped by the master key together with a
+        re-key checkpoint (master key -> data key), then returns the data key.
+        If another login already migrated, the existing data key is returned.
+        """
+        wrapped = config_cache.get(self.db, self.CONFIG_KEY_DATA_KEY)
+        if wrapped:
+            return crypto_service.unwrap_key(wrapped, master_key)
+
+        data_key = crypto_service.generate_data_key()
+        config_cache.set(self.db, self.CONFIG_KEY_DATA_KEY, crypto_service.wrap_key(data_key, master_key))
+        RekeyService(self.db).start(master_key, data_key)
+        commit_or_flush(self.db)
+        return data_key
 
     def verify_master_password(self, password: str) -> bool:
         """Verify the master password."""
-        config = self.db.query(SystemConfig).filter_by(key=self.CONFIG_KEY_PASSWORD_HASH).first()
-        if not config:
+        password_hash = config_cache.get(self.db, self.CONFIG_KEY_PASSWORD_HASH)
+        if not password_hash:
             return False
 
-        return crypto_service.verify_password(password, config.value)
+        return crypto_service.verify_password(password, password_hash)
 
     def login(self, password: str) -> Optional[str]:
         """Authenticate and return JWT token."""
-        if not self.verify_master_password(password):
-            return None
-
-        # Get salt and derive encryption key
-        salt_config = self.db.query(SystemConfig).filter_by(key=self.CONFIG_KEY_ENCRYPTION_SALT).first()
-        if not salt_config:
+        credentials = self.get_credentials()
+        if not credentials or not self.verify_master_password(password):
             return None
-
-        salt = base64.b64decode(salt_config.value)
-        encryption_key = crypto_service.derive_key(password, salt)
-        crypto_service.set_encryption_key(encryption_key)
-
+        password_hash, salt, wrapped = credentials
+
+        # Derive the master key and unwrap the data key with it
+        scrypt_params = self.get_scrypt_params()
+        master_key = crypto_service.derive_key(password, salt, scrypt_params)
+        if wrapped:
+            self.load_keyring(crypto_service.unwrap_key(wrapped, master_key))
+            if self.needs_upgrade(password_hash, scrypt_params):
+                self.upgrade_credentials(password, password_hash, master_key)
+        else:
+            data_key = self.begin_envelope_migration(master_key)
+            self.load_keyring(data_key)
+            RekeyService(self.db).run_to_completion(master_key, data_key)
+
+        return self.issue_token()
+
+    @staticmethod
+    def issue_token() -> str:
+        """Create a JWT for the master session."""
         # Generate JWT token (use timezone-aware datetime)
         now = datetime.now(timezone.utc)
         expire = now + timedelta(minutes=settings.JWT_EXPIRE_MINUTES)
@@ -90,8 +252,11 @@ class AuthService:
     def logout(self) -> None:
         """Clear the encryption key and invalidate session."""
         crypto_service.clear_encryption_key()
+        token_cache.clear()
+        totp_cache.clear()
 
-    def verify_token(self, token: str) -> Optional[TokenData]:
+    @staticmethod
+    def verify_token(token: str) -> Optional[TokenData]:
         """Verify JWT token and return token data."""
         try:
             payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
@@ -102,52 +267,235 @@ class AuthService:
             return None
 
     def change_master_password(self, current_password: str, new_password: str) -> bool:
-        """Change the master password and re-encrypt all data."""
-        if not self.verify_master_password(current_password):
+        """Change the master password by re-wrapping the vault data key."""
+        credentials = self.get_credentials()
+        if not credentials or not self.verify_master_password(current_password):
             return False
+        password_hash, old_salt, wrapped = credentials
+
+        old_key = crypto_service.derive_key(current_password, old_salt, self.get_scrypt_params())
+        if not wrapped:
+            # Legacy vault: move to a data key first
+            data_key = self.begin_envelope_migration(old_key)
+            RekeyService(self.db).run_to_completion(old_key, data_key)
 
-        # Get current salt and key
-        salt_config = self.db.query(SystemConfig).filter_by(key=self.CONFIG_KEY_ENCRYPTION_SALT).first()
-        if not salt_config:
+        # Generate new salt and key
+        new_salt, new_key, new_password_hash, scrypt_params = self.derive_credentials(new_password)
+
+        return self.rewrap_data_key(password_hash, old_key, new_key, new_salt, new_password_hash, scrypt_params)
+
+    def rewrap_data_key(
+        self,
+        expected_hash: str,
+        old_key: bytes,
+        new_key: bytes,
+        new_salt: bytes,
+        new_password_hash: str,
+        new_scrypt_params: Optional[Dict[str, int]] = None,
+    ) -> bool:
+        """Re-wrap the data key under a new master key and store the new credentials.
+
+        Account data is untouched: it is encrypted with the data key, which does
+        not change. Nothing is changed (and False returned) if the stored hash no
+        longer matches ``expected_hash``, i.e. the password was changed
+        concurrently after the caller verified it.
+        """
+        credentials = self.get_credentials()
+        if not credentials or credentials[0] != expected_hash:
             return False
+        wrapped = credentials[2]
+        if not wrapped:
+            raise ValueError("Unlock the vault once before changing the master password")
+        data_key = crypto_service.unwrap_key(wrapped, old_key)
+
+        # Update configs
+        config_cache.set_many(self.db, {
+            self.CONFIG_KEY_PASSWORD_HASH: new_password_hash,
+            self.CONFIG_KEY_ENCRYPTION_SALT: base64.b64encode(new_salt).decode(),
+            self.CONFIG_KEY_DATA_KEY: crypto_service.wrap_key(data_key, new_key),
+            self.CONFIG_KEY_SCRYPT_PARAMS: json.dumps(new_scrypt_params or crypto_service.scrypt_params),
+        })
+
+        commit_or_flush(self.db)
+        token_cache.clear()
+        return True
 
-        old_salt = base64.b64decode(salt_config.value)
-        old_key = crypto_service.derive_key(current_password, old_salt)
 
-        # Generate new salt and key
-        new_salt = crypto_service.generate_salt()
-        new_key = crypto_service.derive_key(new_password, new_salt)
-        new_password_hash = crypto_service.hash_password(new_password)
+class AsyncAuthService:
+    """Async variant of AuthService: reads on an AsyncSession, writes via the group-commit writer."""
 
-        # Re-encrypt all sensitive data
-        from app.models import Account
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def is_initialized(self) -> bool:
+        """Check if the system has been initialized with a master password."""
+        return await self.db.run_sync(lambda session: AuthService(session).is_initialized())
 
-        crypto_service.set_encryption_key(old_key)
-        accounts = self.db.query(Account).filter_by(is_deleted=False).all()
+    async def _get_credentials(self) -> Optional[Tuple[str, bytes, Optional[str], Dict[str, int]]]:
+        """Stored credentials plus the scrypt parameters the master key is derived with."""
 
-        # Decrypt with old key and encrypt with new key
-        for account in accounts:
-            if account.password_encrypted:
-                plaintext = crypto_service.decrypt(account.password_encrypted)
-                crypto_service.set_encryption_key(new_key)
-                account.password_encrypted = crypto_service.encrypt(plaintext)
-                crypto_service.set_encryption_key(old_key)
+        def load(session: Session):
+            auth_service = AuthService(session)
+            credentials = auth_service.get_credentials()
+            return (*credentials, auth_service.get_scrypt_params()) if credentials else None
 
-            if account.totp_secret_encrypted:
-                plaintext = crypto_service.decrypt(account.totp_secret_encrypted)
-                crypto_service.set_encryption_key(new_key)
-                account.totp_secret_encrypted = crypto_service.encrypt(plaintext)
-                crypto_service.set_encryption_key(old_key)
+        return await self.db.run_sync(load)
 
-        # Update configs
-        self.db.query(SystemConfig).filter_by(key=self.CONFIG_KEY_PASSWORD_HASH).update({"value": new_password_hash})
-        self.db.query(SystemConfig).filter_by(key=self.CONFIG_KEY_ENCRYPTION_SALT).update(
-            {"value": base64.b64encode(new_salt).decode()}
+    async def setup_master_password(self, password: str) -> bool:
+        """Set up the initial master password.
+
+        Hashing and key derivation run on the KDF executor, only the config
+        rows go through the writer.
+        """
+        salt = crypto_service.generate_salt()
+        scrypt_params = dict(crypto_service.scrypt_params)
+        password_hash = await kdf_executor.run("argon2_hash", crypto_service.hash_password, password)
+        master_key = await kdf_executor.run(
+            "scrypt_derive", crypto_service.derive_key, password, salt, scrypt_params
+        )
+        data_key = crypto_service.generate_data_key()
+        wrapped = crypto_service.wrap_key(data_key, master_key)
+        await db_writer.run(
+            lambda session: AuthService(session).store_master_password(password_hash, salt, wrapped, scrypt_params)
+        )
+        crypto_service.set_encryption_key(data_key)
+        return True
+
+    async def login(self, password: str) -> Optional[str]:
+        """Authenticate and return JWT token."""
+        credentials = await self._get_credentials()
+        if not credentials:
+            return None
+        password_hash, salt, wrapped, scrypt_params = credentials
+
+        if not await kdf_executor.run("argon2_verify", crypto_service.verify_password, password, password_hash):
+            return None
+        master_key = await kdf_executor.run(
+            "scrypt_derive", crypto_service.derive_key, password, salt, scrypt_params
+        )
+        if wrapped:
+            data_key = crypto_service.unwrap_key(wrapped, master_key)
+            if AuthService.needs_upgrade(password_hash, scrypt_params):
+                self.upgrade_credentials_in_background(password, password_hash, master_key)
+        else:
+            # Legacy vault: switch to a data key, the re-key job moves the data over
+            data_key = await db_writer.run(lambda session: AuthService(session).begin_envelope_migration(master_key))
+        await self.db.run_sync(lambda session: AuthService(session).load_keyring(data_key))
+
+        # Start or pick up a re-encryption (legacy migration, or one interrupted by a crash or a lock)
+        rekey_runner.resume(await self.db.run_sync(lambda session: RekeyService(session).get_state()))
+        # Finish rewriting rows still on an older key version
+        key_rotator.start()
+
+        return AuthService.issue_token()
+
+    @staticmethod
+    def upgrade_credentials_in_background(
+        password: str, password_hash: str, master_key: bytes
+    ) -> Optional["Future[bool]"]:
+        """Re-hash and re-wrap with the configured KDF parameters without delaying the login.
+
+        Runs as one low-priority job on the KDF executor; if the executor is
+        saturated the upgrade is simply left for a later login.
+        """
+
+        def upgrade() -> bool:
+            salt, new_key, new_hash, scrypt_params = AuthService.derive_credentials(password)
+            upgraded = db_writer.submit(
+                lambda session: AuthService(session).rewrap_data_key(
+                    password_hash, master_key, new_key, salt, new_hash, scrypt_params
+                )
+            ).result()
+            if upgraded:
+                logger.info("Master password hash upgraded to the configured KDF parameters")
+            return upgraded
+
+        try:
+            future = kdf_executor.submit("credential_upgrade", upgrade)
+        except KdfBusyError:
+            logger.info("KDF executor busy, credential upgrade deferred to the next login")
+            return None
+        future.add_done_callback(
+            lambda done: done.exception() and logger.error(f"Credential upgrade failed: {done.exception()}")
+        )
+        return future
+
+    async def logout(self) -> None:
+        """Clear the encryption key and invalidate session."""
+        crypto_service.clear_encryption_key()
+        token_cache.clear()
+        totp_cache.clear()
+
+    async def verify_token(self, token: str) -> Optional[TokenData]:
+        """Verify JWT token and return token data."""
+        return AuthService.verify_token(token)
+
+    async def change_master_password(self, current_password: str, new_password: str) -> bool:
+        """Change the master password.
+
+        Only the 32-byte vault data key is re-wrapped, account data is not
+        touched. The four KDF calls run on the KDF executor.
+        """
+        credentials = await self._get_credentials()
+        if not credentials:
+            return False
+        password_hash, old_salt, _, old_params = credentials
+
+        if not await kdf_executor.run(
+            "argon2_verify", crypto_service.verify_password, current_password, password_hash
+        ):
+            return False
+        old_key = await kdf_executor.run(
+            "scrypt_derive", crypto_service.derive_key, current_password, old_salt, old_params
+        )
+        new_salt = crypto_service.generate_salt()
+        new_params = dict(crypto_service.scrypt_params)
+        new_key = await kdf_executor.run(
+            "scrypt_derive", crypto_service.derive_key, new_password, new_salt, new_params
+        )
+        new_password_hash = await kdf_executor.run("argon2_hash", crypto_service.hash_password, new_password)
+
+        return await db_writer.run(
+            lambda session: AuthService(session).rewrap_data_key(
+                password_hash, old_key, new_key, new_salt, new_password_hash, new_params
+            )
         )
 
-        self.db.commit()
+    async def rotate_data_key(self, password: str) -> bool:
+        """Switch to a new data key version and start rewriting old rows in the background.
+
+        Raises ValueError while a re-encryption is running.
+        """
+        credentials = await self._get_credentials()
+        if not credentials:
+            return False
+        password_hash, salt, _, scrypt_params = credentials
 
-        # Set new encryption key
-        crypto_service.set_encryption_key(new_key)
+        if not await kdf_executor.run("argon2_verify", crypto_service.verify_password, password, password_hash):
+            return False
+        master_key = await kdf_executor.run(
+            "scrypt_derive", crypto_service.derive_key, password, salt, scrypt_params
+        )
 
+        data_key = await db_writer.run(
+            lambda session: AuthService(session).rotate_data_key(password_hash, master_key)
+        )
+        await self.db.run_sync(lambda session: AuthService(session).load_keyring(data_key))
+        key_rotator.start()
         return True
+
+    async def get_key_rotation_status(self) -> dict:
+        """Background rotation progress and the number of rows still on older keys."""
+        status = key_rotator.status()
+        version = status["key_version"]
+        status["outdated"] = None if version is None else await self.db.run_sync(
+            lambda session: KeyRotationService(session).count_outdated(version)
+        )
+        return status
+
+    async def get_rekey_state(self) -> dict:
+        """Progress of the current or last re-encryption (vault data key migration)."""
+        state = await self.db.run_sync(lambda session: RekeyService(session).get_state())
+        if not state:
+            return {"status": "idle"}
+        return {key: state.get(key) for key in PUBLIC_FIELDS}
@@ -11,7 +11,8 @@ import pandas as pd
 
 from app.config import settings
 from app.models import SessionLocal
-from app.services.account_service import AccountService
+from app.services.account_service import EXPORT_OPTIONS, AccountService
+from app.services.crypto_service import crypto_service
 
 logger = logging.getLogger(__name__)
 
@@ -76,7 +77,9 @@ class BackupService:
         db = SessionLocal()
         try:
             service = AccountService(db)
-            accounts, _ = service.get_accounts(page=1, page_size=100000)
+            accounts, _, _ = service.get_accounts(
+                page=1, page_size=100000, with_total=False, options=EXPORT_OPTIONS
+            )
 
             if not accounts:
                 logger.info("No accounts to backup")
@@ -89,6 +92,11 @@ class BackupService:
                     all_custom_keys.update(acc.custom_fields.keys())
             all_custom_keys = sorted(all_custom_keys)
 
+            if include_password:
+                plaintexts = iter(crypto_service.decrypt_many(
+                    [blob or None for acc in accounts for blob in (acc.password_encrypted, acc.totp_secret_encrypted)]
+                ))
+
             # Build data
             data = []
             for acc in accounts:
@@ -108,8 +116,8 @@ class BackupService:
                 }
 
                 if include_password:
-                    row["密码"] = service.get_decrypted_password(acc.id) or ""
-                    row["2fa"] = service.get_decrypted_totp(acc.id) or ""
+                    row["密码"] = next(plaintexts) or ""
+                    row["2fa"] = next(plaintexts) or ""
 
                 # Add custom fields
                 for key in all_custom_keys:
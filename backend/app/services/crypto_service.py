@@ -1,26 +1,140 @@
 """Cryptographic utilities for password hashing and data encryption."""
+import base64
 import os
 import secrets
-from typing import Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
 
 from argon2 import PasswordHasher, Type
 from argon2.exceptions import VerifyMismatchError
+from cryptography.exceptions import InvalidTag
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 
+from app.config import settings
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+NONCE_SIZE = 12  # 96-bit nonce for GCM
+
+# Versioned ciphertext: MAGIC || key version (uint32 BE) || nonce || ct. The
+# header is authenticated as associated data. Ciphertext written before the
+# header existed is plain nonce || ct and is still accepted.
+MAGIC = b"AMS\x01"
+HEADER_SIZE = len(MAGIC) + 4
+
+# KDF cost parameters used until `python -m app.cli calibrate-kdf` stores host-specific ones
+DEFAULT_ARGON2_PARAMS = {"time_cost": 3, "memory_cost": 65536, "parallelism": 4}  # memory in KiB (64MB)
+DEFAULT_SCRYPT_PARAMS = {"n": 2**14, "r": 8, "p": 1}
+
+
+def ciphertext_header(version: int) -> bytes:
+    """Header prefixed to ciphertext produced by key ``version``."""
+    return MAGIC + version.to_bytes(4, "big")
+
+
+def key_version(encrypted: bytes) -> Optional[int]:
+    """Key version recorded in a ciphertext, None for legacy (headerless) values."""
+    if len(encrypted) > HEADER_SIZE + NONCE_SIZE and encrypted[:len(MAGIC)] == MAGIC:
+        return int.from_bytes(encrypted[len(MAGIC):HEADER_SIZE], "big")
+    return None
+
+
+def _decrypt_legacy(aesgcm: AESGCM, encrypted: bytes) -> str:
+    # memoryview slices share the buffer instead of copying the ciphertext
+    view = memoryview(encrypted)
+    return aesgcm.decrypt(view[:NONCE_SIZE], view[NONCE_SIZE:], None).decode("utf-8")
+
+
+def _decrypt_versioned(aesgcm: AESGCM, encrypted: bytes) -> str:
+    view = memoryview(encrypted)
+    nonce_end = HEADER_SIZE + NONCE_SIZE
+    return aesgcm.decrypt(view[HEADER_SIZE:nonce_end], view[nonce_end:], view[:HEADER_SIZE]).decode("utf-8")
+
+
+class Keyring:
+    """Immutable set of loaded data keys: the current one plus older versions.
+
+    Encryption always uses the current version. Decryption picks the key named
+    by the ciphertext header; legacy values are tried against every key, then
+    the ``legacy`` fallback (the master key of a vault being migrated).
+    """
+
+    def __init__(self, current_version: int, keys: Dict[int, bytes], legacy: Optional[bytes] = None):
+        self.current_version = current_version
+        self._ciphers = {version: AESGCM(key) for version, key in keys.items()}
+        self._current = self._ciphers[current_version]
+        self._header = ciphertext_header(current_version)
+        # Current key first, then newest to oldest
+        self._legacy_order = [self._current] + [
+            self._ciphers[v] for v in sorted(self._ciphers, reverse=True) if v != current_version
+        ]
+        self._legacy = AESGCM(legacy) if legacy else None
+        if self._legacy:
+            self._legacy_order.append(self._legacy)
+
+    def encrypt(self, plaintext: str) -> bytes:
+        if not plaintext:
+            return b""
+        nonce = os.urandom(NONCE_SIZE)
+        return self._header + nonce + self._current.encrypt(nonce, plaintext.encode("utf-8"), self._header)
+
+    def decrypt(self, encrypted: bytes) -> str:
+        if not encrypted:
+            return ""
+        version = key_version(encrypted)
+        candidates = []
+        if version is not None:
+            # The key named in the header, then the migration fallback
+            candidates += [(c, _decrypt_versioned) for c in (self._ciphers.get(version), self._legacy) if c]
+        # Legacy layout, also covers a legacy nonce that happens to start with MAGIC
+        candidates += [(c, _decrypt_legacy) for c in self._legacy_order]
+        for cipher, decrypt in candidates:
+            try:
+                return decrypt(cipher, encrypted)
+            except InvalidTag:
+                continue
+        raise InvalidTag()
+
+    def is_current(self, encrypted: bytes) -> bool:
+        return encrypted[:HEADER_SIZE] == self._header
+
+    def reencrypt(self, encrypted: Optional[bytes]) -> Optional[bytes]:
+        """Rewrite a value under the current key; current-version values are returned as is."""
+        if not encrypted or self.is_current(encrypted):
+            return encrypted
+        return self.encrypt(self.decrypt(encrypted))
+
 
 class CryptoService:
     """Service for cryptographic operations."""
 
     def __init__(self):
+        self.configure_kdf(DEFAULT_ARGON2_PARAMS, DEFAULT_SCRYPT_PARAMS)
+        self._encryption_key: bytes | None = None
+        self._keys: Dict[int, bytes] = {}
+        self._current_version = 1
+        # Key being migrated away from while a re-key job runs, used as decrypt fallback
+        self._previous_key: bytes | None = None
+        self._keyring: Keyring | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._executor_lock = threading.Lock()
+
+    def configure_kdf(self, argon2_params: Dict[str, int], scrypt_params: Dict[str, int]) -> None:
+        """Set the cost parameters for new password hashes and derived keys.
+
+        Existing Argon2 hashes still verify (they record their own parameters);
+        keys must be derived with the scrypt parameters they were created with.
+        """
+        self.argon2_params = dict(argon2_params)
+        self.scrypt_params = dict(scrypt_params)
         self._hasher = PasswordHasher(
-            time_cost=3,
-            memory_cost=65536,  # 64MB
-            parallelism=4,
+            **self.argon2_params,
             hash_len=32,
             salt_len=16,
             type=Type.ID,  # Argon2id
         )
-        self._encryption_key: bytes | None = None
 
     def hash_password(self, password: str) -> str:
         """Hash a password using Argon2id."""
@@ -38,51 +152,154 @@ class CryptoService:
         """Check if the password hash needs to be rehashed."""
         return self._hasher.check_needs_rehash(password_hash)
 
-    def derive_key(self, password: str, salt: bytes) -> bytes:
-        """Derive an encryption key from password and salt."""
+    def derive_key(self, password: str, salt: bytes, params: Optional[Dict[str, int]] = None) -> bytes:
+        """Derive an encryption key from password and salt (with the current scrypt parameters by default)."""
         from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
 
-        kdf = Scrypt(salt=salt, length=32, n=2**14, r=8, p=1)
+        params = params or self.scrypt_params
+        kdf = Scrypt(salt=salt, length=32, n=params["n"], r=params["r"], p=params["p"])
         return kdf.derive(password.encode())
 
     def generate_salt(self) -> bytes:
         """Generate a random salt for key derivation."""
         return os.urandom(16)
 
-    def set_encryption_key(self, key: bytes) -> None:
-        """Set the encryption key for data encryption/decryption."""
+    def generate_data_key(self) -> bytes:
+        """Generate a random 256-bit vault data key."""
+        return AESGCM.generate_key(bit_length=256)
+
+    def wrap_key(self, key: bytes, wrapping_key: bytes) -> str:
+        """Encrypt a key with another key, base64 encoded for system_config."""
+        nonce = os.urandom(NONCE_SIZE)
+        return base64.b64encode(nonce + AESGCM(wrapping_key).encrypt(nonce, key, None)).decode()
+
+    def unwrap_key(self, wrapped: str, wrapping_key: bytes) -> bytes:
+        """Reverse wrap_key; raises InvalidTag for the wrong wrapping key."""
+        data = base64.b64decode(wrapped)
+        return AESGCM(wrapping_key).decrypt(data[:NONCE_SIZE], data[NONCE_SIZE:], None)
+
+    def set_encryption_key(self, key: bytes, version: int = 1) -> None:
+        """Set the current data key (and its version), dropping any other loaded keys."""
         if len(key) != 32:
             raise ValueError("Encryption key must be 32 bytes")
         self._encryption_key = key
+        self._keys = {version: key}
+        self._current_version = version
+        self._previous_key = None
+        self._rebuild()
+
+    def add_key(self, version: int, key: bytes) -> None:
+        """Load an older data key so ciphertext written under it stays readable."""
+        self._keys[version] = key
+        self._rebuild()
 
     def clear_encryption_key(self) -> None:
         """Clear the encryption key from memory."""
         self._encryption_key = None
+        self._keys = {}
+        self._previous_key = None
+        self._keyring = None
 
-    def encrypt(self, plaintext: str) -> bytes:
-        """Encrypt plaintext using AES-256-GCM."""
-        if not self._encryption_key:
+    def set_previous_key(self, key: Optional[bytes]) -> None:
+        """Set (or with None, clear) the key data is being re-encrypted away from.
+
+        Until a re-key job finishes, rows may still hold ciphertext from the old
+        key; decryption falls back to it when the current key does not match.
+        """
+        self._previous_key = key
+        self._rebuild()
+
+    def current_key(self) -> Optional[bytes]:
+        """The current data key, None while locked."""
+        return self._encryption_key
+
+    @property
+    def key_version(self) -> Optional[int]:
+        """Version of the current data key, None while locked."""
+        return self._keyring.current_version if self._keyring else None
+
+    def _rebuild(self) -> None:
+        # Swap in a new immutable keyring; in-flight batches keep their snapshot
+        if self._encryption_key is not None:
+            self._keyring = Keyring(self._current_version, self._keys, self._previous_key)
+
+    def _ring(self) -> Keyring:
+        keyring = self._keyring
+        if keyring is None:
             raise ValueError("Encryption key not set")
-        if not plaintext:
-            return b""
+        return keyring
 
-        aesgcm = AESGCM(self._encryption_key)
-        nonce = os.urandom(12)  # 96-bit nonce for GCM
-        ciphertext = aesgcm.encrypt(nonce, plaintext.encode("utf-8"), None)
-        return nonce + ciphertext
+    def encrypt(self, plaintext: str) -> bytes:
+        """Encrypt plaintext using AES-256-GCM under the current key version."""
+        return self._ring().encrypt(plaintext)
 
     def decrypt(self, encrypted: bytes) -> str:
-        """Decrypt ciphertext using AES-256-GCM."""
-        if not self._encryption_key:
-            raise ValueError("Encryption key not set")
-        if not encrypted:
-            return ""
+        """Decrypt ciphertext using AES-256-GCM with the key named in its header."""
+        return self._ring().decrypt(encrypted)
+
+    def encrypt_many(self, plaintexts: Sequence[Optional[str]]) -> List[Optional[bytes]]:
+        """Encrypt a batch of values, keeping order; None entries stay None."""
+        keyring = self._ring()
+        return self._map(lambda value: None if value is None else keyring.encrypt(value), plaintexts)
+
+    def decrypt_many(self, encrypted: Sequence[Optional[bytes]]) -> List[Optional[str]]:
+        """Decrypt a batch of values, keeping order; None entries stay None."""
+        keyring = self._ring()
+        return self._map(lambda value: None if value is None else keyring.decrypt(value), encrypted)
+
+    def rotate_many(self, encrypted: Sequence[Optional[bytes]]) -> List[Optional[bytes]]:
+        """Rewrite a batch under the current key version, keeping order.
+
+        Values already at the current version are returned unchanged.
+        """
+        return self._map(self._ring().reencrypt, encrypted)
+
+    def reencrypt_many(
+        self, encrypted: Sequence[Optional[bytes]], old_key: bytes, new_key: bytes, version: int = 1
+    ) -> List[Optional[bytes]]:
+        """Re-encrypt a batch from old_key to new_key (as key ``version``), keeping order.
+
+        Values already encrypted with new_key (written while a re-key job was
+        running) are returned unchanged; values matching neither key raise
+        InvalidTag. Does not depend on the currently loaded key.
+        """
+        old, new = Keyring(version, {version: old_key}), Keyring(version, {version: new_key})
+
+        def reencrypt(value: Optional[bytes]) -> Optional[bytes]:
+            if not value:
+                return value
+            try:
+                plaintext = old.decrypt(value)
+            except InvalidTag:
+                new.decrypt(value)
+                return value
+            return new.encrypt(plaintext)
+
+        return self._map(reencrypt, encrypted)
+
+    def _map(self, fn: Callable[[T], R], items: Sequence[T]) -> List[R]:
+        """Apply fn to items, spreading large batches over the worker pool.
+
+        AES-GCM in ``cryptography`` releases the GIL, so chunks run in parallel.
+        The cipher is bound before dispatch, so a key change mid-batch cannot
+        mix keys within one call.
+        """
+        workers = settings.CRYPTO_WORKERS
+        if workers <= 1 or len(items) < settings.CRYPTO_PARALLEL_MIN_ITEMS:
+            return [fn(item) for item in items]
+
+        size = -(-len(items) // workers)
+        chunks = [items[i:i + size] for i in range(0, len(items), size)]
+        results: List[R] = []
+        for chunk in self._pool().map(lambda chunk: [fn(item) for item in chunk], chunks):
+            results.extend(chunk)
+        return results
 
-        aesgcm = AESGCM(self._encryption_key)
-        nonce = encrypted[:12]
-        ciphertext = encrypted[12:]
-        plaintext = aesgcm.decrypt(nonce, ciphertext, None)
-        return plaintext.decode("utf-8")
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(settings.CRYPTO_WORKERS, thread_name_prefix="crypto")
+            return self._executor
 
     def generate_token(self, length: int = 32) -> str:
         """Generate a secure random token."""
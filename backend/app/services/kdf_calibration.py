@@ -0,0 +1,90 @@
+"""Pick Argon2id and scrypt cost parameters for the current host.
+
+A login runs one Argon2id verification and one scrypt derivation, one after
+the other, so each gets half of the target latency. Both may use up to the
+memory budget (they never run at the same time for one login; with
+``KDF_MAX_WORKERS`` concurrent logins the peak is that many times the budget).
+
+Argon2id: start with ``time_cost=1`` at the full memory budget, halving memory
+(down to the OWASP minimum of 19 MiB; smaller budgets are rejected) until one
+pass fits, then add passes
+while they still fit. scrypt: ``n`` is the largest power of two that fits both
+the time and the memory budget (``128 * r * n`` bytes), but never below the
+2**14 used before calibration existed.
+"""
+import os
+import time
+from typing import Callable, Dict
+
+from argon2 import PasswordHasher, Type
+from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+
+ARGON2_MIN_MEMORY_KIB = 19 * 1024
+ARGON2_MAX_TIME_COST = 10
+SCRYPT_MIN_N = 2**14
+SCRYPT_R = 8
+SCRYPT_P = 1
+
+
+def _measure(fn: Callable[[], object], rounds: int = 3) -> float:
+    """Best of ``rounds`` wall times in seconds, after one warm-up run."""
+    fn()
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def time_argon2(params: Dict[str, int]) -> float:
+    hasher = PasswordHasher(**params, hash_len=32, salt_len=16, type=Type.ID)
+    return _measure(lambda: hasher.hash("calibration"))
+
+
+def time_scrypt(params: Dict[str, int]) -> float:
+    salt = os.urandom(16)
+    return _measure(
+        lambda: Scrypt(salt=salt, length=32, n=params["n"], r=params["r"], p=params["p"]).derive(b"calibration")
+    )
+
+
+def calibrate_argon2(budget_s: float, max_memory_kib: int, parallelism: int) -> Dict[str, int]:
+    """Largest Argon2id cost within the time and memory budget.
+
+    Raises ``ValueError`` if the budget is below ``ARGON2_MIN_MEMORY_KIB``.
+    """
+    if max_memory_kib < ARGON2_MIN_MEMORY_KIB:
+        raise ValueError(
+            f"Memory budget of {max_memory_kib // 1024} MiB is below the Argon2id minimum of "
+            f"{ARGON2_MIN_MEMORY_KIB // 1024} MiB"
+        )
+    memory = max_memory_kib
+    while True:
+        one_pass = time_argon2({"time_cost": 1, "memory_cost": memory, "parallelism": parallelism})
+        if one_pass <= budget_s or memory <= ARGON2_MIN_MEMORY_KIB:
+            break
+        memory = max(memory // 2, ARGON2_MIN_MEMORY_KIB)
+    time_cost = max(1, min(ARGON2_MAX_TIME_COST, int(budget_s / one_pass)))
+    return {"time_cost": time_cost, "memory_cost": memory, "parallelism": parallelism}
+
+
+def calibrate_scrypt(budget_s: float, max_memory_bytes: int) -> Dict[str, int]:
+    """Largest scrypt work factor within the time and memory budget."""
+    n = SCRYPT_MIN_N
+    elapsed = time_scrypt({"n": n, "r": SCRYPT_R, "p": SCRYPT_P})
+    # scrypt time and memory are both linear in n
+    while elapsed * 2 <= budget_s and 128 * SCRYPT_R * n * 2 <= max_memory_bytes:
+        n *= 2
+        elapsed *= 2
+    return {"n": n, "r": SCRYPT_R, "p": SCRYPT_P}
+
+
+def calibrate(target_ms: int, max_memory_mb: int) -> Dict[str, Dict[str, int]]:
+    """Benchmark this host and return ``{"argon2": {...}, "scrypt": {...}}``."""
+    budget_s = target_ms / 1000 / 2
+    parallelism = max(1, min(os.cpu_count() or 1, 4))
+    return {
+        "argon2": calibrate_argon2(budget_s, max_memory_mb * 1024, parallelism),
+        "scrypt": calibrate_scrypt(budget_s, max_memory_mb * 1024 * 1024),
+    }
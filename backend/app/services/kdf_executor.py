@@ -0,0 +1,117 @@
+"""Bounded executor for key derivation and password hashing.
+
+Argon2id (64MB, time_cost=3) and scrypt each take hundreds of milliseconds
+and a fair amount of memory. Running them inline blocks the event loop (or the
+group-commit writer), and unbounded concurrency can exhaust RAM. All KDF work
+goes through this executor instead: at most ``KDF_MAX_WORKERS`` run at once,
+at most ``KDF_MAX_QUEUE`` more may wait, and anything beyond that is rejected
+with KdfBusyError so the API can answer 503 right away.
+
+Each job is tagged with a stage name (e.g. ``argon2_verify``) and its wall time
+is recorded per stage, see ``metrics()``.
+"""
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class KdfBusyError(RuntimeError):
+    """Raised when the KDF queue is full; the caller should retry later."""
+
+
+class KdfExecutor:
+    """Thread pool with a concurrency cap, a queue-depth limit and per-stage timings."""
+
+    def __init__(self, max_workers: Optional[int] = None, max_queue: Optional[int] = None):
+        self.max_workers = max_workers or settings.KDF_MAX_WORKERS
+        self.max_queue = max_queue if max_queue is not None else settings.KDF_MAX_QUEUE
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._rejected = 0
+        self._stages: Dict[str, Dict[str, float]] = {}
+
+    def submit(self, stage: str, fn: Callable[..., T], *args: Any) -> "Future[T]":
+        """Queue a KDF call, raising KdfBusyError when the queue is full."""
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise KdfBusyError("Too many concurrent key derivations, try again later")
+            self._pending += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="kdf")
+            executor = self._executor
+
+        queued_at = time.perf_counter()
+
+        def job() -> T:
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                self._record(stage, started - queued_at, time.perf_counter() - started)
+
+        try:
+            future = executor.submit(job)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    async def run(self, stage: str, fn: Callable[..., T], *args: Any) -> T:
+        """Run a KDF call in the pool without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(stage, fn, *args))
+
+    def metrics(self) -> dict:
+        """Snapshot of queue state and per-stage timings in milliseconds."""
+        with self._lock:
+            stages = {
+                name: {
+                    "count": int(s["count"]),
+                    "avg_ms": round(s["total"] / s["count"] * 1000, 1),
+                    "max_ms": round(s["max"] * 1000, 1),
+                    "avg_wait_ms": round(s["wait"] / s["count"] * 1000, 1),
+                }
+                for name, s in self._stages.items()
+            }
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "pending": self._pending,
+                "rejected": self._rejected,
+                "stages": stages,
+            }
+
+    def shutdown(self) -> None:
+        """Wait for running jobs and release the worker threads."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=True)
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def _record(self, stage: str, wait: float, elapsed: float) -> None:
+        with self._lock:
+            s = self._stages.setdefault(stage, {"count": 0, "total": 0.0, "max": 0.0, "wait": 0.0})
+            s["count"] += 1
+            s["total"] += elapsed
+            s["wait"] += wait
+            s["max"] = max(s["max"], elapsed)
+        logger.debug(f"KDF stage {stage}: {elapsed * 1000:.1f} ms (queued {wait * 1000:.1f} ms)")
+
+
+# Global executor instance
+kdf_executor = KdfExecutor()
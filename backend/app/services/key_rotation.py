@@ -0,0 +1,225 @@
+"""Lazy background rotation of account ciphertext to the current key version.
+
+Every ciphertext carries the version of the data key that produced it (see
+crypto_service). After a key rotation, or for values written before the header
+existed, rows are rewritten in the background: ``KEY_ROTATION_BATCH_SIZE`` rows
+per group-commit writer job, with a ``KEY_ROTATION_INTERVAL_MS`` pause between
+batches so regular requests keep the writer. There is no checkpoint to keep:
+a row is outdated exactly when its ciphertext header is not the current one,
+so an interrupted pass simply starts over at the next login. Once a pass leaves
+nothing outdated, the older key versions stored for decryption are dropped.
+"""
+import json
+import logging
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, bindparam, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Account, commit_or_flush, config_cache, db_writer
+from app.services.crypto_service import HEADER_SIZE, ciphertext_header, crypto_service
+
+logger = logging.getLogger(__name__)
+
+SECRET_COLUMNS = (Account.password_encrypted, Account.totp_secret_encrypted)
+
+# Version of the current data key, and older versions wrapped by the current data key
+KEY_VERSION_CONFIG_KEY = "vault_key_version"
+PREVIOUS_KEYS_CONFIG_KEY = "vault_previous_keys"
+
+
+class KeyRotationService:
+    """Queries and rewrites rows whose ciphertext is not at the current key version."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @staticmethod
+    def _outdated(version: int):
+        header = ciphertext_header(version)
+        return or_(*(
+            and_(column.isnot(None), column != b"", func.substr(column, 1, HEADER_SIZE) != header)
+            for column in SECRET_COLUMNS
+        ))
+
+    def count_outdated(self, version: int) -> int:
+        """Number of accounts (soft-deleted included) holding older ciphertext."""
+        return self.db.scalar(select(func.count()).select_from(Account).where(self._outdated(version)))
+
+    def prune_previous_keys(self, version: int) -> List[int]:
+        """Drop the stored older key versions once no row uses them; returns the versions dropped.
+
+        Only while ``version`` is still the stored current version and no row
+        is outdated for it, checked in the same transaction.
+        """
+        stored = config_cache.get(self.db, KEY_VERSION_CONFIG_KEY)
+        previous = config_cache.get(self.db, PREVIOUS_KEYS_CONFIG_KEY)
+        dropped = sorted(int(v) for v in json.loads(previous)) if previous else []
+        if not dropped or int(stored or 1) != version or self.count_outdated(version):
+            return []
+        config_cache.set(self.db, PREVIOUS_KEYS_CONFIG_KEY, json.dumps({}))
+        commit_or_flush(self.db)
+        return dropped
+
+    def rotate_batch(self, after_id: str, batch_size: Optional[int] = None) -> Tuple[int, Optional[str]]:
+        """Rewrite the next batch of outdated rows after ``after_id``.
+
+        Returns the number of rows rewritten and the last id visited (None
+        when nothing was left).
+        """
+        version = crypto_service.key_version
+        if version is None:
+            raise ValueError("Encryption key not set")
+        rows = self.db.execute(
+            select(Account.id, *SECRET_COLUMNS, Account.updated_at)
+            .where(Account.id > after_id, self._outdated(version))
+            .order_by(Account.id)
+            .limit(batch_size or settings.KEY_ROTATION_BATCH_SIZE)
+        ).all()
+        if not rows:
+            return 0, None
+
+        rotated = iter(crypto_service.rotate_many(
+            [blob for row in rows for blob in (row.password_encrypted, row.totp_secret_encrypted)]
+        ))
+        table = Account.__table__
+        self.db.execute(
+            update(table)
+            .where(table.c.id == bindparam("b_id"))
+            .values(
+                password_encrypted=bindparam("b_password"),
+                totp_secret_encrypted=bindparam("b_totp"),
+                updated_at=bindparam("b_updated_at"),
+            ),
+            [
+                {
+                    "b_id": row.id,
+                    "b_password": next(rotated),
+                    "b_totp": next(rotated),
+                    # Keep updated_at: rotation is not an edit
+                    "b_updated_at": row.updated_at,
+                }
+                for row in rows
+            ],
+        )
+        commit_or_flush(self.db)
+        return len(rows), rows[-1].id
+
+
+class KeyRotator:
+    """Low-priority background thread rewriting outdated rows batch by batch.
+
+    A pass runs until no row is outdated for the key version that is current
+    when it finishes: a rotation during a pass restarts it for the new version
+    instead of leaving rows behind. Counters describe the current pass.
+    """
+
+    def __init__(self):
+        self._thread: Optional[threading.Thread] = None
+        self._active = False
+        self._lock = threading.Lock()
+        self.key_version: Optional[int] = None
+        self.rows_rewritten = 0
+        self.batches = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def running(self) -> bool:
+        return self._active
+
+    def start(self) -> None:
+        """Start a rotation pass; a running pass picks up a new key version by itself."""
+        with self._lock:
+            if self._active:
+                return
+            self._active = True
+            self._thread = threading.Thread(target=self._run, name="key-rotation", daemon=True)
+            self._thread.start()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Wait for the current pass to finish."""
+        thread = self._thread
+        if thread:
+            thread.join(timeout)
+
+    def status(self) -> dict:
+        """Counters of the current or last pass."""
+        return {
+            "running": self.running,
+            "key_version": crypto_service.key_version,
+            "rows_rewritten": self.rows_rewritten,
+            "batches": self.batches,
+            "last_error": self.last_error,
+        }
+
+    def _begin_pass(self, version: Optional[int]) -> None:
+        self.key_version = version
+        self.rows_rewritten = 0
+        self.batches = 0
+        self.last_error = None
+
+    def _run(self) -> None:
+        try:
+            self._begin_pass(crypto_service.key_version)
+            while self._rotate(self.key_version):
+                if crypto_service.key_version == self.key_version:
+                    self._prune(self.key_version)
+                with self._lock:
+                    version = crypto_service.key_version
+                    if version is None or version == self.key_version:
+                        # Done (or locked: the next login starts a new pass)
+                        self._active = False
+                        return
+                logger.info(f"Key rotated again during a pass, restarting for version {version}")
+                self._begin_pass(version)
+        finally:
+            with self._lock:
+                # Unless start() already launched the next pass
+                if self._thread is threading.current_thread():
+                    self._active = False
+
+    def _prune(self, version: int) -> None:
+        """Drop older key versions after a pass that left nothing outdated."""
+        try:
+            dropped = db_writer.submit(
+                lambda session: KeyRotationService(session).prune_previous_keys(version)
+            ).result()
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error(f"Dropping old key versions failed: {e}")
+            return
+        if dropped:
+            logger.info(f"Dropped key versions no longer in use: {dropped}")
+
+    def _rotate(self, version: Optional[int]) -> bool:
+        """Rewrite every row outdated for ``version``; False if the pass failed."""
+        after_id = ""
+        batch_size = settings.KEY_ROTATION_BATCH_SIZE
+        while True:
+            if crypto_service.key_version != version:
+                # Locked, or rotated again: the caller decides whether to start over
+                logger.info("Key rotation paused")
+                return True
+            try:
+                count, last_id = db_writer.submit(
+                    lambda session: KeyRotationService(session).rotate_batch(after_id, batch_size)
+                ).result()
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Key rotation failed: {e}")
+                return False
+            self.rows_rewritten += count
+            self.batches += 1 if count else 0
+            if count < batch_size:
+                if count:
+                    logger.info(f"Key rotation to version {version} completed")
+                return True
+            after_id = last_id
+            time.sleep(settings.KEY_ROTATION_INTERVAL_MS / 1000)
+
+
+# Global rotator instance
+key_rotator = KeyRotator()
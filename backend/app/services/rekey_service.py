@@ -0,0 +1,241 @@
+"""Chunked, resumable re-encryption of account secrets.
+
+Moves every ciphertext from one key to another, e.g. when a legacy vault
+(encrypted directly with the master key) is migrated to a vault data key. The
+re-key job works in chunks of ``REKEY_CHUNK_SIZE`` accounts
+(soft-deleted ones included), ordered by id. Each chunk commits together with a
+checkpoint stored under ``rekey_state`` in ``system_config``:
+
+* ``status``: ``running`` or ``completed``
+* ``last_id`` / ``processed`` / ``total``: progress, the job resumes after ``last_id``
+* ``old_key``: the old key wrapped (AES-GCM) by the new one, so after a crash
+  the job can resume at the next login without knowing the old password
+* ``skipped_ids``: accounts whose secrets decrypt under neither key; they are
+  left as they are so one corrupt row cannot hold the job at ``running``
+
+While the job runs the old key stays loaded as a decrypt fallback
+(``crypto_service.set_previous_key``), so reads work whichever key a row still
+uses. Locking the application pauses the job; the next login resumes it.
+"""
+import json
+import logging
+import threading
+from datetime import datetime
+from typing import Optional
+
+from cryptography.exceptions import InvalidTag
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Account, commit_or_flush, config_cache, db_writer
+from app.services.crypto_service import crypto_service
+
+logger = logging.getLogger(__name__)
+
+REKEY_STATE_KEY = "rekey_state"
+
+# Checkpoint fields safe to expose through the API
+PUBLIC_FIELDS = ("status", "processed", "total", "started_at", "updated_at", "error", "skipped_ids")
+
+
+class RekeyService:
+    """Checkpointed re-encryption of account secrets from one key to another."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_state(self) -> Optional[dict]:
+        """Load the re-key checkpoint, None if no job ever ran."""
+        value = config_cache.get(self.db, REKEY_STATE_KEY)
+        return json.loads(value) if value else None
+
+    def _save_state(self, state: dict) -> None:
+        state["updated_at"] = datetime.utcnow().isoformat()
+        config_cache.set(self.db, REKEY_STATE_KEY, json.dumps(state))
+
+    def is_running(self) -> bool:
+        """Whether a re-key job has been started and not finished."""
+        state = self.get_state()
+        return state is not None and state["status"] == "running"
+
+    def start(self, old_key: bytes, new_key: bytes) -> dict:
+        """Record a new job; the caller commits together with the new credentials."""
+        if self.is_running():
+            raise ValueError("A re-encryption is already in progress")
+
+        now = datetime.utcnow().isoformat()
+        state = {
+            "status": "running",
+            "old_key": crypto_service.wrap_key(old_key, new_key),
+            "last_id": "",
+            "processed": 0,
+            "total": self.db.scalar(select(func.count()).select_from(Account)),
+            "started_at": now,
+            "error": None,
+            "skipped_ids": [],
+        }
+        self._save_state(state)
+        return state
+
+    def process_chunk(self, old_key: bytes, new_key: bytes, chunk_size: Optional[int] = None) -> bool:
+        """Re-encrypt the next chunk and advance the checkpoint.
+
+        Returns True once every account has been processed. Rows written with
+        the new key in the meantime are left as they are; rows that decrypt
+        under neither key are skipped and their IDs recorded.
+        """
+        state = self.get_state()
+        if not state or state["status"] != "running":
+            return True
+        chunk_size = chunk_size or settings.REKEY_CHUNK_SIZE
+
+        rows = self.db.execute(
+            select(Account.id, Account.password_encrypted, Account.totp_secret_encrypted, Account.updated_at)
+            .where(Account.id > state["last_id"])
+            .order_by(Account.id)
+            .limit(chunk_size)
+        ).all()
+
+        try:
+            reencrypted = crypto_service.reencrypt_many(
+                [blob for row in rows for blob in (row.password_encrypted, row.totp_secret_encrypted)],
+                old_key,
+                new_key,
+            )
+            pairs = [(row, reencrypted[2 * i:2 * i + 2]) for i, row in enumerate(rows)]
+        except InvalidTag:
+            pairs = self._reencrypt_rows(rows, old_key, new_key)
+            skipped = [row.id for row, blobs in pairs if blobs is None]
+            logger.warning(f"Re-encryption skipped {len(skipped)} undecryptable accounts: {skipped}")
+            state.setdefault("skipped_ids", []).extend(skipped)
+        params = [
+            {
+                "b_id": row.id,
+                "b_password": blobs[0],
+                "b_totp": blobs[1],
+                # Keep updated_at: re-encryption is not an edit
+                "b_updated_at": row.updated_at,
+            }
+            for row, blobs in pairs
+            if blobs is not None
+        ]
+        if params:
+            table = Account.__table__
+            self.db.execute(
+                update(table)
+                .where(table.c.id == bindparam("b_id"))
+                .values(
+                    password_encrypted=bindparam("b_password"),
+                    totp_secret_encrypted=bindparam("b_totp"),
+                    updated_at=bindparam("b_updated_at"),
+                ),
+                params,
+            )
+
+        done = len(rows) < chunk_size
+        if rows:
+            state["last_id"] = rows[-1].id
+            state["processed"] += len(rows)
+        if done:
+            # The old key is no longer needed, drop it from the checkpoint
+            state["status"] = "completed"
+            state.pop("old_key", None)
+            state["total"] = state["processed"]
+        self._save_state(state)
+        commit_or_flush(self.db)
+        return done
+
+    @staticmethod
+    def _reencrypt_rows(rows: list, old_key: bytes, new_key: bytes) -> list:
+        """Re-encrypt row by row; rows matching neither key get None instead of their blobs."""
+        pairs = []
+        for row in rows:
+            try:
+                blobs = crypto_service.reencrypt_many(
+                    [row.password_encrypted, row.totp_secret_encrypted], old_key, new_key
+                )
+            except InvalidTag:
+                blobs = None
+            pairs.append((row, blobs))
+        return pairs
+
+    def record_error(self, error: str) -> None:
+        """Store the last failure on a running job."""
+        state = self.get_state()
+        if state:
+            state["error"] = error
+            self._save_state(state)
+            commit_or_flush(self.db)
+
+    def run_to_completion(self, old_key: bytes, new_key: bytes) -> None:
+        """Process every remaining chunk in this session, committing per chunk."""
+        while not self.process_chunk(old_key, new_key):
+            pass
+
+
+class RekeyRunner:
+    """Drives a re-key job chunk by chunk through the group-commit writer.
+
+    Each chunk is one writer job, so it serializes with concurrent edits and
+    commits on its own; other writes interleave between chunks.
+    """
+
+    def __init__(self):
+        self._thread: Optional[threading.Thread] = None
+        self._new_key: Optional[bytes] = None
+        self._lock = threading.Lock()
+
+    def start(self, old_key: bytes, new_key: bytes) -> None:
+        """Run the pending job in a background thread (no-op if already running)."""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                if self._new_key == new_key:
+                    return
+                # A previous job is finishing or pausing on the key change
+                self._thread.join()
+            self._new_key = new_key
+            self._thread = threading.Thread(
+                target=self._run, args=(old_key, new_key), name="rekey", daemon=True
+            )
+            self._thread.start()
+
+    def resume(self, state: Optional[dict]) -> bool:
+        """Resume an interrupted job after login; the new key must be loaded."""
+        if not state or state["status"] != "running":
+            return False
+        new_key = crypto_service.current_key()
+        old_key = crypto_service.unwrap_key(state["old_key"], new_key)
+        crypto_service.set_previous_key(old_key)
+        logger.info(f"Resuming re-encryption at {state['processed']}/{state['total']}")
+        self.start(old_key, new_key)
+        return True
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Wait for the background thread to finish."""
+        thread = self._thread
+        if thread:
+            thread.join(timeout)
+
+    def _run(self, old_key: bytes, new_key: bytes) -> None:
+        while True:
+            if crypto_service.current_key() != new_key:
+                logger.info("Re-encryption paused: application locked or key changed")
+                return
+            try:
+                done = db_writer.submit(
+                    lambda session: RekeyService(session).process_chunk(old_key, new_key)
+                ).result()
+            except Exception as e:
+                error = str(e)
+                logger.error(f"Re-encryption failed: {error}")
+                db_writer.submit(lambda session: RekeyService(session).record_error(error)).result()
+                return
+            if done:
+                crypto_service.set_previous_key(None)
+                logger.info("Re-encryption completed")
+                return
+
+
+# Global runner instance
+rekey_runner = RekeyRunner()
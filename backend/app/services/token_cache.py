@@ -0,0 +1,72 @@
+"""Bounded LRU cache of verified session tokens.
+
+``get_current_user`` runs on every authenticated request, including each
+row-level password/TOTP reveal. Decoding and checking the JWT signature every
+time is wasted work for a token that was verified a moment ago, so verified
+tokens are remembered (by SHA-256 digest, never the token itself) together with
+their expiry. Entries are dropped once expired, evicted least recently used
+beyond ``TOKEN_CACHE_SIZE``, and the whole cache is flushed on logout, lock and
+master password change.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.config import settings
+from app.schemas import TokenData
+
+
+class TokenCache:
+    """Thread-safe LRU of token digest -> verified TokenData."""
+
+    def __init__(self, max_size: Optional[int] = None):
+        self.max_size = max_size if max_size is not None else settings.TOKEN_CACHE_SIZE
+        self._entries: "OrderedDict[bytes, TokenData]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[TokenData]:
+        """Cached token data, None if unknown or expired."""
+        digest = self._digest(token)
+        with self._lock:
+            token_data = self._entries.get(digest)
+            if token_data is None:
+                self.misses += 1
+                return None
+            if token_data.exp <= time.time():
+                del self._entries[digest]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return token_data
+
+    def put(self, token: str, token_data: TokenData) -> None:
+        """Remember a token that has just been verified."""
+        if self.max_size <= 0:
+            return
+        digest = self._digest(token)
+        with self._lock:
+            self._entries[digest] = token_data
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Forget every token, they must be fully verified again."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Global cache instance
+token_cache = TokenCache()
@@ -0,0 +1,119 @@
+"""Server-side TOTP codes (RFC 6238) with a per-window secret cache.
+
+Secrets are stored either as a bare base32 key (spaces, dashes and missing
+padding tolerated) or as an ``otpauth://totp/...`` URI whose ``digits``,
+``period`` and ``algorithm`` parameters are honoured.
+
+Decrypting and parsing a page of secrets on every refresh is the expensive
+part, so parsed secrets are kept in ``totp_cache`` keyed by their ciphertext:
+a changed, deleted or re-encrypted secret simply misses. The cache belongs to
+the current 30-second window and is dropped as soon as the window rolls over,
+and on lock/logout, so decrypted keys never outlive one code period.
+"""
+import base64
+import binascii
+import hashlib
+import hmac
+import struct
+import threading
+import time
+from typing import Dict, NamedTuple, Optional
+from urllib.parse import parse_qs, urlparse
+
+TOTP_PERIOD = 30
+TOTP_DIGITS = 6
+ALGORITHMS = {"SHA1": hashlib.sha1, "SHA256": hashlib.sha256, "SHA512": hashlib.sha512}
+
+
+class TotpSecret(NamedTuple):
+    """Decoded TOTP key and its parameters."""
+
+    key: bytes
+    digits: int = TOTP_DIGITS
+    period: int = TOTP_PERIOD
+    algorithm: str = "SHA1"
+
+
+def _decode_base32(value: str) -> bytes:
+    value = "".join(value.split()).replace("-", "").upper()
+    return base64.b32decode(value + "=" * (-len(value) % 8))
+
+
+def parse_secret(secret: str) -> TotpSecret:
+    """Parse a stored secret (base32 or otpauth URI); raises ValueError if invalid."""
+    secret = secret.strip()
+    try:
+        if secret.lower().startswith("otpauth://"):
+            params = {k.lower(): v[0] for k, v in parse_qs(urlparse(secret).query).items()}
+            parsed = TotpSecret(
+                key=_decode_base32(params["secret"]),
+                digits=int(params.get("digits", TOTP_DIGITS)),
+                period=int(params.get("period", TOTP_PERIOD)),
+                algorithm=params.get("algorithm", "SHA1").upper(),
+            )
+        else:
+            parsed = TotpSecret(key=_decode_base32(secret))
+    except (KeyError, binascii.Error, ValueError) as e:
+        raise ValueError("Invalid TOTP secret") from e
+    if not parsed.key or parsed.algorithm not in ALGORITHMS or not 6 <= parsed.digits <= 10 or parsed.period <= 0:
+        raise ValueError("Invalid TOTP secret")
+    return parsed
+
+
+def hotp(key: bytes, counter: int, digits: int = TOTP_DIGITS, algorithm: str = "SHA1") -> str:
+    """HOTP value (RFC 4226) for a counter."""
+    digest = hmac.new(key, struct.pack(">Q", counter), ALGORITHMS[algorithm]).digest()
+    offset = digest[-1] & 0x0F
+    value = struct.unpack(">I", digest[offset:offset + 4])[0] & 0x7FFFFFFF
+    return str(value % 10**digits).zfill(digits)
+
+
+def totp(secret: TotpSecret, now: Optional[float] = None) -> str:
+    """Current TOTP code (RFC 6238)."""
+    now = time.time() if now is None else now
+    return hotp(secret.key, int(now // secret.period), secret.digits, secret.algorithm)
+
+
+def seconds_remaining(secret: TotpSecret, now: Optional[float] = None) -> int:
+    """Seconds until the current code expires."""
+    now = time.time() if now is None else now
+    return secret.period - int(now) % secret.period
+
+
+class TotpSecretCache:
+    """Parsed secrets by ciphertext, valid for one 30-second window only."""
+
+    def __init__(self):
+        self._window: Optional[int] = None
+        self._secrets: Dict[bytes, Optional[TotpSecret]] = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, ciphertexts, now: float) -> Dict[bytes, Optional[TotpSecret]]:
+        """Cached entries for the given ciphertexts (None values mark invalid secrets)."""
+        with self._lock:
+            self._roll(now)
+            return {c: self._secrets[c] for c in ciphertexts if c in self._secrets}
+
+    def put_many(self, secrets: Dict[bytes, Optional[TotpSecret]], now: float) -> None:
+        with self._lock:
+            self._roll(now)
+            self._secrets.update(secrets)
+
+    def clear(self) -> None:
+        """Wipe every decrypted secret."""
+        with self._lock:
+            self._secrets.clear()
+            self._window = None
+
+    def _roll(self, now: float) -> None:
+        window = int(now // TOTP_PERIOD)
+        if window != self._window:
+            self._secrets.clear()
+            self._window = window
+
+    def __len__(self) -> int:
+        return len(self._secrets)
+
+
+# Global cache instance
+totp_cache = TotpSecretCache()
@@ -3,11 +3,12 @@ from typing import Optional
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import get_db
-from app.services.auth_service import AuthService
+from app.models import get_async_db
+from app.services.auth_service import AsyncAuthService, AuthService
 from app.services.crypto_service import crypto_service
+from app.services.token_cache import token_cache
 
 
 security = HTTPBearer()
@@ -15,11 +16,18 @@ security = HTTPBearer()
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
 ) -> str:
-    """Dependency to verify JWT token and return user."""
-    auth_service = AuthService(db)
-    token_data = auth_service.verify_token(credentials.credentials)
+    """Dependency to verify JWT token and return user.
+
+    Needs no database session: the JWT is checked on its own, and recently
+    verified tokens are served from the token cache.
+    """
+    token = credentials.credentials
+    token_data = token_cache.get(token)
+    if token_data is None:
+        token_data = AuthService.verify_token(token)
+        if token_data:
+            token_cache.put(token, token_data)
 
     if not token_data:
         raise HTTPException(
@@ -39,10 +47,10 @@ async def get_current_user(
     return token_data.sub
 
 
-def require_initialized(db: Session = Depends(get_db)) -> bool:
+async def require_initialized(db: AsyncSession = Depends(get_async_db)) -> bool:
     """Dependency to check if system is initialized."""
-    auth_service = AuthService(db)
-    if not auth_service.is_initialized():
+    auth_service = AsyncAuthService(db)
+    if not await auth_service.is_initialized():
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="System not initialized. Please set up master password first.",
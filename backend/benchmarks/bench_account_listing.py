@@ -0,0 +1,125 @@
+"""Benchmark the account list read path: ORM hydration vs. column projection.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_account_listing --sizes 1000 10000 100000
+
+For every vault size a fresh database is seeded with accounts that carry
+ciphertext blobs, custom fields and two tags each. Both paths render one page
+of ``--page-size`` accounts to JSON, the way GET /api/accounts does.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.api.accounts import account_to_response
+from app.models.database import Account, Base, Tag, account_tags, apply_sqlite_pragmas
+from app.schemas import AccountListResponse
+from app.services.account_service import AccountService
+
+
+def seed(Session, size: int) -> None:
+    """Insert ``size`` accounts with blobs, custom fields and tags."""
+    tag_ids = [str(uuid.uuid4()) for _ in range(10)]
+    now = datetime.utcnow()
+    with Session() as session:
+        session.execute(
+            insert(Tag),
+            [{"id": tag_id, "name": f"tag{i}", "color": "#6366f1", "created_at": now} for i, tag_id in enumerate(tag_ids)],
+        )
+        for start in range(0, size, 5000):
+            accounts, links = [], []
+            for i in range(start, min(start + 5000, size)):
+                account_id = str(uuid.uuid4())
+                accounts.append({
+                    "id": account_id,
+                    "email": f"user{i}@example.com",
+                    "password_encrypted": os.urandom(44),
+                    "totp_secret_encrypted": os.urandom(60),
+                    "note": f"note for account {i}",
+                    "sub2api": i % 2 == 0,
+                    "source": f"source{i % 5}",
+                    "gpt_membership": "plus" if i % 3 == 0 else None,
+                    "custom_fields": {"region": f"r{i % 7}", "owner": f"owner{i % 11}"},
+                    "is_deleted": False,
+                    "created_at": now - timedelta(seconds=i),
+                    "updated_at": now,
+                })
+                links.append({"account_id": account_id, "tag_id": tag_ids[i % 10]})
+                links.append({"account_id": account_id, "tag_id": tag_ids[(i + 3) % 10]})
+            session.execute(insert(Account), accounts)
+            session.execute(insert(account_tags), links)
+        session.commit()
+
+
+def orm_page(Session, page: int, page_size: int) -> str:
+    """Current path: ORM entities -> AccountResponse -> JSON."""
+    with Session() as session:
+        accounts, total, has_more = AccountService(session).get_accounts(page=page, page_size=page_size)
+        return AccountListResponse(
+            items=[account_to_response(a) for a in accounts],
+            total=total,
+            page=page,
+            page_size=page_size,
+            total_pages=-(-total // page_size),
+            has_more=has_more,
+        ).model_dump_json()
+
+
+def projection_page(Session, page: int, page_size: int) -> str:
+    """Projection path: column rows -> dicts -> JSON."""
+    with Session() as session:
+        items, total, has_more = AccountService(session).list_account_rows(page=page, page_size=page_size)
+        for item in items:
+            item["created_at"] = item["created_at"].isoformat()
+            item["updated_at"] = item["updated_at"].isoformat()
+        return json.dumps({
+            "items": items,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "total_pages": -(-total // page_size),
+            "has_more": has_more,
+        })
+
+
+def timed(fn, *args, repeat: int) -> float:
+    """Average milliseconds per call."""
+    fn(*args)  # warm up caches
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(*args)
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'accounts':>9} {'orm ms':>9} {'projection ms':>14} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            engine = create_engine(f"sqlite:///{Path(tmp) / f'list_{size}.db'}")
+            event.listen(engine, "connect", apply_sqlite_pragmas)
+            Base.metadata.create_all(bind=engine)
+            Session = sessionmaker(bind=engine)
+            seed(Session, size)
+
+            orm_ms = timed(orm_page, Session, 1, args.page_size, repeat=args.repeat)
+            projection_ms = timed(projection_page, Session, 1, args.page_size, repeat=args.repeat)
+            print(f"{size:>9} {orm_ms:>9.2f} {projection_ms:>14.2f} {orm_ms / projection_ms:>7.1f}x")
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
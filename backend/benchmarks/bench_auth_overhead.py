@@ -0,0 +1,60 @@
+"""Benchmark per-request authentication overhead of get_current_user.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_auth_overhead --requests 20000
+
+The baseline opens an AsyncSession and fully decodes the JWT for every
+request, as get_current_user did before the verified-token cache. The cached
+run calls the current dependency, which after the first request only looks up
+the token digest.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.services.auth_service import AsyncAuthService, AuthService
+from app.services.crypto_service import crypto_service
+from app.utils.security import get_current_user
+
+
+def report(label: str, requests: int, seconds: float) -> None:
+    print(f"{label:<22} {seconds / requests * 1e6:>8.1f} us/request  ({requests / seconds:,.0f} req/s)")
+
+
+async def run(requests: int) -> None:
+    token = AuthService.issue_token()
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    crypto_service.set_encryption_key(os.urandom(32))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'auth.db'}")
+        Session = async_sessionmaker(engine, expire_on_commit=False)
+
+        start = time.perf_counter()
+        for _ in range(requests):
+            async with Session() as db:
+                assert await AsyncAuthService(db).verify_token(token)
+        report("session + jwt.decode", requests, time.perf_counter() - start)
+        await engine.dispose()
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        assert await get_current_user(credentials) == "master"
+    report("token cache", requests, time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20_000)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests))
+
+
+if __name__ == "__main__":
+    main()
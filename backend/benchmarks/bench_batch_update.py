@@ -0,0 +1,95 @@
+"""Benchmark POST /api/accounts/batch/update: per-account loop vs. bulk UPDATE.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_batch_update --sizes 1000 10000
+
+For every size a fresh database is seeded with that many tagged accounts and
+all of them get the same note, source and tags. The loop is what the endpoint
+did before: ``update_account`` per ID (lookup, setattr, tag reload, commit,
+refresh). The bulk path is ``update_accounts``: one UPDATE ... RETURNING and
+one tag DELETE + INSERT ... SELECT per chunk, one commit.
+"""
+import argparse
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.models.database import Account, Base, Tag, account_tags, apply_sqlite_pragmas
+from app.schemas import AccountUpdate
+from app.services.account_service import AccountService
+
+
+def seed(Session, size: int) -> tuple:
+    """Insert ``size`` accounts with one tag each; returns (account IDs, tag IDs)."""
+    tag_ids = [str(uuid.uuid4()) for _ in range(3)]
+    account_ids = [str(uuid.uuid4()) for _ in range(size)]
+    now = datetime.utcnow()
+    with Session() as session:
+        session.execute(
+            insert(Tag),
+            [{"id": tag_id, "name": f"tag{i}", "color": "#6366f1", "created_at": now} for i, tag_id in enumerate(tag_ids)],
+        )
+        session.execute(
+            insert(Account),
+            [
+                {"id": account_id, "email": f"user{i}@example.com", "note": f"note {i}", "sub2api": False,
+                 "is_deleted": False, "created_at": now, "updated_at": now}
+                for i, account_id in enumerate(account_ids)
+            ],
+        )
+        session.execute(insert(account_tags), [{"account_id": a, "tag_id": tag_ids[0]} for a in account_ids])
+        session.commit()
+    return account_ids, tag_ids
+
+
+def loop_update(Session, account_ids, values) -> int:
+    """Old endpoint: one update_account call (and commit) per ID."""
+    data = AccountUpdate(**values)
+    updated = 0
+    with Session() as session:
+        service = AccountService(session)
+        for account_id in account_ids:
+            if service.update_account(account_id, data):
+                updated += 1
+    return updated
+
+
+def bulk_update(Session, account_ids, values) -> int:
+    with Session() as session:
+        updated, _ = AccountService(session).update_accounts(account_ids, values)
+    return updated
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    args = parser.parse_args()
+
+    print(f"{'accounts':>9} {'loop ms':>10} {'bulk ms':>9} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            timings = []
+            for label, fn in (("loop", loop_update), ("bulk", bulk_update)):
+                engine = create_engine(f"sqlite:///{Path(tmp) / f'{label}_{size}.db'}")
+                event.listen(engine, "connect", apply_sqlite_pragmas)
+                Base.metadata.create_all(bind=engine)
+                Session = sessionmaker(bind=engine)
+                account_ids, tag_ids = seed(Session, size)
+                values = {"note": "bulk", "source": "bench", "tag_ids": tag_ids[1:]}
+
+                start = time.perf_counter()
+                assert fn(Session, account_ids, values) == size
+                timings.append((time.perf_counter() - start) * 1000)
+                engine.dispose()
+
+            loop_ms, bulk_ms = timings
+            print(f"{size:>9} {loop_ms:>10.0f} {bulk_ms:>9.0f} {loop_ms / bulk_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
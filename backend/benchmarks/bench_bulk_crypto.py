@@ -0,0 +1,64 @@
+"""Benchmark field encryption: per-call encrypt/decrypt vs. the bulk API.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_bulk_crypto --fields 100000 --workers 4
+
+The per-call baseline builds a fresh AESGCM object and copies the ciphertext
+by slicing for every field, as CryptoService did before encrypt_many /
+decrypt_many existed.
+"""
+import argparse
+import os
+import time
+
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from app.config import settings
+from app.services.crypto_service import CryptoService
+
+
+def legacy_encrypt(key: bytes, plaintext: str) -> bytes:
+    nonce = os.urandom(12)
+    return nonce + AESGCM(key).encrypt(nonce, plaintext.encode("utf-8"), None)
+
+
+def legacy_decrypt(key: bytes, encrypted: bytes) -> str:
+    return AESGCM(key).decrypt(encrypted[:12], encrypted[12:], None).decode("utf-8")
+
+
+def report(label: str, fields: int, seconds: float) -> None:
+    print(f"{label:<26} {fields / seconds:>12,.0f} fields/s  ({seconds * 1000:.0f} ms)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fields", type=int, default=100_000)
+    parser.add_argument("--size", type=int, default=32, help="plaintext length in characters")
+    parser.add_argument("--workers", type=int, default=settings.CRYPTO_WORKERS)
+    args = parser.parse_args()
+
+    key = os.urandom(32)
+    plaintexts = [os.urandom(args.size // 2).hex() for _ in range(args.fields)]
+
+    start = time.perf_counter()
+    encrypted = [legacy_encrypt(key, p) for p in plaintexts]
+    report("per-call encrypt", args.fields, time.perf_counter() - start)
+    start = time.perf_counter()
+    [legacy_decrypt(key, e) for e in encrypted]
+    report("per-call decrypt", args.fields, time.perf_counter() - start)
+
+    for workers in sorted({1, args.workers}):
+        settings.CRYPTO_WORKERS = workers
+        crypto = CryptoService()
+        crypto.set_encryption_key(key)
+
+        start = time.perf_counter()
+        encrypted = crypto.encrypt_many(plaintexts)
+        report(f"encrypt_many ({workers} workers)", args.fields, time.perf_counter() - start)
+        start = time.perf_counter()
+        assert crypto.decrypt_many(encrypted) == plaintexts
+        report(f"decrypt_many ({workers} workers)", args.fields, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark write throughput: commit per request vs. the group-commit writer.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_group_commit --writes 2000 --threads 16
+
+Both runs insert the same number of accounts from concurrent threads into a
+fresh database file using the production pragma profile (synchronous=FULL by
+default here, so every commit pays for an fsync).
+"""
+import argparse
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.models import database
+from app.models.database import Account, Base, apply_sqlite_pragmas, use_immediate_transactions
+from app.models.writer import GroupCommitWriter, commit_or_flush
+
+
+def insert_job(session) -> str:
+    account = Account(email=f"{uuid.uuid4().hex}@example.com")
+    session.add(account)
+    commit_or_flush(session)
+    return account.id
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writes", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--synchronous", default="FULL", choices=["OFF", "NORMAL", "FULL"])
+    args = parser.parse_args()
+    settings.SQLITE_SYNCHRONOUS = args.synchronous
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{Path(tmp) / 'writes.db'}"
+        engine = create_engine(url, connect_args={"check_same_thread": False}, pool_size=args.threads)
+        event.listen(engine, "connect", apply_sqlite_pragmas)
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+
+        def per_request_commit(_):
+            with Session() as session:
+                return insert_job(session)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.threads) as pool:
+            list(pool.map(per_request_commit, range(args.writes)))
+        direct = time.perf_counter() - start
+
+        write_engine = create_engine(url, connect_args={"check_same_thread": False})
+        event.listen(write_engine, "connect", apply_sqlite_pragmas)
+        use_immediate_transactions(write_engine)
+        database.WriteSessionLocal = sessionmaker(autoflush=False, expire_on_commit=False, bind=write_engine)
+        writer = GroupCommitWriter()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.threads) as pool:
+            list(pool.map(lambda _: writer.submit(insert_job).result(), range(args.writes)))
+        grouped = time.perf_counter() - start
+        writer.stop()
+
+        print(f"commit per request: {args.writes / direct:>9.1f} writes/s")
+        print(
+            f"group commit:       {args.writes / grouped:>9.1f} writes/s "
+            f"({writer.batches} commits, {writer.jobs / writer.batches:.1f} writes per commit)"
+        )
+        engine.dispose()
+        write_engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Benchmark SQLite read/write throughput with and without the pragma profile.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_sqlite_pragmas --writers 4 --readers 4 --seconds 5
+
+Each run uses a fresh database file. Writer threads insert accounts one transaction
+at a time (like single-account edits), reader threads run the account list query.
+"""
+import argparse
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.models.database import Account, Base, apply_sqlite_pragmas
+
+
+def run_profile(db_path: Path, use_profile: bool, writers: int, readers: int, seconds: float) -> dict:
+    """Run a mixed read/write workload against one database file."""
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    if use_profile:
+        event.listen(engine, "connect", apply_sqlite_pragmas)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+
+    # Seed some rows so reads have work to do
+    with Session() as session:
+        session.add_all(Account(email=f"seed{i}@example.com", note="seed") for i in range(2000))
+        session.commit()
+
+    stop = threading.Event()
+    counters = {"writes": 0, "reads": 0, "locked": 0}
+    lock = threading.Lock()
+
+    def bump(key: str) -> None:
+        with lock:
+            counters[key] += 1
+
+    def writer() -> None:
+        while not stop.is_set():
+            with Session() as session:
+                try:
+                    session.add(Account(email=f"{uuid.uuid4().hex}@example.com", note="bench"))
+                    session.commit()
+                    bump("writes")
+                except OperationalError:
+                    session.rollback()
+                    bump("locked")
+
+    def reader() -> None:
+        while not stop.is_set():
+            with Session() as session:
+                try:
+                    session.execute(
+                        select(Account.id, Account.email)
+                        .where(Account.is_deleted == False)
+                        .order_by(Account.created_at.desc())
+                        .limit(20)
+                    ).all()
+                    session.execute(select(func.count(Account.id))).scalar()
+                    bump("reads")
+                except OperationalError:
+                    bump("locked")
+
+    threads = [threading.Thread(target=writer) for _ in range(writers)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    with engine.connect() as conn:
+        journal_mode = conn.exec_driver_sql("PRAGMA journal_mode").scalar()
+    engine.dispose()
+
+    return {
+        "journal_mode": journal_mode,
+        "writes_per_sec": counters["writes"] / seconds,
+        "reads_per_sec": counters["reads"] / seconds,
+        "locked_errors": counters["locked"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, use_profile in (("default", False), ("profile", True)):
+            db_path = Path(tmp) / f"{label}.db"
+            result = run_profile(db_path, use_profile, args.writers, args.readers, args.seconds)
+            print(
+                f"{label:<8} journal={result['journal_mode']:<7} "
+                f"writes/s={result['writes_per_sec']:>9.1f} "
+                f"reads/s={result['reads_per_sec']:>9.1f} "
+                f"locked={result['locked_errors']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
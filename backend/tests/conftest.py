@@ -9,7 +9,9 @@ os.environ["TESTING"] = "true"
 os.environ["DATABASE_PATH"] = ":memory:"
 
 from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import NullPool
 from fastapi import FastAPI
 
 # Test database setup with shared cache for SQLite in-memory
@@ -22,17 +24,44 @@ test_engine = create_engine(
 )
 TestSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
 
+# Async engine on the same shared in-memory database. NullPool because aiosqlite
+# connections are bound to the event loop of the TestClient that opened them.
+TEST_ASYNC_DATABASE_URL = "sqlite+aiosqlite:///file:testdb?mode=memory&cache=shared&uri=true"
+test_async_engine = create_async_engine(TEST_ASYNC_DATABASE_URL, poolclass=NullPool, echo=False)
+TestAsyncSessionLocal = async_sessionmaker(bind=test_async_engine, autoflush=False, expire_on_commit=False)
+
+# Writer engine for the group-commit writer thread
+test_write_engine = create_engine(
+    TEST_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    echo=False,
+)
+TestWriteSessionLocal = sessionmaker(autoflush=False, expire_on_commit=False, bind=test_write_engine)
+
 
 # Now import app modules
-from app.models.database import Base, get_db
+from app.models.database import Base, get_db, get_async_db, set_query_only, use_immediate_transactions
 from app.models import database as db_module
+from app.models.config_cache import config_cache
 from app.services.crypto_service import crypto_service
+from app.services.key_rotation import key_rotator
+from app.services.rekey_service import rekey_runner
+from app.services.token_cache import token_cache
+from app.services.totp_service import totp_cache
 from app.api import auth_router, accounts_router, tags_router
 from app.config import settings
 
 # Override the engine and SessionLocal in the database module
 db_module.engine = test_engine
 db_module.SessionLocal = TestSessionLocal
+db_module.async_engine = test_async_engine
+db_module.AsyncSessionLocal = TestAsyncSessionLocal
+db_module.write_engine = test_write_engine
+db_module.WriteSessionLocal = TestWriteSessionLocal
+
+# Same connection setup as production: read-only request sessions, immediate writer transactions
+event.listen(test_async_engine.sync_engine, "connect", set_query_only)
+use_immediate_transactions(test_write_engine)
 
 
 def create_test_app() -> FastAPI:
@@ -83,6 +112,7 @@ def db() -> Generator[Session, None, None]:
     """Create a fresh database session for each test."""
     # Clear crypto key at start of each test
     crypto_service.clear_encryption_key()
+    config_cache.invalidate()
 
     # Create tables
     Base.metadata.create_all(bind=test_engine)
@@ -92,10 +122,16 @@ def db() -> Generator[Session, None, None]:
         yield session
     finally:
         session.close()
+        # Let background re-encryption finish before the tables go away
+        rekey_runner.join(timeout=10)
+        key_rotator.join(timeout=10)
         # Drop all tables after test
         Base.metadata.drop_all(bind=test_engine)
         # Clear crypto key after test
         crypto_service.clear_encryption_key()
+        token_cache.clear()
+        totp_cache.clear()
+        config_cache.invalidate()
 
 
 @pytest.fixture(scope="function")
@@ -109,7 +145,12 @@ def client(db: Session):
         finally:
             pass
 
+    async def override_get_async_db():
+        async with TestAsyncSessionLocal() as session:
+            yield session
+
     test_app.dependency_overrides[get_db] = override_get_db
+    test_app.dependency_overrides[get_async_db] = override_get_async_db
 
     with TestClient(test_app) as test_client:
         yield test_client
@@ -0,0 +1,384 @@
+"""Tests for account service."""
+import asyncio
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Account, Tag
+from app.models.database import account_tags
+from app.schemas import AccountCreate, AccountUpdate
+from app.services.account_service import EXPORT_OPTIONS, AccountService, AsyncAccountService
+from app.services.crypto_service import crypto_service
+from tests.conftest import TestAsyncSessionLocal, test_engine
+
+
+@contextmanager
+def count_statements():
+    """Collect the SQL statements executed on the test engine."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(test_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(test_engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture
+def unlocked(db: Session):
+    """Tables created and an encryption key loaded."""
+    crypto_service.set_encryption_key(b"k" * 32)
+    return db
+
+
+class TestAsyncAccountService:
+    """Test cases for the async account service."""
+
+    async def test_create_and_get(self, unlocked):
+        """Test creating and reading an account through an AsyncSession."""
+        async with TestAsyncSessionLocal() as session:
+            service = AsyncAccountService(session)
+            account = await service.create_account(
+                AccountCreate(email="async@example.com", password="secret")
+            )
+
+            fetched = await service.get_account_by_id(account.id)
+            assert fetched.email == "async@example.com"
+            assert await service.get_decrypted_password(account.id) == "secret"
+
+    async def test_update_and_list(self, unlocked):
+        """Test updates are visible to list queries."""
+        async with TestAsyncSessionLocal() as session:
+            service = AsyncAccountService(session)
+            account = await service.create_account(AccountCreate(email="a@example.com"))
+            await service.update_account(account.id, AccountUpdate(source="web"))
+
+            accounts, total, _ = await service.get_accounts(source="web")
+            assert total == 1
+            assert accounts[0].id == account.id
+
+    async def test_concurrent_sessions(self, unlocked):
+        """Test independent sessions can run queries concurrently."""
+        async with TestAsyncSessionLocal() as session:
+            await AsyncAccountService(session).create_account(AccountCreate(email="c@example.com"))
+
+        async def count() -> int:
+            async with TestAsyncSessionLocal() as session:
+                _, total, _ = await AsyncAccountService(session).get_accounts()
+                return total
+
+        assert await asyncio.gather(*(count() for _ in range(5))) == [1] * 5
+
+
+class TestGetAccounts:
+    """Test cases for the account list query."""
+
+    @pytest.fixture
+    def accounts(self, db: Session):
+        db.add_all(Account(email=f"list{i}@example.com", source="web") for i in range(5))
+        db.commit()
+        db.expunge_all()
+        return db
+
+    def test_page_and_total_in_one_statement(self, accounts):
+        """Test the page and the total come back from a single query."""
+        service = AccountService(accounts)
+        with count_statements() as statements:
+            page, total, has_more = service.get_accounts(page=1, page_size=2, source="web")
+
+        account_queries = [s for s in statements if "FROM accounts" in s]
+        assert len(account_queries) == 1
+        assert [len(page), total, has_more] == [2, 5, True]
+
+    def test_without_total_skips_counting(self, accounts):
+        """Test with_total=False issues no count and reports has_more."""
+        service = AccountService(accounts)
+        with count_statements() as statements:
+            page, total, has_more = service.get_accounts(page=3, page_size=2, with_total=False)
+
+        account_queries = [s for s in statements if "FROM accounts" in s]
+        assert len(account_queries) == 1
+        assert "count(" not in account_queries[0].lower()
+        assert [len(page), total, has_more] == [1, None, False]
+
+    def test_total_past_last_page(self, accounts):
+        """Test the total is still reported for an empty page past the end."""
+        page, total, has_more = AccountService(accounts).get_accounts(page=10, page_size=2)
+
+        assert [len(page), total, has_more] == [0, 5, False]
+
+    def test_list_account_rows_projection(self, db: Session):
+        """Test the projection path returns response-shaped dicts without ciphertext."""
+        tag = Tag(name="vip", color="#ff0000")
+        db.add(Account(email="secret@example.com", password_encrypted=b"ciphertext", tags=[tag]))
+        db.add(Account(email="plain@example.com"))
+        db.commit()
+
+        with count_statements() as statements:
+            items, total, has_more = AccountService(db).list_account_rows(page_size=10)
+
+        assert len(statements) == 2  # page + total, then tag briefs
+        assert "password_encrypted" not in statements[0]
+        by_email = {item["email"]: item for item in items}
+        assert by_email["secret@example.com"]["has_password"] is True
+        assert by_email["secret@example.com"]["tags"] == [{"id": tag.id, "name": "vip", "color": "#ff0000"}]
+        assert by_email["plain@example.com"]["has_password"] is False
+        assert by_email["plain@example.com"]["tags"] == []
+        assert "password_encrypted" not in by_email["plain@example.com"]
+        assert [total, has_more] == [2, False]
+
+
+class TestDeferredColumns:
+    """Test cases for the deferred ciphertext and custom_fields columns."""
+
+    def test_flags_follow_ciphertext(self, unlocked):
+        """Test has_password / has_totp track the encrypted columns."""
+        service = AccountService(unlocked)
+        account = service.create_account(AccountCreate(email="flags@example.com", password="pw", totp_secret="s"))
+        assert [account.has_password, account.has_totp] == [True, True]
+
+        account = service.update_account(account.id, AccountUpdate(password=""))
+        assert [account.has_password, account.has_totp] == [False, True]
+
+    def test_get_accounts_skips_ciphertext(self, unlocked):
+        """Test entity queries leave the blobs unloaded unless asked for."""
+        service = AccountService(unlocked)
+        service.create_account(AccountCreate(email="blob@example.com", password="pw", custom_fields={"k": "v"}))
+        unlocked.expunge_all()
+
+        with count_statements() as statements:
+            service.get_accounts()
+        assert "password_encrypted" not in statements[0]
+        assert "custom_fields" not in statements[0]
+
+        accounts, _, _ = service.get_accounts(options=EXPORT_OPTIONS)
+        unlocked.expunge_all()
+        assert crypto_service.decrypt(accounts[0].password_encrypted) == "pw"
+        assert accounts[0].custom_fields == {"k": "v"}
+
+    def test_decrypt_reads_single_column(self, unlocked):
+        """Test revealing a password selects only its ciphertext."""
+        service = AccountService(unlocked)
+        account = service.create_account(AccountCreate(email="one@example.com", password="pw", totp_secret="s"))
+
+        with count_statements() as statements:
+            assert service.get_decrypted_password(account.id) == "pw"
+        assert len(statements) == 1
+        assert "totp_secret_encrypted" not in statements[0]
+
+
+class TestBatchOperations:
+    """Test cases for the set-based batch operations."""
+
+    @pytest.fixture
+    def accounts(self, db: Session):
+        tag = Tag(name="batch")
+        rows = [Account(email=f"batch{i}@example.com", tags=[tag]) for i in range(5)]
+        db.add_all(rows)
+        db.commit()
+        ids = [row.id for row in rows]
+        db.expunge_all()
+        return ids
+
+    def test_soft_delete_in_chunks(self, db: Session, accounts, monkeypatch):
+        """Test one UPDATE per chunk and a count from rowcounts."""
+        monkeypatch.setattr(settings, "DB_IN_CHUNK_SIZE", 2)
+        with count_statements() as statements:
+            deleted = AccountService(db).delete_accounts(accounts[:3] + ["missing"] + accounts[:1])
+
+        assert deleted == 3
+        assert len([s for s in statements if s.startswith("UPDATE accounts")]) == 2
+        assert db.scalar(select(func.count()).select_from(Account).where(Account.is_deleted == True)) == 3
+        # Already deleted accounts are not counted again
+        assert AccountService(db).delete_accounts(accounts[:3]) == 0
+
+    def test_hard_delete_removes_tag_links(self, db: Session, accounts):
+        """Test hard deletes clean up account_tags and the rows themselves."""
+        assert AccountService(db).delete_accounts(accounts[:2], hard_delete=True) == 2
+
+        assert db.scalar(select(func.count()).select_from(Account)) == 3
+        assert db.scalar(select(func.count()).select_from(account_tags)) == 3
+
+    def test_update_tags(self, db: Session, accounts, monkeypatch):
+        """Test add/remove/set work on account_tags with a few statements per chunk."""
+        monkeypatch.setattr(settings, "DB_IN_CHUNK_SIZE", 2)
+        extra = Tag(name="extra")
+        db.add(extra)
+        db.commit()
+        batch_id = db.scalar(select(Tag.id).where(Tag.name == "batch"))
+        service = AccountService(db)
+
+        def tag_count(tag_id):
+            return db.scalar(select(func.count()).select_from(account_tags).where(account_tags.c.tag_id == tag_id))
+
+        with count_statements() as statements:
+            assert service.update_tags(accounts[:3] + ["missing"], [extra.id, "unknown-tag"]) == 3
+        assert len([s for s in statements if s.startswith("INSERT")]) == 2
+        assert tag_count(extra.id) == 3
+        # Adding again is a no-op on the links
+        assert service.update_tags(accounts[:3], [extra.id, batch_id]) == 3
+        assert tag_count(batch_id) == 5
+
+        assert service.update_tags(accounts[:2], [batch_id], action="remove") == 2
+        assert tag_count(batch_id) == 3
+        assert tag_count(extra.id) == 3
+
+        assert service.update_tags(accounts, [batch_id], action="set") == 5
+        assert tag_count(batch_id) == 5
+        assert tag_count(extra.id) == 0
+
+        with pytest.raises(ValueError):
+            service.update_tags(accounts, [batch_id], action="toggle")
+
+    def test_update_accounts(self, db: Session, accounts, monkeypatch):
+        """Test one UPDATE ... RETURNING per chunk, tags replaced, missing IDs reported."""
+        monkeypatch.setattr(settings, "DB_IN_CHUNK_SIZE", 2)
+        extra = Tag(name="extra")
+        db.add(extra)
+        db.commit()
+        AccountService(db).delete_accounts(accounts[4:])
+
+        with count_statements() as statements:
+            updated, missing = AccountService(db).update_accounts(
+                accounts + ["missing"],
+                {"note": "bulk", "sub2api": None, "source": None, "tag_ids": [extra.id]},
+            )
+
+        assert updated == 4
+        assert missing == [accounts[4], "missing"]
+        assert len([s for s in statements if s.startswith("UPDATE accounts")]) == 3
+        rows = db.execute(select(Account.note, Account.sub2api).where(Account.is_deleted == False)).all()
+        assert rows == [("bulk", False)] * 4
+        links = db.execute(select(account_tags.c.tag_id)).scalars().all()
+        assert sorted(links) == sorted([extra.id] * 4 + [db.scalar(select(Tag.id).where(Tag.name == "batch"))])
+
+    def test_ciphertexts_in_chunks(self, db: Session, accounts, monkeypatch):
+        """Test secret lookups run one SELECT per chunk and keep request order."""
+        monkeypatch.setattr(settings, "DB_IN_CHUNK_SIZE", 2)
+        requested = accounts[::-1] + ["missing", accounts[0]]
+
+        with count_statements() as statements:
+            found, missing = AccountService(db).get_ciphertexts(requested)
+
+        assert list(found) == accounts[::-1]
+        assert missing == ["missing"]
+        assert len([s for s in statements if s.startswith("SELECT")]) == 3
+
+    def test_filter_targets(self, db: Session, accounts):
+        """Test operations by filter run as single statements over the filtered query."""
+        service = AccountService(db)
+        service.update_accounts(accounts[:3], {"source": "web"})
+        batch_id = db.scalar(select(Tag.id).where(Tag.name == "batch"))
+
+        assert service.count_accounts(filters={"source": "web"}) == 3
+        assert service.count_accounts(filters={"search": "batch4"}) == 1
+
+        # The tag filter no longer matches once links are removed; the count must not change
+        filters = {"tag_ids": [batch_id], "source": "web"}
+        assert service.update_tags(None, [batch_id], action="remove", filters=filters) == 3
+        assert service.count_accounts(filters={"tag_ids": [batch_id]}) == 2
+
+        with count_statements() as statements:
+            assert service.update_accounts(None, {"note": "web"}, filters={"source": "web"}) == (3, [])
+        assert len(statements) == 1
+
+        with count_statements() as statements:
+            assert service.delete_accounts(filters={"source": "web"}) == 3
+        assert len(statements) == 1
+        assert service.count_accounts(filters={}) == 2
+        with pytest.raises(ValueError):
+            service.count_accounts()
+        assert service.delete_accounts(filters={"search": "batch4"}, hard_delete=True) == 1
+        assert db.scalar(select(func.count()).select_from(account_tags)) == 1
+
+    def test_hard_delete_by_tag_filter(self, db: Session, accounts, monkeypatch):
+        """Test a hard delete by tag filter removes the accounts, not only their tag links."""
+        monkeypatch.setattr(settings, "DB_IN_CHUNK_SIZE", 2)
+        service = AccountService(db)
+        batch_id = db.scalar(select(Tag.id).where(Tag.name == "batch"))
+        service.update_tags(accounts[3:], [batch_id], action="remove")
+        filters = {"tag_ids": [batch_id]}
+
+        assert service.count_accounts(filters=filters) == 3
+        assert service.delete_accounts(filters=filters, hard_delete=True) == 3
+        assert sorted(db.scalars(select(Account.id)).all()) == sorted(accounts[3:])
+        assert db.scalar(select(func.count()).select_from(account_tags)) == 0
+
+    def test_update_accounts_rejects_shared_email(self, db: Session, accounts):
+        """Test a unique email cannot be bulk-assigned."""
+        service = AccountService(db)
+        with pytest.raises(ValueError):
+            service.update_accounts(accounts[:2], {"email": "same@example.com"})
+        with pytest.raises(ValueError):
+            service.update_accounts(accounts[:1], {"email": "batch1@example.com"})
+        with pytest.raises(ValueError):
+            service.update_accounts(accounts[:1], {"password": "secret"})
+
+        assert service.update_accounts(accounts[:1], {"email": "renamed@example.com"}) == (1, [])
+
+
+class TestImport:
+    """Test cases for the bulk import path."""
+
+    def test_plan_folds_duplicates(self, unlocked: Session):
+        """Test duplicate emails fold like sequential imports and deleted emails are refused."""
+        db = unlocked
+        db.add_all([
+            Account(email="gone@example.com", is_deleted=True),
+            Account(email="kept@example.com", password_encrypted=crypto_service.encrypt("pw")),
+        ])
+        db.commit()
+        rows = [
+            (2, {"email": "new@example.com", "note": "first"}),
+            (3, {"email": "new@example.com", "note": "second", "source": "x"}),
+            (4, {"email": "gone@example.com"}),
+            (5, {"email": "kept@example.com", "password": "other"}),
+        ]
+        existing = AccountService(db).get_import_conflicts([data["email"] for _, data in rows])
+
+        planned, skipped, errors = AccountService.plan_import(rows, "merge", existing)
+        assert planned == [
+            ([2, 3], {"email": "new@example.com", "note": "first", "source": "x"}),
+            ([5], {"email": "kept@example.com"}),
+        ]
+        assert (skipped, [row for row, _ in errors]) == (0, [4])
+
+        planned, skipped, _ = AccountService.plan_import(rows, "overwrite", existing)
+        assert planned[0][1]["note"] == "second"
+        assert planned[1][1]["password"] == "other"
+
+        planned, skipped, _ = AccountService.plan_import(rows, "skip", existing)
+        assert [numbers for numbers, _ in planned] == [[2]]
+        assert skipped == 2
+
+    def test_upsert_reports_failing_rows(self, db: Session):
+        """Test a failing bulk write is retried row by row and keeps the good rows."""
+        db.add(Account(id="taken", email="taken@example.com"))
+        db.commit()
+        # Clashes on the primary key, which ON CONFLICT(email) does not cover
+        rows = [([2], {"email": "good@example.com"}), ([3], {"id": "taken", "email": "bad@example.com"})]
+
+        errors = AccountService(db).upsert_accounts(rows, "skip")
+
+        assert [row for row, _ in errors] == [3]
+        assert "UNIQUE" in errors[0][1]
+        assert sorted(db.scalars(select(Account.email)).all()) == ["good@example.com", "taken@example.com"]
+
+    def test_upsert_is_one_statement_per_column_set(self, db: Session):
+        """Test rows carrying the same columns share one INSERT ... ON CONFLICT."""
+        rows = [([i], {"email": f"u{i}@example.com", "note": "n"}) for i in range(50)]
+        rows.append(([50], {"email": "other@example.com"}))
+
+        with count_statements() as statements:
+            assert AccountService(db).upsert_accounts(rows, "overwrite") == []
+
+        inserts = [s for s in statements if s.startswith("INSERT INTO accounts")]
+        assert len(inserts) == 2
+        assert "ON CONFLICT (email) DO UPDATE" in inserts[0]
+        assert db.scalar(select(func.count()).select_from(Account)) == 51
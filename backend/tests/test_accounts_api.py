@@ -53,6 +53,74 @@ class TestAccountsList:
         data = response.json()
         assert len(data["items"]) == 5
 
+    def test_list_accounts_without_total(self, client, auth_headers):
+        """Test with_total=false only reports has_more."""
+        for i in range(3):
+            client.post("/api/accounts", headers=auth_headers, json={"email": f"nototal{i}@example.com"})
+
+        response = client.get(
+            "/api/accounts",
+            headers=auth_headers,
+            params={"page_size": 2, "with_total": False},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] is None
+        assert data["total_pages"] is None
+        assert data["has_more"] is True
+
+        data = client.get(
+            "/api/accounts",
+            headers=auth_headers,
+            params={"page": 2, "page_size": 2, "with_total": False},
+        ).json()
+        assert len(data["items"]) == 1
+        assert data["has_more"] is False
+
+    def test_list_accounts_cursor_pagination(self, client, auth_headers):
+        """Test keyset pagination walks every account exactly once."""
+        for i in range(7):
+            client.post("/api/accounts", headers=auth_headers, json={"email": f"cursor{i}@example.com"})
+
+        seen = []
+        params = {"page_size": 3}
+        while True:
+            response = client.get("/api/accounts", headers=auth_headers, params=params)
+            assert response.status_code == 200
+            data = response.json()
+            seen.extend(item["email"] for item in data["items"])
+            if not data["next_cursor"]:
+                break
+            params = {"page_size": 3, "cursor": data["next_cursor"]}
+
+        assert len(seen) == 7
+        assert len(set(seen)) == 7
+
+    def test_list_accounts_cursor_stable_on_insert(self, client, auth_headers):
+        """Test inserting accounts does not shift cursor pages."""
+        for i in range(4):
+            client.post("/api/accounts", headers=auth_headers, json={"email": f"stable{i}@example.com"})
+
+        first = client.get("/api/accounts", headers=auth_headers, params={"page_size": 2}).json()
+        client.post("/api/accounts", headers=auth_headers, json={"email": "newest@example.com"})
+
+        second = client.get(
+            "/api/accounts",
+            headers=auth_headers,
+            params={"page_size": 2, "cursor": first["next_cursor"]},
+        ).json()
+        first_emails = {item["email"] for item in first["items"]}
+        second_emails = {item["email"] for item in second["items"]}
+        assert len(second_emails) == 2
+        assert not first_emails & second_emails
+        assert "newest@example.com" not in second_emails
+
+    def test_list_accounts_invalid_cursor(self, client, auth_headers):
+        """Test malformed cursors are rejected."""
+        response = client.get("/api/accounts", headers=auth_headers, params={"cursor": "not-a-cursor"})
+
+        assert response.status_code == 400
+
 
 class TestAccountCreate:
     """Test cases for POST /api/accounts endpoint."""
@@ -254,6 +322,278 @@ class TestAccountDelete:
         assert response.status_code == 404
 
 
+class TestBatchDelete:
+    """Test cases for POST /api/accounts/batch/delete endpoint."""
+
+    def test_batch_delete(self, client, auth_headers):
+        """Test counts come from the rows actually deleted."""
+        ids = [
+            client.post("/api/accounts", headers=auth_headers, json={"email": f"bulk{i}@example.com"}).json()["id"]
+            for i in range(3)
+        ]
+
+        response = client.post(
+            "/api/accounts/batch/delete",
+            headers=auth_headers,
+            json={"account_ids": ids + ["non-existent-id"]},
+        )
+
+        assert response.json() == {"deleted": 3, "failed": 1}
+        assert client.get("/api/accounts", headers=auth_headers).json()["total"] == 0
+
+    def test_failed_counts_agree(self, client, auth_headers):
+        """Test every batch endpoint counts duplicate IDs once."""
+        ids = [
+            client.post("/api/accounts", headers=auth_headers, json={"email": f"dup{i}@example.com"}).json()["id"]
+            for i in range(3)
+        ]
+        account_ids = ids + ids[:2] + ["non-existent-id"]
+
+        tags = client.post("/api/accounts/batch/tags", headers=auth_headers, json={"account_ids": account_ids})
+        update = client.post(
+            "/api/accounts/batch/update", headers=auth_headers, json={"account_ids": account_ids, "note": "x"}
+        )
+        delete = client.post("/api/accounts/batch/delete", headers=auth_headers, json={"account_ids": account_ids})
+
+        assert tags.json() == {"updated": 3, "failed": 1}
+        assert update.json() == {"updated": 3, "failed": 1, "not_found": ["non-existent-id"]}
+        assert delete.json() == {"deleted": 3, "failed": 1}
+
+    def test_batch_hard_delete(self, client, auth_headers):
+        """Test hard deletes remove the rows, including from search."""
+        account_id = client.post(
+            "/api/accounts", headers=auth_headers, json={"email": "gone@example.com"}
+        ).json()["id"]
+
+        response = client.post(
+            "/api/accounts/batch/delete",
+            headers=auth_headers,
+            params={"hard": True},
+            json={"account_ids": [account_id]},
+        )
+
+        assert response.json() == {"deleted": 1, "failed": 0}
+        assert client.get("/api/accounts", headers=auth_headers, params={"search": "gone"}).json()["items"] == []
+
+
+class TestBatchTags:
+    """Test cases for POST /api/accounts/batch/tags endpoint."""
+
+    def test_batch_tags(self, client, auth_headers):
+        """Test add, remove and set across many accounts."""
+        tag_a = client.post("/api/tags", headers=auth_headers, json={"name": "a"}).json()["id"]
+        tag_b = client.post("/api/tags", headers=auth_headers, json={"name": "b"}).json()["id"]
+        ids = [
+            client.post("/api/accounts", headers=auth_headers, json={"email": f"tagged{i}@example.com"}).json()["id"]
+            for i in range(3)
+        ]
+
+        def tag_names(account_id):
+            tags = client.get(f"/api/accounts/{account_id}", headers=auth_headers).json()["tags"]
+            return sorted(t["name"] for t in tags)
+
+        response = client.post(
+            "/api/accounts/batch/tags",
+            headers=auth_headers,
+            params={"action": "add"},
+            json={"account_ids": ids + ["non-existent-id"], "tag_ids": [tag_a, tag_b]},
+        )
+        assert response.json() == {"updated": 3, "failed": 1}
+        assert all(tag_names(i) == ["a", "b"] for i in ids)
+
+        client.post(
+            "/api/accounts/batch/tags",
+            headers=auth_headers,
+            params={"action": "remove"},
+            json={"account_ids": ids[:1], "tag_ids": [tag_a]},
+        )
+        assert tag_names(ids[0]) == ["b"]
+        assert tag_names(ids[1]) == ["a", "b"]
+
+        client.post(
+            "/api/accounts/batch/tags",
+            headers=auth_headers,
+            params={"action": "set"},
+            json={"account_ids": ids, "tag_ids": [tag_a]},
+        )
+        assert all(tag_names(i) == ["a"] for i in ids)
+
+
+class TestBatchUpdate:
+    """Test cases for POST /api/accounts/batch/update endpoint."""
+
+    def test_batch_update(self, client, auth_headers):
+        """Test only the sent fields change and missing IDs are reported."""
+        tag_id = client.post("/api/tags", headers=auth_headers, json={"name": "bulk"}).json()["id"]
+        ids = [
+            client.post(
+                "/api/accounts", headers=auth_headers, json={"email": f"upd{i}@example.com", "note": "keep"}
+            ).json()["id"]
+            for i in range(3)
+        ]
+
+        response = client.post(
+            "/api/accounts/batch/update",
+            headers=auth_headers,
+            json={"account_ids": ids + ["non-existent-id"], "source": "bulk", "tag_ids": [tag_id]},
+        )
+
+        assert response.json() == {"updated": 3, "failed": 1, "not_found": ["non-existent-id"]}
+        for account_id in ids:
+            account = client.get(f"/api/accounts/{account_id}", headers=auth_headers).json()
+            assert account["source"] == "bulk"
+            assert account["note"] == "keep"
+            assert [t["name"] for t in account["tags"]] == ["bulk"]
+
+    def test_batch_update_shared_email(self, client, auth_headers):
+        """Test setting one email on several accounts is rejected."""
+        ids = [
+            client.post("/api/accounts", headers=auth_headers, json={"email": f"dup{i}@example.com"}).json()["id"]
+            for i in range(2)
+        ]
+
+        response = client.post(
+            "/api/accounts/batch/update",
+            headers=auth_headers,
+            json={"account_ids": ids, "email": "same@example.com"},
+        )
+
+        assert response.status_code == 400
+
+
+class TestBatchByFilter:
+    """Test cases for batch operations selecting accounts by filter."""
+
+    def test_filter_and_dry_run(self, client, auth_headers):
+        """Test dry runs count the matches and real runs apply to all of them."""
+        for i in range(4):
+            account = {"email": f"f{i}@example.com", "source": "web" if i < 3 else "app"}
+            if i == 0:
+                account["gpt_membership"] = "plus"
+            client.post("/api/accounts", headers=auth_headers, json=account)
+        tag_id = client.post("/api/tags", headers=auth_headers, json={"name": "web"}).json()["id"]
+        filters = {"source": "web"}
+
+        response = client.post(
+            "/api/accounts/batch/tags", headers=auth_headers, params={"dry_run": True},
+            json={"filters": filters, "tag_ids": [tag_id]},
+        )
+        assert response.json() == {"matched": 3}
+        assert client.get("/api/accounts", headers=auth_headers, params={"tag_ids": tag_id}).json()["total"] == 0
+
+        response = client.post(
+            "/api/accounts/batch/tags", headers=auth_headers, json={"filters": filters, "tag_ids": [tag_id]}
+        )
+        assert response.json() == {"updated": 3, "failed": 0}
+
+        response = client.post(
+            "/api/accounts/batch/update", headers=auth_headers,
+            json={"filters": {"tag_ids": [tag_id], "gpt_membership": "plus"}, "note": "paid"},
+        )
+        assert response.json() == {"updated": 1, "failed": 0, "not_found": []}
+
+        response = client.post("/api/accounts/batch/delete", headers=auth_headers, json={"filters": filters})
+        assert response.json() == {"deleted": 3, "failed": 0}
+        assert client.get("/api/accounts", headers=auth_headers).json()["total"] == 1
+
+    def test_requires_one_target(self, client, auth_headers):
+        """Test exactly one of account_ids and filters must be given."""
+        assert client.post("/api/accounts/batch/delete", headers=auth_headers, json={}).status_code == 422
+        response = client.post(
+            "/api/accounts/batch/delete", headers=auth_headers, json={"account_ids": ["x"], "filters": {}}
+        )
+        assert response.status_code == 422
+
+    def test_empty_filter_is_refused(self, client, auth_headers):
+        """Test an empty filter cannot hard-delete everything; all=true has to be explicit."""
+        for i in range(3):
+            client.post("/api/accounts", headers=auth_headers, json={"email": f"keep{i}@example.com"})
+
+        for params in ({"hard": True}, {"dry_run": True}):
+            response = client.post(
+                "/api/accounts/batch/delete", headers=auth_headers, params=params, json={"filters": {}}
+            )
+            assert response.status_code == 422
+        response = client.post(
+            "/api/accounts/batch/delete", headers=auth_headers, params={"hard": True},
+            json={"filters": {"search": "", "tag_ids": []}},
+        )
+        assert response.status_code == 422
+        assert client.get("/api/accounts", headers=auth_headers).json()["total"] == 3
+
+        response = client.post(
+            "/api/accounts/batch/delete", headers=auth_headers, params={"dry_run": True}, json={"all": True}
+        )
+        assert response.json() == {"matched": 3}
+
+
+class TestAccountImport:
+    """Test cases for POST /api/accounts/import endpoint."""
+
+    @staticmethod
+    def upload(client, auth_headers, rows, strategy="skip"):
+        import io
+
+        import pandas as pd
+
+        buffer = io.BytesIO()
+        pd.DataFrame(rows).to_excel(buffer, index=False)
+        return client.post(
+            "/api/accounts/import",
+            headers=auth_headers,
+            params={"conflict_strategy": strategy},
+            files={"file": ("accounts.xlsx", buffer.getvalue())},
+        ).json()
+
+    def get_by_email(self, client, auth_headers, email):
+        items = client.get("/api/accounts", headers=auth_headers, params={"search": email}).json()["items"]
+        return next(item for item in items if item["email"] == email)
+
+    def test_import_new_and_skip(self, client, auth_headers):
+        """Test new rows are created with secrets, conflicts skipped and bad rows reported."""
+        client.post("/api/accounts", headers=auth_headers, json={"email": "old@example.com", "note": "old"})
+
+        result = self.upload(client, auth_headers, [
+            {"账号": "new@example.com", "密码": "pw", "2fa": "JBSWY3DPEHPK3PXP", "sub2api": "有"},
+            {"账号": "old@example.com", "备注": "ignored"},
+            {"账号": "not-an-email", "备注": "bad"},
+            {"账号": None, "备注": "no email"},
+            {"账号": "new@example.com", "备注": "duplicate"},
+        ])
+
+        assert result["total"] == 5
+        assert (result["imported"], result["skipped"], result["failed"]) == (1, 2, 2)
+        assert [e.split(":")[0] for e in result["errors"]] == ["Row 4", "Row 5"]
+        account = self.get_by_email(client, auth_headers, "new@example.com")
+        assert account["has_password"] and account["has_totp"] and account["sub2api"]
+        password = client.get(f"/api/accounts/{account['id']}/password", headers=auth_headers).json()
+        assert password == {"password": "pw"}
+        assert self.get_by_email(client, auth_headers, "old@example.com")["note"] == "old"
+
+    def test_import_overwrite_and_merge(self, client, auth_headers):
+        """Test overwrite replaces the given cells and merge only fills empty ones."""
+        client.post(
+            "/api/accounts",
+            headers=auth_headers,
+            json={"email": "a@example.com", "note": "keep", "password": "old-pw"},
+        )
+        rows = [{"账号": "a@example.com", "备注": "sheet", "来源": "import", "密码": "new-pw"}]
+
+        result = self.upload(client, auth_headers, rows, strategy="merge")
+        assert (result["imported"], result["failed"]) == (1, 0)
+        account = self.get_by_email(client, auth_headers, "a@example.com")
+        assert (account["note"], account["source"]) == ("keep", "import")
+        password = client.get(f"/api/accounts/{account['id']}/password", headers=auth_headers).json()
+        assert password == {"password": "old-pw"}
+
+        result = self.upload(client, auth_headers, rows, strategy="overwrite")
+        assert result["imported"] == 1
+        account = self.get_by_email(client, auth_headers, "a@example.com")
+        assert account["note"] == "sheet"
+        password = client.get(f"/api/accounts/{account['id']}/password", headers=auth_headers).json()
+        assert password == {"password": "new-pw"}
+
+
 class TestAccountPassword:
     """Test cases for GET /api/accounts/{id}/password endpoint."""
 
@@ -298,6 +638,60 @@ class TestAccountPassword:
         assert data["password"] is None
 
 
+class TestAccountSecrets:
+    """Test cases for POST /api/accounts/secrets endpoint."""
+
+    def test_reveal_many(self, client, auth_headers):
+        """Test secrets of several accounts come back in one request."""
+        ids = [
+            client.post(
+                "/api/accounts",
+                headers=auth_headers,
+                json={"email": f"reveal{i}@example.com", "password": f"pw{i}", "totp_secret": f"SECRET{i}"},
+            ).json()["id"]
+            for i in range(3)
+        ]
+        empty = client.post("/api/accounts", headers=auth_headers, json={"email": "empty@example.com"}).json()["id"]
+
+        response = client.post(
+            "/api/accounts/secrets",
+            headers=auth_headers,
+            json={"account_ids": ids + [empty, "missing-id"]},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert list(data["secrets"]) == ids + [empty]
+        assert data["secrets"][ids[1]] == {"password": "pw1", "totp_secret": "SECRET1"}
+        assert data["secrets"][empty] == {"password": None, "totp_secret": None}
+        assert data["not_found"] == ["missing-id"]
+
+    def test_reveal_selected_fields(self, client, auth_headers):
+        """Test only the requested fields are returned."""
+        account_id = client.post(
+            "/api/accounts",
+            headers=auth_headers,
+            json={"email": "fields@example.com", "password": "pw", "totp_secret": "SECRET"},
+        ).json()["id"]
+
+        response = client.post(
+            "/api/accounts/secrets",
+            headers=auth_headers,
+            json={"account_ids": [account_id], "fields": ["password"]},
+        )
+
+        assert response.json()["secrets"] == {account_id: {"password": "pw"}}
+
+    def test_reveal_too_many(self, client, auth_headers, monkeypatch):
+        """Test requests over the limit are rejected."""
+        from app.config import settings
+
+        monkeypatch.setattr(settings, "SECRETS_MAX_ACCOUNTS", 2)
+        response = client.post("/api/accounts/secrets", headers=auth_headers, json={"account_ids": ["a", "b", "c"]})
+
+        assert response.status_code == 400
+
+
 class TestAccountTotp:
     """Test cases for GET /api/accounts/{id}/totp endpoint."""
 
@@ -321,6 +715,73 @@ class TestAccountTotp:
         data = response.json()
         assert data["totp_secret"] == "JBSWY3DPEHPK3PXP"
 
+    def test_batch_totp_codes(self, client, auth_headers):
+        """Test codes for many accounts come back from one request."""
+        ids = [
+            client.post(
+                "/api/accounts",
+                headers=auth_headers,
+                json={"email": f"codes{i}@example.com", "totp_secret": "JBSWY3DPEHPK3PXP"},
+            ).json()["id"]
+            for i in range(3)
+        ]
+        no_totp = client.post("/api/accounts", headers=auth_headers, json={"email": "nototp@example.com"}).json()["id"]
+
+        response = client.post(
+            "/api/accounts/totp/codes",
+            headers=auth_headers,
+            json={"account_ids": ids + [no_totp, "missing-id"]},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [c["id"] for c in data["codes"]] == ids + [no_totp]
+        assert all(len(c["code"]) == 6 and 1 <= c["seconds_remaining"] <= 30 for c in data["codes"][:3])
+        assert data["codes"][3]["code"] is None
+        assert data["not_found"] == ["missing-id"]
+
+    def test_batch_totp_codes_by_filter(self, client, auth_headers):
+        """Test the list filters select accounts that have a secret."""
+        client.post(
+            "/api/accounts",
+            headers=auth_headers,
+            json={"email": "filtered@example.com", "source": "web", "totp_secret": "JBSWY3DPEHPK3PXP"},
+        )
+        client.post("/api/accounts", headers=auth_headers, json={"email": "other@example.com", "source": "web"})
+
+        client.post(
+            "/api/accounts",
+            headers=auth_headers,
+            json={"email": "elsewhere@example.com", "source": "app", "totp_secret": "JBSWY3DPEHPK3PXP"},
+        )
+
+        response = client.post(
+            "/api/accounts/totp/codes", headers=auth_headers, json={"filters": {"source": "web"}}
+        )
+
+        assert response.status_code == 200
+        assert len(response.json()["codes"]) == 1
+        response = client.post(
+            "/api/accounts/totp/codes", headers=auth_headers, json={"account_ids": ["x"], "filters": {"source": "web"}}
+        )
+        assert response.status_code == 422
+
+    def test_totp_cache_wiped_on_lock(self, client, auth_headers):
+        """Test decrypted secrets do not survive a lock."""
+        from app.services.totp_service import totp_cache
+
+        account_id = client.post(
+            "/api/accounts",
+            headers=auth_headers,
+            json={"email": "wipe@example.com", "totp_secret": "JBSWY3DPEHPK3PXP"},
+        ).json()["id"]
+        client.post("/api/accounts/totp/codes", headers=auth_headers, json={"account_ids": [account_id]})
+        assert len(totp_cache) == 1
+
+        client.post("/api/auth/lock", headers=auth_headers)
+
+        assert len(totp_cache) == 0
+
 
 class TestAccountSources:
     """Test cases for GET /api/accounts/sources endpoint."""
@@ -405,6 +866,80 @@ class TestAccountSearch:
         assert len(data["items"]) == 1
         assert data["items"][0]["email"] == "searchable@example.com"
 
+    def test_search_prefix_across_fields(self, client, auth_headers):
+        """Test prefix search covers note, family group and custom field values."""
+        client.post(
+            "/api/accounts",
+            headers=auth_headers,
+            json={
+                "email": "fields@example.com",
+                "note": "premium workspace",
+                "family_group": "household-blue",
+                "custom_fields": {"region": "frankfurt"},
+            },
+        )
+        client.post("/api/accounts", headers=auth_headers, json={"email": "plain@example.com"})
+
+        for term in ("prem", "household", "frank", "fields@exa"):
+            response = client.get("/api/accounts", headers=auth_headers, params={"search": term})
+            emails = [item["email"] for item in response.json()["items"]]
+            assert emails == ["fields@example.com"], term
+
+    def test_search_mid_word_and_cjk(self, client, auth_headers):
+        """Test substrings match inside words and unspaced CJK text, short terms included."""
+        client.post(
+            "/api/accounts",
+            headers=auth_headers,
+            json={
+                "email": "someone@gmail.com",
+                "note": "家庭组成员，每月续费",
+                "family_group": "蓝色家庭",
+                "custom_fields": {"地区": "法兰克福"},
+            },
+        )
+        client.post("/api/accounts", headers=auth_headers, json={"email": "other@example.com", "note": "个人"})
+
+        for term in ("mail", "gmail.com", "成员", "组成员", "每月 续费", "蓝色", "兰克", "NE@GM"):
+            response = client.get("/api/accounts", headers=auth_headers, params={"search": term})
+            emails = [item["email"] for item in response.json()["items"]]
+            assert emails == ["someone@gmail.com"], term
+
+    def test_search_index_follows_updates_and_deletes(self, client, auth_headers):
+        """Test the search index stays in sync with writes."""
+        response = client.post(
+            "/api/accounts",
+            headers=auth_headers,
+            json={"email": "sync@example.com", "note": "oldnote"},
+        )
+        account_id = response.json()["id"]
+
+        client.put(f"/api/accounts/{account_id}", headers=auth_headers, json={"note": "newnote"})
+        search = lambda term: client.get(
+            "/api/accounts", headers=auth_headers, params={"search": term}
+        ).json()["total"]
+        assert search("oldnote") == 0
+        assert search("newnote") == 1
+
+        client.delete(f"/api/accounts/{account_id}", headers=auth_headers, params={"hard": True})
+        assert search("newnote") == 0
+
+    def test_search_ranks_better_matches_first(self, client, auth_headers):
+        """Test results are ordered by relevance."""
+        client.post(
+            "/api/accounts",
+            headers=auth_headers,
+            json={"email": "weak@example.com", "note": "alpha and many other words in this note"},
+        )
+        client.post(
+            "/api/accounts",
+            headers=auth_headers,
+            json={"email": "alpha@example.com", "note": "alpha"},
+        )
+
+        response = client.get("/api/accounts", headers=auth_headers, params={"search": "alpha"})
+        emails = [item["email"] for item in response.json()["items"]]
+        assert emails == ["alpha@example.com", "weak@example.com"]
+
     def test_filter_by_source(self, client, auth_headers):
         """Test filtering accounts by source."""
         # Create accounts
@@ -1,6 +1,11 @@
 """Tests for authentication API endpoints."""
 import pytest
 
+from app.services.auth_service import AsyncAuthService
+from app.services.crypto_service import crypto_service
+from app.services.kdf_executor import KdfBusyError, kdf_executor
+from app.services.token_cache import token_cache
+
 
 class TestAuthStatus:
     """Test cases for /api/auth/status endpoint."""
@@ -89,6 +94,43 @@ class TestAuthLogin:
         assert "not initialized" in data["detail"]
 
 
+    def test_login_kdf_saturated(self, client, initialized_system, monkeypatch):
+        """Test login answers 503 when the KDF queue is full."""
+        def busy(*args):
+            raise KdfBusyError("Too many concurrent key derivations, try again later")
+
+        monkeypatch.setattr(kdf_executor, "submit", busy)
+        response = client.post("/api/auth/login", json={"password": initialized_system["password"]})
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+
+    def test_login_upgrades_hash_in_background(self, client, initialized_system, monkeypatch):
+        """Test a login with outdated KDF parameters answers first and upgrades afterwards."""
+        upgrades = []
+        upgrade = AsyncAuthService.upgrade_credentials_in_background
+        monkeypatch.setattr(
+            AsyncAuthService,
+            "upgrade_credentials_in_background",
+            staticmethod(lambda *args: upgrades.append(upgrade(*args)) or upgrades[-1]),
+        )
+        monkeypatch.setattr(crypto_service, "needs_rehash", lambda password_hash: True)
+
+        response = client.post("/api/auth/login", json={"password": initialized_system["password"]})
+
+        assert response.status_code == 200
+        assert len(upgrades) == 1 and upgrades[0].result(timeout=10) is True
+        monkeypatch.undo()
+        assert client.post("/api/auth/login", json={"password": initialized_system["password"]}).status_code == 200
+
+    def test_kdf_metrics(self, client, auth_headers):
+        """Test login timings show up in the KDF metrics."""
+        response = client.get("/api/auth/kdf-metrics", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.json()["stages"]["argon2_verify"]["count"] >= 1
+
+
 class TestAuthLogout:
     """Test cases for /api/auth/logout endpoint."""
 
@@ -100,6 +142,15 @@ class TestAuthLogout:
         data = response.json()
         assert data["message"] == "Logged out successfully"
 
+    def test_logout_flushes_token_cache(self, client, auth_headers):
+        """Test verified tokens are forgotten on logout."""
+        client.get("/api/auth/kdf-metrics", headers=auth_headers)
+        assert len(token_cache) == 1
+
+        client.post("/api/auth/logout", headers=auth_headers)
+
+        assert len(token_cache) == 0
+
     def test_logout_unauthorized(self, client, initialized_system):
         """Test logout without authentication."""
         response = client.post("/api/auth/logout")
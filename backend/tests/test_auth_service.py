@@ -1,10 +1,13 @@
 """Tests for authentication service."""
 import pytest
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from app.schemas import AccountCreate
+from app.services.account_service import AccountService
 from app.services.auth_service import AuthService
 from app.services.crypto_service import crypto_service
-from app.models import SystemConfig
+from app.models import Account, SystemConfig
 
 
 class TestAuthServiceInitialization:
@@ -181,3 +184,77 @@ class TestAuthServicePasswordChange:
         result = auth_service.change_master_password("WrongPassword!", "NewPassword!")
 
         assert result is False
+
+    def test_change_password_only_rewraps_data_key(self, db: Session):
+        """Test account ciphertext is untouched and still readable after a change."""
+        auth_service = AuthService(db)
+        auth_service.setup_master_password("OldPassword123!")
+        account = AccountService(db).create_account(AccountCreate(email="env@example.com", password="pw"))
+        before = db.scalar(select(Account.password_encrypted).where(Account.id == account.id))
+        wrapped_before = db.get(SystemConfig, AuthService.CONFIG_KEY_DATA_KEY).value
+
+        assert auth_service.change_master_password("OldPassword123!", "NewPassword456!") is True
+
+        db.expire_all()
+        assert db.scalar(select(Account.password_encrypted).where(Account.id == account.id)) == before
+        assert db.get(SystemConfig, AuthService.CONFIG_KEY_DATA_KEY).value != wrapped_before
+
+        crypto_service.clear_encryption_key()
+        assert auth_service.login("NewPassword456!") is not None
+        assert AccountService(db).get_decrypted_password(account.id) == "pw"
+
+
+FAST_ARGON2 = {"time_cost": 1, "memory_cost": 8192, "parallelism": 1}
+FAST_SCRYPT = {"n": 2**12, "r": 8, "p": 1}
+
+
+@pytest.fixture
+def restore_kdf_params():
+    argon2_params, scrypt_params = crypto_service.argon2_params, crypto_service.scrypt_params
+    yield
+    crypto_service.configure_kdf(argon2_params, scrypt_params)
+
+
+class TestKdfParameters:
+    """Test cases for calibrated KDF parameters and credential upgrades."""
+
+    def test_apply_stored_params(self, db: Session, restore_kdf_params):
+        """Test calibrated parameters are loaded from system_config."""
+        AuthService(db).store_kdf_params(FAST_ARGON2, FAST_SCRYPT)
+
+        AuthService(db).apply_kdf_params()
+
+        assert crypto_service.argon2_params == FAST_ARGON2
+        assert crypto_service.scrypt_params == FAST_SCRYPT
+
+    def test_login_upgrades_credentials(self, db: Session, restore_kdf_params):
+        """Test a login after calibration re-hashes and re-wraps with the new parameters."""
+        auth_service = AuthService(db)
+        auth_service.setup_master_password("UpgradeMe123!")
+        account = AccountService(db).create_account(AccountCreate(email="kdf@example.com", password="pw"))
+        old_hash = auth_service.get_credentials()[0]
+        crypto_service.clear_encryption_key()
+
+        crypto_service.configure_kdf(FAST_ARGON2, FAST_SCRYPT)
+        assert auth_service.login("UpgradeMe123!") is not None
+
+        new_hash = auth_service.get_credentials()[0]
+        assert new_hash != old_hash
+        assert not crypto_service.needs_rehash(new_hash)
+        assert auth_service.get_scrypt_params() == FAST_SCRYPT
+
+        crypto_service.clear_encryption_key()
+        assert auth_service.login("UpgradeMe123!") is not None
+        assert auth_service.get_credentials()[0] == new_hash
+        assert AccountService(db).get_decrypted_password(account.id) == "pw"
+
+    def test_legacy_credentials_use_fixed_scrypt_params(self, db: Session):
+        """Test credentials stored without parameters keep deriving with the old constants."""
+        auth_service = AuthService(db)
+        auth_service.setup_master_password("LegacyParams1!")
+        db.delete(db.get(SystemConfig, AuthService.CONFIG_KEY_SCRYPT_PARAMS))
+        db.commit()
+        crypto_service.clear_encryption_key()
+
+        assert auth_service.get_scrypt_params() == {"n": 2**14, "r": 8, "p": 1}
+        assert auth_service.login("LegacyParams1!") is not None
@@ -0,0 +1,76 @@
+"""Tests for the process-wide system_config cache."""
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models import SystemConfig, config_cache
+from app.services.auth_service import AuthService
+from tests.conftest import TestSessionLocal, test_engine
+
+
+class TestConfigCache:
+    """Test cases for ConfigCache."""
+
+    def test_reads_are_served_from_memory(self, db: Session):
+        """Test reads after the initial load run no SQL."""
+        config_cache.set(db, "answer", "42")
+        db.commit()
+        config_cache.load(db)
+
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(test_engine, "before_cursor_execute", record)
+        try:
+            for _ in range(10):
+                assert config_cache.get(db, "answer") == "42"
+                assert config_cache.get(db, "missing") is None
+            assert AuthService(db).is_initialized() is False
+        finally:
+            event.remove(test_engine, "before_cursor_execute", record)
+        assert statements == []
+
+    def test_commit_invalidates(self, db: Session):
+        """Test other sessions see a committed write."""
+        config_cache.set(db, "answer", "1")
+        db.commit()
+        assert config_cache.get(db, "answer") == "1"
+
+        with TestSessionLocal() as other:
+            config_cache.set(other, "answer", "2")
+            other.commit()
+
+        assert config_cache.get(db, "answer") == "2"
+
+    def test_plain_orm_writes_invalidate(self, db: Session):
+        """Test rows written without the repository API are picked up too."""
+        assert config_cache.get(db, "answer") is None
+
+        db.add(SystemConfig(key="answer", value="3"))
+        db.commit()
+
+        assert config_cache.get(db, "answer") == "3"
+
+    def test_writer_sees_own_uncommitted_writes(self, db: Session):
+        """Test a transaction reads its own writes without publishing them."""
+        config_cache.set(db, "answer", "4")
+        assert config_cache.get(db, "answer") == "4"
+
+        db.rollback()
+
+        assert config_cache.get(db, "answer") is None
+
+    def test_rolled_back_savepoint_is_not_cached(self, db: Session):
+        """Test a write undone by its savepoint never shows up."""
+        try:
+            with db.begin_nested():
+                config_cache.set(db, "answer", "5")
+                db.flush()
+                raise ValueError
+        except ValueError:
+            pass
+        db.commit()
+
+        with TestSessionLocal() as other:
+            assert config_cache.get(other, "answer") is None
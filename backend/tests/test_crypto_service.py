@@ -1,7 +1,9 @@
 """Tests for crypto service."""
 import pytest
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 
-from app.services.crypto_service import CryptoService
+from app.config import settings
+from app.services.crypto_service import CryptoService, key_version
 
 
 class TestCryptoServicePasswordHashing:
@@ -203,3 +205,87 @@ class TestCryptoServiceKeyManagement:
             crypto.encrypt("Test")
 
         assert "not set" in str(exc_info.value).lower() or "locked" in str(exc_info.value).lower()
+
+
+class TestCryptoServiceBulk:
+    """Test cases for encrypt_many / decrypt_many."""
+
+    @pytest.fixture
+    def crypto(self):
+        crypto = CryptoService()
+        crypto.set_encryption_key(b"b" * 32)
+        return crypto
+
+    def test_roundtrip_keeps_order_and_none(self, crypto):
+        """Test bulk calls preserve order, empty strings and None entries."""
+        values = ["one", None, "", "二"]
+
+        encrypted = crypto.encrypt_many(values)
+
+        assert encrypted[1] is None
+        assert encrypted[2] == b""
+        assert crypto.decrypt(encrypted[0]) == "one"
+        assert crypto.decrypt_many(encrypted) == values
+
+    def test_parallel_batches(self, crypto, monkeypatch):
+        """Test batches above the threshold are split across workers."""
+        monkeypatch.setattr(settings, "CRYPTO_WORKERS", 3)
+        monkeypatch.setattr(settings, "CRYPTO_PARALLEL_MIN_ITEMS", 10)
+        values = [f"value-{i}" for i in range(100)]
+
+        assert crypto.decrypt_many(crypto.encrypt_many(values)) == values
+
+    def test_requires_key(self):
+        """Test bulk calls fail without an encryption key."""
+        with pytest.raises(ValueError, match="Encryption key not set"):
+            CryptoService().decrypt_many([b"x"])
+
+
+class TestCryptoServiceKeyring:
+    """Test cases for versioned ciphertext and the keyring."""
+
+    def test_ciphertext_records_key_version(self):
+        """Test new ciphertext carries the current key version."""
+        crypto = CryptoService()
+        crypto.set_encryption_key(b"a" * 32, version=3)
+
+        assert key_version(crypto.encrypt("secret")) == 3
+
+    def test_decrypt_picks_key_by_version(self):
+        """Test values from an older key version stay readable after rotation."""
+        crypto = CryptoService()
+        crypto.set_encryption_key(b"a" * 32, version=1)
+        old = crypto.encrypt("old value")
+
+        crypto.set_encryption_key(b"b" * 32, version=2)
+        crypto.add_key(1, b"a" * 32)
+
+        assert crypto.decrypt(old) == "old value"
+        assert key_version(crypto.encrypt("new value")) == 2
+
+    def test_legacy_ciphertext_still_decrypts(self):
+        """Test headerless nonce || ct values from before versioning are accepted."""
+        key = b"c" * 32
+        nonce = b"n" * 12
+        legacy = nonce + AESGCM(key).encrypt(nonce, b"legacy", None)
+        crypto = CryptoService()
+        crypto.set_encryption_key(key, version=1)
+
+        assert key_version(legacy) is None
+        assert crypto.decrypt(legacy) == "legacy"
+
+    def test_rotate_many_only_rewrites_old_versions(self):
+        """Test rotation leaves current-version values untouched."""
+        crypto = CryptoService()
+        crypto.set_encryption_key(b"a" * 32, version=1)
+        old = crypto.encrypt("old")
+        crypto.set_encryption_key(b"b" * 32, version=2)
+        crypto.add_key(1, b"a" * 32)
+        current = crypto.encrypt("current")
+
+        rotated = crypto.rotate_many([old, current, None])
+
+        assert key_version(rotated[0]) == 2
+        assert rotated[1] == current
+        assert rotated[2] is None
+        assert crypto.decrypt_many(rotated[:2]) == ["old", "current"]
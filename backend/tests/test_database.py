@@ -0,0 +1,82 @@
+"""Tests for database engine configuration and the search index."""
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import OperationalError
+
+from app.config import settings
+from app.models import Account, apply_sqlite_pragmas, rebuild_search_index
+from app.models.database import set_query_only
+from app.models.search_index import build_match_query
+
+
+class TestSqlitePragmas:
+    """Test cases for the SQLite pragma profile."""
+
+    def _make_engine(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'pragmas.db'}")
+        event.listen(engine, "connect", apply_sqlite_pragmas)
+        return engine
+
+    def test_profile_applied_on_connect(self, tmp_path):
+        """Test every new connection gets the configured pragmas."""
+        engine = self._make_engine(tmp_path)
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == settings.SQLITE_JOURNAL_MODE.lower()
+            assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == settings.SQLITE_BUSY_TIMEOUT_MS
+            assert conn.exec_driver_sql("PRAGMA cache_size").scalar() == settings.SQLITE_CACHE_SIZE
+            # NORMAL == 1, MEMORY == 2
+            assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+            assert conn.exec_driver_sql("PRAGMA temp_store").scalar() == 2
+        engine.dispose()
+
+    def test_profile_can_be_disabled(self, tmp_path, monkeypatch):
+        """Test the profile is skipped when disabled in settings."""
+        monkeypatch.setattr(settings, "SQLITE_PRAGMAS_ENABLED", False)
+        engine = self._make_engine(tmp_path)
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "delete"
+        engine.dispose()
+
+
+class TestReadOnlyConnections:
+    """Test cases for the read pool connection setup."""
+
+    def test_query_only_rejects_writes(self, tmp_path):
+        """Test read pool connections cannot modify the database."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'ro.db'}")
+        with engine.begin() as conn:
+            conn.exec_driver_sql("CREATE TABLE t (x INTEGER)")
+        event.listen(engine, "connect", set_query_only)
+        engine.dispose()
+
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql("SELECT count(*) FROM t").scalar() == 0
+            with pytest.raises(OperationalError):
+                conn.exec_driver_sql("INSERT INTO t VALUES (1)")
+        engine.dispose()
+
+
+class TestSearchIndex:
+    """Test cases for the FTS5 account index."""
+
+    def test_build_match_query(self):
+        """Test free text becomes quoted substring terms."""
+        assert build_match_query("john doe") == '"john" "doe"'
+        assert build_match_query('say "hi"') == '"say" """hi"""'
+        assert build_match_query(" @ ") is None
+        # Too short for trigrams: the caller scans instead
+        assert build_match_query("成员") is None
+        assert build_match_query("john do") is None
+
+    def test_rebuild_search_index(self, db):
+        """Test rebuild re-populates the index from the accounts table."""
+        db.add_all([Account(email="one@example.com"), Account(email="two@example.com")])
+        db.commit()
+        connection = db.connection()
+        connection.exec_driver_sql("DELETE FROM accounts_fts")
+
+        assert rebuild_search_index(connection) == 2
+        matches = connection.exec_driver_sql(
+            "SELECT count(*) FROM accounts_fts WHERE accounts_fts MATCH ?", ('"two"',)
+        ).scalar()
+        assert matches == 1
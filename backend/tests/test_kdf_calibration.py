@@ -0,0 +1,36 @@
+"""Tests for KDF cost calibration."""
+import pytest
+
+from app.cli import main
+from app.services.kdf_calibration import SCRYPT_MIN_N, SCRYPT_R, calibrate_argon2, calibrate_scrypt
+
+
+class TestKdfCalibration:
+    """Test cases for calibrate_argon2 / calibrate_scrypt."""
+
+    def test_scrypt_never_below_minimum(self):
+        """Test a tiny time budget still yields the minimum work factor."""
+        assert calibrate_scrypt(0.0, 1024**3)["n"] == SCRYPT_MIN_N
+
+    def test_scrypt_respects_memory_budget(self):
+        """Test n stays within the memory budget however much time is allowed."""
+        params = calibrate_scrypt(60.0, 128 * SCRYPT_R * SCRYPT_MIN_N * 2)
+
+        assert params["n"] == SCRYPT_MIN_N * 2
+
+    def test_argon2_within_budget(self):
+        """Test the chosen Argon2id cost respects the memory budget and minimum pass count."""
+        params = calibrate_argon2(0.0, 32 * 1024, parallelism=1)
+
+        assert params["time_cost"] == 1
+        assert params["memory_cost"] <= 32 * 1024
+
+    def test_argon2_rejects_budget_below_minimum(self):
+        """Test a memory budget below 19 MiB is refused instead of silently raised."""
+        with pytest.raises(ValueError, match="below the Argon2id minimum"):
+            calibrate_argon2(1.0, 16 * 1024, parallelism=1)
+
+    def test_cli_reports_budget_below_minimum(self):
+        """Test calibrate-kdf exits with the error before benchmarking or storing anything."""
+        with pytest.raises(SystemExit, match="16 MiB is below the Argon2id minimum of 19 MiB"):
+            main(["calibrate-kdf", "--max-memory-mb", "16", "--dry-run"])
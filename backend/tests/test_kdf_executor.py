@@ -0,0 +1,52 @@
+"""Tests for the bounded KDF executor."""
+import threading
+
+import pytest
+
+from app.services.kdf_executor import KdfBusyError, KdfExecutor
+
+
+@pytest.fixture
+def executor():
+    executor = KdfExecutor(max_workers=1, max_queue=1)
+    yield executor
+    executor.shutdown()
+
+
+class TestKdfExecutor:
+    """Test cases for KdfExecutor."""
+
+    def test_rejects_beyond_queue_depth(self, executor):
+        """Test submissions past workers + queue raise KdfBusyError."""
+        release = threading.Event()
+        running = executor.submit("slow", release.wait)
+        queued = executor.submit("slow", release.wait)
+
+        with pytest.raises(KdfBusyError):
+            executor.submit("slow", release.wait)
+
+        release.set()
+        assert running.result(timeout=5) and queued.result(timeout=5)
+        assert executor.metrics()["rejected"] == 1
+
+    def test_slots_are_released(self, executor):
+        """Test finished jobs free their slot for new submissions."""
+        for i in range(5):
+            assert executor.submit("double", lambda x: x * 2, i).result(timeout=5) == i * 2
+
+        assert executor.metrics()["pending"] == 0
+
+    def test_records_stage_timings(self, executor):
+        """Test timings are collected per stage."""
+        executor.submit("a", sum, [1, 2]).result(timeout=5)
+        executor.submit("a", sum, [3]).result(timeout=5)
+        executor.submit("b", len, "xyz").result(timeout=5)
+
+        stages = executor.metrics()["stages"]
+        assert stages["a"]["count"] == 2
+        assert stages["b"]["count"] == 1
+        assert {"avg_ms", "max_ms", "avg_wait_ms"} <= set(stages["a"])
+
+    async def test_run_awaits_result(self, executor):
+        """Test the async helper resolves with the job result."""
+        assert await executor.run("upper", str.upper, "kdf") == "KDF"
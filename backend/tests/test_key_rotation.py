@@ -0,0 +1,168 @@
+"""Tests for data key rotation."""
+import base64
+import json
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Account, SystemConfig
+from app.schemas import AccountCreate
+from app.services.account_service import AccountService
+from app.services.auth_service import AuthService
+from app.services.crypto_service import crypto_service, key_version
+from app.services.key_rotation import KeyRotationService, key_rotator
+
+PASSWORD = "RotatePassword1!"
+
+
+@pytest.fixture
+def vault(db: Session):
+    """An initialized vault with three accounts on key version 1."""
+    AuthService(db).setup_master_password(PASSWORD)
+    for i in range(3):
+        AccountService(db).create_account(
+            AccountCreate(email=f"rot{i}@example.com", password=f"pw{i}", totp_secret=f"t{i}")
+        )
+    return db
+
+
+def rotate(db: Session) -> None:
+    auth = AuthService(db)
+    password_hash, salt, _ = auth.get_credentials()
+    data_key = auth.rotate_data_key(password_hash, crypto_service.derive_key(PASSWORD, salt))
+    auth.load_keyring(data_key)
+
+
+class TestKeyRotationService:
+    """Test cases for rotating the data key and rewriting rows."""
+
+    def test_rotation_keeps_old_rows_readable(self, vault):
+        """Test rows stay readable on the old version until they are rewritten."""
+        rotate(vault)
+
+        assert crypto_service.key_version == 2
+        assert KeyRotationService(vault).count_outdated(2) == 3
+        account = AccountService(vault).get_account_by_email("rot1@example.com")
+        assert AccountService(vault).get_decrypted_password(account.id) == "pw1"
+
+    def test_batches_rewrite_outdated_rows(self, vault):
+        """Test batches move every row to the current version."""
+        rotate(vault)
+        service = KeyRotationService(vault)
+
+        assert service.rotate_batch("", batch_size=2)[0] == 2
+        last = service.rotate_batch("", batch_size=2)
+        assert last[0] == 1
+        assert service.rotate_batch("", batch_size=2) == (0, None)
+
+        assert service.count_outdated(2) == 0
+        blobs = vault.scalars(select(Account.totp_secret_encrypted)).all()
+        assert {key_version(blob) for blob in blobs} == {2}
+
+    def test_password_change_after_rotation(self, vault):
+        """Test older key versions survive a password change and a new login."""
+        rotate(vault)
+        auth = AuthService(vault)
+        assert auth.change_master_password(PASSWORD, "ChangedPassword2!") is True
+
+        crypto_service.clear_encryption_key()
+        assert auth.login("ChangedPassword2!") is not None
+        account = AccountService(vault).get_account_by_email("rot2@example.com")
+        assert AccountService(vault).get_decrypted_totp(account.id) == "t2"
+
+    def test_unused_key_versions_are_dropped(self, vault):
+        """Test older key versions are dropped only once no row uses them."""
+        rotate(vault)
+        rotate(vault)
+        service = KeyRotationService(vault)
+
+        assert service.prune_previous_keys(3) == []
+        while service.rotate_batch("")[0]:
+            pass
+        assert service.prune_previous_keys(2) == []  # no longer the current version
+        assert service.prune_previous_keys(3) == [1, 2]
+        assert vault.get(SystemConfig, AuthService.CONFIG_KEY_PREVIOUS_KEYS).value == "{}"
+
+        # The next rotation only wraps the version just replaced
+        rotate(vault)
+        assert list(json.loads(vault.get(SystemConfig, AuthService.CONFIG_KEY_PREVIOUS_KEYS).value)) == ["3"]
+        crypto_service.clear_encryption_key()
+        assert AuthService(vault).login(PASSWORD) is not None
+        account = AccountService(vault).get_account_by_email("rot0@example.com")
+        assert AccountService(vault).get_decrypted_password(account.id) == "pw0"
+
+    def test_legacy_vault_cannot_rotate(self, db: Session):
+        """Test a vault without a data key gets its own error, not the re-encryption one."""
+        salt = crypto_service.generate_salt()
+        password_hash = crypto_service.hash_password(PASSWORD)
+        for key, value in (
+            (AuthService.CONFIG_KEY_PASSWORD_HASH, password_hash),
+            (AuthService.CONFIG_KEY_ENCRYPTION_SALT, base64.b64encode(salt).decode()),
+            (AuthService.CONFIG_KEY_INITIALIZED, "true"),
+        ):
+            db.add(SystemConfig(key=key, value=value))
+        db.commit()
+
+        with pytest.raises(ValueError, match="no data key"):
+            AuthService(db).rotate_data_key(password_hash, crypto_service.derive_key(PASSWORD, salt))
+
+
+class TestKeyRotationApi:
+    """Test cases for the rotation endpoints."""
+
+    def test_rotate_key_rewrites_in_background(
+        self, client, db: Session, auth_headers, initialized_system, monkeypatch
+    ):
+        """Test rotation answers right away, the rotator catches up and drops the old version."""
+        monkeypatch.setattr(settings, "KEY_ROTATION_BATCH_SIZE", 1)
+        monkeypatch.setattr(settings, "KEY_ROTATION_INTERVAL_MS", 0)
+        ids = [
+            client.post(
+                "/api/accounts", headers=auth_headers, json={"email": f"api{i}@example.com", "password": f"pw{i}"}
+            ).json()["id"]
+            for i in range(3)
+        ]
+
+        response = client.post(
+            "/api/auth/rotate-key", headers=auth_headers, json={"password": initialized_system["password"]}
+        )
+        assert response.status_code == 200
+        key_rotator.join(timeout=10)
+
+        status = client.get("/api/auth/key-rotation", headers=auth_headers).json()
+        assert [status["key_version"], status["outdated"], status["running"]] == [2, 0, False]
+        assert client.get(f"/api/accounts/{ids[0]}/password", headers=auth_headers).json()["password"] == "pw0"
+        db.expire_all()
+        assert db.get(SystemConfig, AuthService.CONFIG_KEY_PREVIOUS_KEYS).value == "{}"
+
+    def test_rotate_again_during_pass(self, client, auth_headers, initialized_system, monkeypatch):
+        """Test a rotation while a pass runs restarts it for the new version."""
+        monkeypatch.setattr(settings, "KEY_ROTATION_BATCH_SIZE", 1)
+        monkeypatch.setattr(settings, "KEY_ROTATION_INTERVAL_MS", 50)
+        for i in range(5):
+            client.post(
+                "/api/accounts", headers=auth_headers, json={"email": f"again{i}@example.com", "password": "pw"}
+            )
+        body = {"password": initialized_system["password"]}
+
+        assert client.post("/api/auth/rotate-key", headers=auth_headers, json=body).status_code == 200
+        assert key_rotator.running
+        assert client.post("/api/auth/rotate-key", headers=auth_headers, json=body).status_code == 200
+        key_rotator.join(timeout=10)
+
+        status = client.get("/api/auth/key-rotation", headers=auth_headers).json()
+        assert [status["key_version"], status["outdated"], status["running"]] == [3, 0, False]
+
+        # Counters describe the last pass only
+        assert client.post("/api/auth/rotate-key", headers=auth_headers, json=body).status_code == 200
+        key_rotator.join(timeout=10)
+        status = client.get("/api/auth/key-rotation", headers=auth_headers).json()
+        assert [status["key_version"], status["rows_rewritten"], status["batches"]] == [4, 5, 5]
+
+    def test_rotate_key_wrong_password(self, client, auth_headers):
+        """Test rotation requires the master password."""
+        response = client.post("/api/auth/rotate-key", headers=auth_headers, json={"password": "Wrong1234"})
+
+        assert response.status_code == 400
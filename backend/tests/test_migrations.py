@@ -0,0 +1,112 @@
+"""Tests for the schema migration runner."""
+import pytest
+from sqlalchemy import create_engine
+
+from app.models import Base
+from app.models.migrations import LATEST_VERSION, get_schema_version, run_migrations
+
+
+def index_names(engine) -> set:
+    with engine.connect() as conn:
+        return set(conn.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'ix_%'"
+        ).scalars())
+
+
+@pytest.fixture
+def legacy_engine(tmp_path):
+    """A database created before the migration runner existed."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for name in index_names(engine) - {"ix_accounts_email", "ix_accounts_is_deleted"}:
+            conn.exec_driver_sql(f"DROP INDEX {name}")
+    yield engine
+    engine.dispose()
+
+
+class TestMigrations:
+    """Test cases for run_migrations."""
+
+    def test_upgrades_legacy_database(self, legacy_engine):
+        """Test an unversioned database gets the new indexes and a version."""
+        assert run_migrations(legacy_engine) == LATEST_VERSION
+
+        assert {
+            "ix_accounts_listing",
+            "ix_accounts_source_active",
+            "ix_accounts_gpt_membership_active",
+            "ix_accounts_family_group_active",
+            "ix_account_tags_tag_account",
+        } <= index_names(legacy_engine)
+        with legacy_engine.connect() as conn:
+            assert get_schema_version(conn) == LATEST_VERSION
+
+    def test_rerun_is_noop(self, legacy_engine):
+        """Test running migrations twice leaves the version unchanged."""
+        run_migrations(legacy_engine)
+        before = index_names(legacy_engine)
+
+        assert run_migrations(legacy_engine) == LATEST_VERSION
+        assert index_names(legacy_engine) == before
+
+    def test_fresh_database(self, tmp_path):
+        """Test migrations are harmless on a schema built by create_all."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+        Base.metadata.create_all(bind=engine)
+
+        assert run_migrations(engine) == LATEST_VERSION
+        engine.dispose()
+
+    def test_source_filter_uses_partial_index(self, legacy_engine):
+        """Test the source filter of the list query is served by its index."""
+        run_migrations(legacy_engine)
+        with legacy_engine.connect() as conn:
+            plan = conn.exec_driver_sql(
+                "EXPLAIN QUERY PLAN SELECT id FROM accounts "
+                "WHERE is_deleted = 0 AND source = 'web' ORDER BY created_at DESC, id DESC LIMIT 20"
+            ).all()
+        assert "ix_accounts_source_active" in " ".join(row[-1] for row in plan)
+
+    def test_backfills_secret_flags(self, tmp_path):
+        """Test the flag columns are added to old tables and backfilled."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'flags.db'}")
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            conn.exec_driver_sql("ALTER TABLE accounts DROP COLUMN has_password")
+            conn.exec_driver_sql("ALTER TABLE accounts DROP COLUMN has_totp")
+            conn.exec_driver_sql(
+                "INSERT INTO accounts (id, email, password_encrypted, sub2api, is_deleted, created_at, updated_at) "
+                "VALUES ('a', 'old@example.com', x'00', 0, 0, '2024-01-01', '2024-01-01')"
+            )
+
+        run_migrations(engine)
+
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql("SELECT has_password, has_totp FROM accounts").one() == (1, 0)
+        engine.dispose()
+
+    def test_search_index_switched_to_trigram(self, legacy_engine):
+        """Test a unicode61 search index is rebuilt with trigrams, keeping its rows."""
+        from app.models.search_index import search_index_tokenizer
+
+        with legacy_engine.begin() as conn:
+            conn.exec_driver_sql("DROP TABLE accounts_fts")
+            conn.exec_driver_sql(
+                "CREATE VIRTUAL TABLE accounts_fts USING fts5(email, note, recovery_email, family_group, "
+                "custom_fields, tokenize = 'unicode61 remove_diacritics 2')"
+            )
+            conn.exec_driver_sql(
+                "INSERT INTO accounts (id, email, note, sub2api, is_deleted, has_password, has_totp, "
+                "created_at, updated_at) "
+                "VALUES ('a', 'someone@gmail.com', '家庭组成员', 0, 0, 0, 0, '2024-01-01', '2024-01-01')"
+            )
+
+        run_migrations(legacy_engine)
+
+        with legacy_engine.connect() as conn:
+            assert search_index_tokenizer(conn) == "trigram"
+            matches = conn.exec_driver_sql(
+                "SELECT count(*) FROM accounts_fts WHERE accounts_fts MATCH '\"mail\"'"
+            ).scalar()
+            assert matches == 1
@@ -0,0 +1,148 @@
+"""Tests for the chunked re-key job."""
+import base64
+import os
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Account, SystemConfig
+from app.schemas import AccountCreate, AccountUpdate
+from app.services.account_service import AccountService
+from app.services.auth_service import AuthService
+from app.services.crypto_service import crypto_service
+from app.services.rekey_service import RekeyService, rekey_runner
+
+OLD_KEY = b"o" * 32
+NEW_KEY = b"n" * 32
+
+
+@pytest.fixture
+def vault(db: Session, monkeypatch):
+    """Five accounts encrypted with OLD_KEY, one of them soft-deleted."""
+    monkeypatch.setattr(settings, "REKEY_CHUNK_SIZE", 2)
+    crypto_service.set_encryption_key(OLD_KEY)
+    service = AccountService(db)
+    for i in range(5):
+        service.create_account(AccountCreate(email=f"rekey{i}@example.com", password=f"pw{i}", totp_secret=f"s{i}"))
+    service.delete_account(service.get_account_by_email("rekey4@example.com").id)
+    return db
+
+
+def secrets(db: Session, key: bytes) -> dict:
+    crypto_service.set_encryption_key(key)
+    rows = db.execute(select(Account.email, Account.password_encrypted, Account.totp_secret_encrypted)).all()
+    return {email: crypto_service.decrypt_many([pw, totp]) for email, pw, totp in rows}
+
+
+class TestRekeyService:
+    """Test cases for RekeyService."""
+
+    def test_chunks_include_deleted_and_checkpoint(self, vault):
+        """Test every row, soft-deleted ones too, ends up under the new key."""
+        service = RekeyService(vault)
+        service.start(OLD_KEY, NEW_KEY)
+        vault.commit()
+
+        assert service.process_chunk(OLD_KEY, NEW_KEY) is False
+        state = service.get_state()
+        assert [state["status"], state["processed"], state["total"]] == ["running", 2, 5]
+        assert crypto_service.unwrap_key(state["old_key"], NEW_KEY) == OLD_KEY
+
+        service.run_to_completion(OLD_KEY, NEW_KEY)
+        state = service.get_state()
+        assert [state["status"], state["processed"]] == ["completed", 5]
+        assert "old_key" not in state
+        assert secrets(vault, NEW_KEY)["rekey4@example.com"] == ["pw4", "s4"]
+
+    def test_resume_after_interruption(self, vault):
+        """Test a new session picks up where the checkpoint left off."""
+        RekeyService(vault).start(OLD_KEY, NEW_KEY)
+        vault.commit()
+        RekeyService(vault).process_chunk(OLD_KEY, NEW_KEY)
+        vault.expunge_all()
+
+        # Fresh service, old key recovered from the checkpoint
+        state = RekeyService(vault).get_state()
+        RekeyService(vault).run_to_completion(crypto_service.unwrap_key(state["old_key"], NEW_KEY), NEW_KEY)
+
+        assert secrets(vault, NEW_KEY) == {f"rekey{i}@example.com": [f"pw{i}", f"s{i}"] for i in range(5)}
+
+    def test_rows_written_with_new_key_are_kept(self, vault):
+        """Test edits made during the job are not re-encrypted twice."""
+        RekeyService(vault).start(OLD_KEY, NEW_KEY)
+        vault.commit()
+        crypto_service.set_encryption_key(NEW_KEY)
+        crypto_service.set_previous_key(OLD_KEY)
+        service = AccountService(vault)
+        account = service.get_account_by_email("rekey3@example.com")
+        assert service.get_decrypted_password(account.id) == "pw3"  # old-key fallback
+
+        service.update_account(account.id, AccountUpdate(password="changed"))
+        RekeyService(vault).run_to_completion(OLD_KEY, NEW_KEY)
+
+        assert secrets(vault, NEW_KEY)["rekey3@example.com"] == ["changed", "s3"]
+
+
+class TestRekeyApi:
+    """Test cases for the background re-key job through the API."""
+
+    PASSWORD = "LegacyPassword1!"
+
+    def legacy_vault(self, db: Session) -> list:
+        """Three accounts encrypted directly with the master key, no data key stored."""
+        salt = crypto_service.generate_salt()
+        master_key = crypto_service.derive_key(self.PASSWORD, salt)
+        for key, value in (
+            (AuthService.CONFIG_KEY_PASSWORD_HASH, crypto_service.hash_password(self.PASSWORD)),
+            (AuthService.CONFIG_KEY_ENCRYPTION_SALT, base64.b64encode(salt).decode()),
+            (AuthService.CONFIG_KEY_INITIALIZED, "true"),
+        ):
+            db.add(SystemConfig(key=key, value=value))
+        crypto_service.set_encryption_key(master_key)
+        ids = [
+            AccountService(db).create_account(AccountCreate(email=f"bg{i}@example.com", password=f"pw{i}")).id
+            for i in range(3)
+        ]
+        crypto_service.clear_encryption_key()
+        return ids
+
+    def test_legacy_vault_migrates_on_login(self, client, db: Session, monkeypatch):
+        """Test a vault without a data key is re-encrypted in the background after login."""
+        monkeypatch.setattr(settings, "REKEY_CHUNK_SIZE", 1)
+        ids = self.legacy_vault(db)
+
+        token = client.post("/api/auth/login", json={"password": self.PASSWORD}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        rekey_runner.join(timeout=10)
+
+        status = client.get("/api/auth/rekey-status", headers=headers).json()
+        assert [status["status"], status["processed"], status["total"]] == ["completed", 3, 3]
+        assert "old_key" not in status
+        assert client.get(f"/api/accounts/{ids[1]}/password", headers=headers).json()["password"] == "pw1"
+        assert db.get(SystemConfig, AuthService.CONFIG_KEY_DATA_KEY) is not None
+
+    def test_corrupt_row_is_skipped(self, client, db: Session, monkeypatch):
+        """Test a row matching neither key is recorded and the job still completes."""
+        monkeypatch.setattr(settings, "REKEY_CHUNK_SIZE", 2)
+        ids = self.legacy_vault(db)
+        db.execute(update(Account).where(Account.id == ids[1]).values(password_encrypted=os.urandom(40)))
+        db.commit()
+
+        token = client.post("/api/auth/login", json={"password": self.PASSWORD}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        rekey_runner.join(timeout=10)
+
+        status = client.get("/api/auth/rekey-status", headers=headers).json()
+        assert [status["status"], status["processed"], status["skipped_ids"]] == ["completed", 3, [ids[1]]]
+        assert client.get(f"/api/accounts/{ids[2]}/password", headers=headers).json()["password"] == "pw2"
+        # No longer reported as running, so the data key can be rotated
+        response = client.post("/api/auth/rotate-key", headers=headers, json={"password": self.PASSWORD})
+        assert response.status_code == 200
+
+    def test_rekey_status_idle(self, client, auth_headers):
+        """Test the status endpoint before any password change."""
+        response = client.get("/api/auth/rekey-status", headers=auth_headers)
+
+        assert response.json() == {"status": "idle"}
@@ -20,6 +20,30 @@ class TestTagsList:
         assert response.status_code == 401
 
 
+    def test_list_tags_account_count(self, client, auth_headers):
+        """Test account counts are aggregated and ignore deleted accounts."""
+        tag_a = client.post("/api/tags", headers=auth_headers, json={"name": "A"}).json()["id"]
+        tag_b = client.post("/api/tags", headers=auth_headers, json={"name": "B"}).json()["id"]
+        client.post("/api/tags", headers=auth_headers, json={"name": "C"})
+
+        ids = []
+        for i in range(3):
+            response = client.post(
+                "/api/accounts",
+                headers=auth_headers,
+                json={"email": f"counted{i}@example.com", "tag_ids": [tag_a, tag_b] if i == 0 else [tag_a]},
+            )
+            ids.append(response.json()["id"])
+        client.delete(f"/api/accounts/{ids[2]}", headers=auth_headers)
+
+        response = client.get("/api/tags", headers=auth_headers)
+        counts = {t["name"]: t["account_count"] for t in response.json()}
+        assert counts == {"A": 2, "B": 1, "C": 0}
+
+        response = client.get(f"/api/tags/{tag_a}", headers=auth_headers)
+        assert response.json()["account_count"] == 2
+
+
 class TestTagCreate:
     """Test cases for POST /api/tags endpoint."""
 
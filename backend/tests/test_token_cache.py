@@ -0,0 +1,52 @@
+"""Tests for the verified-token LRU cache."""
+import time
+
+from app.schemas import TokenData
+from app.services.token_cache import TokenCache
+
+
+def token_data(ttl: int = 60) -> TokenData:
+    return TokenData(sub="master", exp=int(time.time()) + ttl)
+
+
+class TestTokenCache:
+    """Test cases for TokenCache."""
+
+    def test_get_returns_cached_token(self):
+        """Test a stored token is served until cleared."""
+        cache = TokenCache(max_size=4)
+        data = token_data()
+        cache.put("token", data)
+
+        assert cache.get("token") == data
+        assert cache.get("other") is None
+
+        cache.clear()
+        assert cache.get("token") is None
+
+    def test_expired_entries_are_dropped(self):
+        """Test expired tokens are never served."""
+        cache = TokenCache(max_size=4)
+        cache.put("token", token_data(ttl=-1))
+
+        assert cache.get("token") is None
+        assert len(cache) == 0
+
+    def test_evicts_least_recently_used(self):
+        """Test the oldest unused entry goes first once full."""
+        cache = TokenCache(max_size=2)
+        cache.put("a", token_data())
+        cache.put("b", token_data())
+        cache.get("a")
+        cache.put("c", token_data())
+
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.get("c") is not None
+
+    def test_disabled_with_zero_size(self):
+        """Test a size of 0 caches nothing."""
+        cache = TokenCache(max_size=0)
+        cache.put("token", token_data())
+
+        assert cache.get("token") is None
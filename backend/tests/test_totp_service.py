@@ -0,0 +1,59 @@
+"""Tests for server-side TOTP code generation."""
+import base64
+
+import pytest
+
+from app.services.totp_service import TotpSecret, TotpSecretCache, hotp, parse_secret, seconds_remaining, totp
+
+RFC_KEY = b"12345678901234567890"
+
+
+class TestTotp:
+    """Test cases for the RFC 4226 / RFC 6238 implementation."""
+
+    def test_hotp_rfc4226_vectors(self):
+        """Test the HOTP reference values."""
+        expected = ["755224", "287082", "359152", "969429", "338314"]
+        assert [hotp(RFC_KEY, counter) for counter in range(5)] == expected
+
+    @pytest.mark.parametrize("now, code", [(59, "94287082"), (1111111109, "07081804"), (2000000000, "69279037")])
+    def test_totp_rfc6238_vectors(self, now, code):
+        """Test the TOTP reference values (SHA1, 8 digits)."""
+        assert totp(TotpSecret(key=RFC_KEY, digits=8), now) == code
+
+    def test_seconds_remaining(self):
+        """Test the countdown within a 30-second window."""
+        secret = TotpSecret(key=RFC_KEY)
+        assert seconds_remaining(secret, 60) == 30
+        assert seconds_remaining(secret, 89.5) == 1
+
+    def test_parse_base32_variants(self):
+        """Test spaces, lower case and missing padding are tolerated."""
+        encoded = base64.b32encode(RFC_KEY).decode().rstrip("=")
+        spaced = " ".join(encoded[i:i + 4] for i in range(0, len(encoded), 4)).lower()
+        assert parse_secret(spaced).key == RFC_KEY
+
+    def test_parse_otpauth_uri(self):
+        """Test otpauth URIs carry their own parameters."""
+        encoded = base64.b32encode(RFC_KEY).decode()
+        parsed = parse_secret(f"otpauth://totp/Example:me?secret={encoded}&digits=8&period=60&algorithm=SHA256")
+        assert parsed == TotpSecret(key=RFC_KEY, digits=8, period=60, algorithm="SHA256")
+
+    def test_parse_invalid(self):
+        """Test unusable secrets raise ValueError."""
+        for secret in ("not base32!", "", "otpauth://totp/x?issuer=y"):
+            with pytest.raises(ValueError):
+                parse_secret(secret)
+
+
+class TestTotpSecretCache:
+    """Test cases for the per-window secret cache."""
+
+    def test_entries_expire_with_the_window(self):
+        """Test cached secrets are dropped when the 30-second window rolls over."""
+        cache = TotpSecretCache()
+        secret = TotpSecret(key=RFC_KEY)
+        cache.put_many({b"ct": secret}, now=30)
+
+        assert cache.get_many([b"ct"], now=59) == {b"ct": secret}
+        assert cache.get_many([b"ct"], now=60) == {}
@@ -0,0 +1,86 @@
+"""Tests for the group-commit writer."""
+import asyncio
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models import Account, commit_or_flush
+from app.models.writer import GroupCommitWriter
+from tests.conftest import test_write_engine
+
+
+@pytest.fixture
+def writer(db: Session):
+    """A dedicated writer with a wide batching window."""
+    writer = GroupCommitWriter(max_batch_size=50, max_wait_ms=200)
+    yield writer
+    writer.stop()
+
+
+def add_account(email: str):
+    def job(session: Session) -> str:
+        account = Account(email=email)
+        session.add(account)
+        commit_or_flush(session)
+        return account.id
+
+    return job
+
+
+class TestGroupCommitWriter:
+    """Test cases for GroupCommitWriter."""
+
+    def test_concurrent_jobs_share_one_commit(self, writer, db: Session):
+        """Test jobs queued together are committed as one batch."""
+        commits = []
+        listener = lambda conn: commits.append(1)
+        event.listen(test_write_engine, "commit", listener)
+        try:
+            futures = [writer.submit(add_account(f"group{i}@example.com")) for i in range(20)]
+            ids = [f.result(timeout=5) for f in futures]
+        finally:
+            event.remove(test_write_engine, "commit", listener)
+
+        assert len(set(ids)) == 20
+        assert writer.batches < 20
+        assert len(commits) == writer.batches
+        assert db.scalar(select(Account).where(Account.email == "group0@example.com")) is not None
+
+    def test_failed_job_does_not_poison_batch(self, writer, db: Session):
+        """Test one failing job only rolls back its own savepoint."""
+        def failing(session: Session):
+            session.add(Account(email="failed@example.com"))
+            session.flush()
+            raise ValueError("boom")
+
+        futures = [
+            writer.submit(add_account("before@example.com")),
+            writer.submit(failing),
+            writer.submit(add_account("after@example.com")),
+        ]
+
+        assert futures[0].result(timeout=5)
+        with pytest.raises(ValueError, match="boom"):
+            futures[1].result(timeout=5)
+        assert futures[2].result(timeout=5)
+
+        emails = set(db.scalars(select(Account.email)))
+        assert emails == {"before@example.com", "after@example.com"}
+
+    def test_duplicate_insert_reports_integrity_error(self, writer, db: Session):
+        """Test constraint violations surface to the caller only."""
+        first = writer.submit(add_account("dup@example.com"))
+        second = writer.submit(add_account("dup@example.com"))
+
+        assert first.result(timeout=5)
+        with pytest.raises(IntegrityError):
+            second.result(timeout=5)
+        assert db.scalar(select(Account).where(Account.email == "dup@example.com")) is not None
+
+    async def test_run_awaits_result(self, writer):
+        """Test the async helper resolves with the job result."""
+        results = await asyncio.gather(*(writer.run(add_account(f"async{i}@example.com")) for i in range(5)))
+
+        assert len(set(results)) == 5
@@ -76,6 +76,26 @@ describe('Account Store', () => {
       expect(store.total).toBe(1)
     })
 
+    it('should fall back when totals are not counted', async () => {
+      const store = useAccountStore()
+      vi.mocked(accountApi.list).mockResolvedValue({
+        data: {
+          items: [mockAccount],
+          total: null,
+          page: 1,
+          page_size: 20,
+          total_pages: null,
+          has_more: true,
+          next_cursor: 'abc',
+        },
+      } as any)
+
+      await store.fetchAccounts()
+
+      expect(store.total).toBe(0)
+      expect(store.totalPages).toBe(1)
+    })
+
     it('should set loading state during fetch', async () => {
       const store = useAccountStore()
       let loadingDuringFetch = false
@@ -43,8 +43,8 @@ export const useAccountStore = defineStore('accounts', () => {
         page_size: pageSize.value,
       })
       accounts.value = data.items
-      total.value = data.total
-      totalPages.value = data.total_pages
+      total.value = data.total ?? 0
+      totalPages.value = data.total_pages ?? 1
     } finally {
       loading.value = false
     }
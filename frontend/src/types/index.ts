@@ -27,10 +27,13 @@ export interface Account {
 
 export interface AccountListResponse {
   items: Account[]
-  total: number
+  // null when listed by cursor or with with_total=false
+  total: number | null
   page: number
   page_size: number
-  total_pages: number
+  total_pages: number | null
+  has_more: boolean
+  next_cursor: string | null
 }
 
 export interface AccountCreate {
@@ -67,5 +70,6 @@ export interface ImportResult {
   total: number
   imported: number
   skipped: number
+  failed: number
   errors: string[]
 }